@@ -1,10 +1,7 @@
 import os
 from typing import Dict, List, Any
-import aiofiles
 
-from langchain_google_vertexai import ChatVertexAI
 from dotenv import load_dotenv
-from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.prebuilt import create_react_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langfuse.callback import CallbackHandler
@@ -13,14 +10,16 @@ import logging
 logger = logging.getLogger("general_agent")
 logging.basicConfig(level=logging.INFO)
 from utils.config import settings
+from utils.llm_provider import get_llm as get_shared_llm
+from utils.mcp_pool import mcp_pool
+from utils.prompt_cache import prompt_cache, tools_to_info
+from utils.tool_registry import tool_registry
 
 # 환경 변수 로드
 load_dotenv()
 
 # 싱글톤 인스턴스
-_llm_instance = None
 _mcp_client = None
-_mcp_tools_cache = None
 
 langfuse_handler = CallbackHandler(public_key="", secret_key="", host="")
 
@@ -41,6 +40,9 @@ MCP_SERVERS = {
     # },
 }
 
+# 시작 시 도구 검색 대상으로 등록
+tool_registry.register(MCP_SERVERS)
+
 
 # MCP 클라이언트 초기화 함수
 async def init_mcp_client():
@@ -49,7 +51,8 @@ async def init_mcp_client():
     if _mcp_client is None:
         logger.info("MCP 클라이언트 초기화 시작")
         try:
-            client = MultiServerMCPClient(MCP_SERVERS)
+            # 프로세스 전역 세션 풀을 공유 (서버별 장기 세션)
+            client = mcp_pool.client(MCP_SERVERS)
             logger.info("MCP 클라이언트 인스턴스 생성 완료")
             _mcp_client = client
             logger.info("MCP 클라이언트 초기화 완료")
@@ -69,99 +72,39 @@ async def close_mcp_client():
 
 # MCP 도구 가져오기 함수
 async def get_mcp_tools() -> List:
-    """MCP 도구를 가져오고 상세 정보를 출력합니다."""
-    global _mcp_tools_cache
-    if _mcp_tools_cache is not None:
-        return _mcp_tools_cache
-    try:
-        client = await init_mcp_client()
-        logger.info("MCP 도구 가져오는 중...")
-        tools = await client.get_tools()  # await 필수!
-        logger.info(f"총 {len(tools)}개의 MCP 도구를 가져왔습니다")
-        _mcp_tools_cache = tools
-        return tools
-    except Exception as e:
-        logger.info(f"도구 가져오기 중 오류 발생: {str(e)}")
-        return []
+    """도구 레지스트리에서 이 에이전트의 MCP 도구 목록을 가져옵니다.
+
+    도구 검색은 서버 시작 시와 백그라운드에서 수행되므로 요청 경로에서는
+    캐시된 목록만 읽습니다.
+    """
+    return await tool_registry.get_tools(MCP_SERVERS)
 
 
 # MCP 도구 정보 변환 함수
 async def convert_mcp_tools_to_info() -> List[Dict[str, Any]]:
     """MCP 도구를 사용자 친화적인 형식으로 변환합니다."""
-    tools = await get_mcp_tools()
-    tools_info = []
-    for tool in tools:
-        try:
-            tool_info = {
-                "name": getattr(tool, "name", "Unknown"),
-                "description": getattr(tool, "description", "설명 없음"),
-                "parameters": [],
-            }
-            if hasattr(tool, "args_schema") and tool.args_schema is not None:
-                schema_props = getattr(tool.args_schema, "schema", {}).get(
-                    "properties", {}
-                )
-                if schema_props:
-                    tool_info["parameters"] = list(schema_props.keys())
-            tools_info.append(tool_info)
-        except Exception as e:
-            logger.info(f"도구 정보 변환 중 오류: {str(e)}")
-    return tools_info
+    return tools_to_info(await get_mcp_tools())
 
 
 async def get_llm():
-    """LLM 모델을 초기화하고 반환합니다."""
-
-    import vertexai
-
-    vertexai.init(
-        project=settings.gcp_project_id,
-        location=settings.gcp_vertexai_location,
-    )
-
-    global _llm_instance
-    if _llm_instance is None:
-        model_name = os.environ.get("VERTEX_MODEL", "gemini-2.0-flash")
-        print(f"LLM 모델 초기화: {model_name}")
-        _llm_instance = ChatVertexAI(
-            model=model_name, temperature=0.1, max_output_tokens=8190
-        )
-    return _llm_instance
+    """LLM 모델을 반환합니다 (모든 에이전트가 공유, 설정에 따라 가짜 LLM)."""
+    return await get_shared_llm()
 
 async def generate_prompt() -> str:
-    """사용자 요청에 따른 프롬프트를 생성합니다."""
+    """사용자 요청에 따른 프롬프트를 생성합니다.
+
+    렌더링 결과는 프롬프트 파일과 도구 목록이 바뀔 때까지 캐시됩니다.
+    """
     try:
-        tools_info = await convert_mcp_tools_to_info()
-        tools_text = "\n".join(
-            [
-                f"{i+1}. {tool['name']}: {tool['description']}"
-                for i, tool in enumerate(tools_info)
-            ]
-        )
-        if not tools_text:
-            tools_text = (
-                "현재 사용 가능한 도구가 없습니다. MCP 서버 연결을 확인하세요."
-            )
+        tools = await get_mcp_tools()
     except Exception as e:
         print(f"도구 정보 가져오기 중 오류 발생: {str(e)}")
-        tools_text = "도구 정보를 가져오는 중 오류가 발생했습니다. MCP 서버 연결을 확인하세요."
-    
+        tools = None
+
     prompt_path = os.path.join(
         os.path.dirname(__file__), "../prompts/general_agent.txt"
     )
-    async with aiofiles.open(prompt_path, mode="r", encoding="utf-8") as f:
-        prompt_template = await f.read()
-    
-    # 단순 문자열 대체 사용
-    prompt = prompt_template.replace("{tools}", tools_text)
-    
-    # 템플릿 변수 충돌 방지를 위해 중괄호 이스케이프 처리
-    # MCP 도구 설명에서 나올 수 있는 중괄호를 이중 중괄호로 변경
-    import re
-    # {변수명} 패턴을 {{변수명}}으로 변경 (단, {tools}는 제외)
-    prompt = re.sub(r'\{([^}]+)\}', lambda m: '{{' + m.group(1) + '}}' if m.group(1) != 'tools' else m.group(0), prompt)
-    
-    return prompt
+    return await prompt_cache.render(prompt_path, tools)
 
 
 # 계획 생성 함수
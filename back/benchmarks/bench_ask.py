@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+/ask 엔드포인트 종단간(end-to-end) 부하 벤치마크
+
+실제 LLM 대신 결정적인 가짜 LLM(``utils.llm_provider.ScriptedChatModel``)을,
+실제 MCP 서버(mcp/*.py)를 서브프로세스로 띄워 사용하므로 네트워크/과금 없이
+라우팅·handoff·도구 호출·체크포인트 경로 전체를 재현 가능하게 측정합니다.
+
+사용법 (back/ 디렉터리에서):
+    python benchmarks/bench_ask.py --requests 200 --concurrency 16
+    python benchmarks/bench_ask.py --base-url http://localhost:8000   # 실행 중인 서버 대상
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+BACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MCP_DIR = os.path.join(os.path.dirname(BACK_DIR), "mcp")
+sys.path.insert(0, BACK_DIR)
+
+# (파일, 포트) - mcp/start_all_servers.py 와 동일
+MCP_SERVERS = [
+    ("general_consulting_server.py", 10001),
+    ("schedule_server.py", 10002),
+    ("calendar_server.py", 10003),
+    ("memo_server.py", 10005),
+    ("note_storage_server.py", 10006),
+    ("health_server.py", 10008),
+    ("fitness_server.py", 10009),
+]
+
+NODE_NAMES = ("general", "schedule", "memo", "health")
+
+# 의도별 질의 (가짜 LLM 스크립트의 키워드와 맞춤)
+QUERIES = [
+    "이번 주 일정 알려줘",
+    "내일 회의 약속 있어?",
+    "프로젝트 메모 찾아줘",
+    "오늘 할일 목록 보여줘",
+    "최근 운동 기록 알려줘",
+    "이번 달 건강 상태 어때?",
+    "안녕하세요, 무엇을 도와줄 수 있나요?",
+    "비밀번호를 잊어버렸어요",
+]
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _port_open(port: int) -> bool:
+    with socket.socket() as s:
+        s.settimeout(0.2)
+        return s.connect_ex(("127.0.0.1", port)) == 0
+
+
+def start_mcp_servers(timeout: float = 30.0) -> List[subprocess.Popen]:
+    """아직 떠 있지 않은 MCP 서버를 띄우고 포트가 열릴 때까지 기다립니다."""
+    processes = []
+    for filename, port in MCP_SERVERS:
+        if _port_open(port):
+            continue
+        processes.append(
+            subprocess.Popen(
+                [sys.executable, filename],
+                cwd=MCP_DIR,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        )
+    deadline = time.monotonic() + timeout
+    while not all(_port_open(port) for _, port in MCP_SERVERS):
+        if time.monotonic() > deadline:
+            stop_processes(processes)
+            raise RuntimeError("MCP 서버가 제시간에 시작되지 않았습니다")
+        time.sleep(0.2)
+    return processes
+
+
+def stop_processes(processes: List[subprocess.Popen]) -> None:
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def make_node_timer():
+    """swarm 최상위 노드별 실행 시간을 모으는 콜백 핸들러를 만듭니다."""
+    from langchain_core.callbacks import AsyncCallbackHandler
+
+    class NodeTimer(AsyncCallbackHandler):
+        def __init__(self) -> None:
+            self.started: Dict[UUID, tuple] = {}
+            self.durations: Dict[str, List[float]] = defaultdict(list)
+
+        async def on_chain_start(
+            self, serialized: Any, inputs: Any, *, run_id: UUID,
+            metadata: Optional[Dict[str, Any]] = None, name: Optional[str] = None,
+            **kwargs: Any,
+        ) -> None:
+            metadata = metadata or {}
+            ns = metadata.get("langgraph_checkpoint_ns") or ""
+            if name in NODE_NAMES and metadata.get("langgraph_node") == name and "|" not in ns:
+                self.started[run_id] = (name, time.perf_counter())
+
+        async def _finish(self, run_id: UUID) -> None:
+            entry = self.started.pop(run_id, None)
+            if entry is not None:
+                self.durations[entry[0]].append(time.perf_counter() - entry[1])
+
+        async def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+            await self._finish(run_id)
+
+        async def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+            await self._finish(run_id)
+
+    return NodeTimer()
+
+
+async def run_load(client, args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    plan = [
+        (f"bench-{rng.randrange(args.sessions)}", rng.choice(QUERIES))
+        for _ in range(args.requests)
+    ]
+    latencies: List[float] = []
+    errors: Dict[str, int] = defaultdict(int)
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    async def worker() -> None:
+        while True:
+            try:
+                session_id, message = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/ask",
+                    json={"session_id": session_id, "message": message, "agent_mode": "bench"},
+                )
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors[str(response.status_code)] += 1
+            except Exception as e:
+                errors[type(e).__name__] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"latencies": latencies, "errors": dict(errors), "elapsed": elapsed}
+
+
+def report(result: Dict[str, Any], node_timer=None) -> None:
+    latencies = result["latencies"]
+    print(f"\n요청 {len(latencies)}건 성공, 실패 {sum(result['errors'].values())}건 {result['errors'] or ''}")
+    print(f"소요 {result['elapsed']:.2f}s, 처리량 {len(latencies) / result['elapsed']:.1f} req/s")
+    if latencies:
+        print(
+            "지연(ms) "
+            f"p50={percentile(latencies, 50) * 1000:.1f} "
+            f"p95={percentile(latencies, 95) * 1000:.1f} "
+            f"p99={percentile(latencies, 99) * 1000:.1f} "
+            f"max={max(latencies) * 1000:.1f}"
+        )
+    if node_timer is not None and node_timer.durations:
+        print("\n노드별 실행 시간(ms)")
+        for name, values in sorted(node_timer.durations.items()):
+            print(
+                f"  {name:<9} n={len(values):<5} "
+                f"mean={statistics.mean(values) * 1000:.1f} "
+                f"p95={percentile(values, 95) * 1000:.1f} "
+                f"total={sum(values):.2f}s"
+            )
+
+
+async def main(args) -> None:
+    import httpx
+
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+            report(await run_load(client, args))
+        return
+
+    # 서버 모듈 import 전에 설정을 덮어쓴다 (pydantic-settings 는 환경 변수 우선)
+    os.environ["LLM_ENABLED"] = "false"
+    os.environ["LANGFUSE_ENABLED"] = "false"
+    os.environ["FAKE_LLM_LATENCY"] = str(args.llm_latency)
+    os.environ.setdefault("CHECKPOINTER_BACKEND", "memory")
+    # 처리량 측정이 목적이므로 세션별 요청 한도는 기본으로 끈다 (환경 변수로 켤 수 있음)
+    os.environ.setdefault("SESSION_RATE_LIMIT", "0")
+    os.chdir(BACK_DIR)
+
+    import logging
+
+    import server
+
+    logging.disable(logging.INFO)
+    node_timer = make_node_timer()
+    server.runner.callbacks.append(node_timer)
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with server.app.router.lifespan_context(server.app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=args.timeout
+        ) as client:
+            if args.warmup:
+                warmup = argparse.Namespace(**{**vars(args), "requests": args.warmup})
+                await run_load(client, warmup)
+                node_timer.durations.clear()
+            result = await run_load(client, args)
+    report(result, node_timer)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/ask 종단간 부하 벤치마크")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--sessions", type=int, default=50, help="요청이 분산될 세션 수")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="가짜 LLM 호출당 지연(초)")
+    parser.add_argument("--warmup", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--base-url", help="실행 중인 서버를 대상으로 측정 (MCP/LLM 설정은 서버 측)")
+    parser.add_argument("--no-mcp", action="store_true", help="MCP 서버를 띄우지 않음 (이미 실행 중)")
+    args = parser.parse_args()
+
+    processes = [] if (args.no_mcp or args.base_url) else start_mcp_servers()
+    try:
+        asyncio.run(main(args))
+    finally:
+        stop_processes(processes)
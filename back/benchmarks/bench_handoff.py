@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+handoff 1회 비용 벤치마크 (대화 길이에 따른 변화)
+
+긴 합성 대화(1k~10k 메시지)에서 handoff 도구 하나를 실행할 때의 비용을
+예전 방식(``state["messages"] + [tool_message]`` 로 대화 전체를 update 에 담음)과
+현재 방식(새 메시지만 담고 병합은 ``add_messages`` 리듀서에 맡김)으로 비교합니다.
+
+측정 항목:
+    tool     - handoff 도구 실행 (Command 생성까지)
+    merge    - ``add_messages`` 로 상태에 병합
+    write    - update 직렬화 (체크포인트 put_writes 에 기록되는 양) 시간과 크기
+
+사용법 (back/ 디렉터리에서):
+    python benchmarks/bench_handoff.py
+    python benchmarks/bench_handoff.py --sizes 1000 5000 10000 --repeat 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Annotated, Callable, List
+
+BACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACK_DIR)
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage, convert_to_messages
+from langchain_core.tools import InjectedToolCallId, tool
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph import MessagesState
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import InjectedState
+from langgraph.types import Command
+
+from utils.handoff_tools import create_handoff_tool
+
+
+def create_legacy_handoff_tool(*, agent_name: str):
+    """예전 handoff 도구 - 대화 전체를 복사해 update 에 담는다."""
+    name = f"transfer_to_{agent_name}"
+
+    @tool(name, description=f"Transfer to {agent_name}")
+    def handoff_tool(
+        state: Annotated[MessagesState, InjectedState],
+        tool_call_id: Annotated[str, InjectedToolCallId],
+    ) -> Command:
+        tool_message = {
+            "role": "tool",
+            "content": f"Successfully transferred to {agent_name}",
+            "name": name,
+            "tool_call_id": tool_call_id,
+        }
+        return Command(
+            goto=agent_name,
+            graph=Command.PARENT,
+            update={"messages": state["messages"] + [tool_message]},
+        )
+
+    return handoff_tool
+
+
+def synthetic_history(size: int) -> List[BaseMessage]:
+    """체크포인트에서 읽은 것처럼 id 가 있는 합성 대화 (마지막은 handoff 호출)"""
+    messages: List[BaseMessage] = []
+    for i in range(size - 1):
+        if i % 2 == 0:
+            messages.append(HumanMessage(content=f"질문 {i}: 이번 주 일정과 메모를 정리해줘", id=f"h-{i}"))
+        else:
+            messages.append(AIMessage(content=f"답변 {i}: " + "정리된 내용입니다. " * 8, id=f"a-{i}"))
+    messages.append(
+        AIMessage(
+            content="",
+            id=f"a-{size - 1}",
+            tool_calls=[{"name": "transfer_to_schedule", "args": {}, "id": "call-handoff"}],
+        )
+    )
+    return messages
+
+
+def run_tool(handoff_tool, history: List[BaseMessage]) -> Command:
+    # ToolNode 와 같은 방식으로, 도구가 상태를 요구할 때만 주입해 실행
+    args = {"state": {"messages": history}} if "state" in handoff_tool.args_schema.model_fields else {}
+    return handoff_tool.invoke(
+        {"type": "tool_call", "name": handoff_tool.name, "args": args, "id": "call-handoff"}
+    )
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def measure(label: str, handoff_tool, history: List[BaseMessage], repeat: int, serde: JsonPlusSerializer) -> dict:
+    command = run_tool(handoff_tool, history)
+    update = convert_to_messages(command.update["messages"])
+    _, payload = serde.dumps_typed(update)
+
+    merged = add_messages(history, update)
+    assert len(merged) == len(history) + 1, f"{label}: 병합 결과가 올바르지 않습니다"
+    assert isinstance(merged[-1], ToolMessage)
+
+    return {
+        "label": label,
+        "tool": timed(lambda: run_tool(handoff_tool, history), repeat),
+        "merge": timed(lambda: add_messages(history, update), repeat),
+        "write": timed(lambda: serde.dumps_typed(update), repeat),
+        "bytes": len(payload),
+        "update_len": len(update),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="handoff 1회 비용 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    serde = JsonPlusSerializer()
+    legacy = create_legacy_handoff_tool(agent_name="schedule")
+    current = create_handoff_tool(agent_name="schedule")
+
+    print(f"{'messages':>8} {'variant':>7} {'update':>7} {'tool(ms)':>9} {'merge(ms)':>10} "
+          f"{'write(ms)':>10} {'write(KB)':>10}")
+    for size in args.sizes:
+        history = synthetic_history(size)
+        for label, handoff_tool in (("legacy", legacy), ("delta", current)):
+            r = measure(label, handoff_tool, history, args.repeat, serde)
+            print(f"{size:>8} {r['label']:>7} {r['update_len']:>7} {r['tool'] * 1000:>9.3f} "
+                  f"{r['merge'] * 1000:>10.3f} {r['write'] * 1000:>10.3f} {r['bytes'] / 1024:>10.1f}")
+
+    print("\nmerge 는 add_messages 가 기존 목록을 복사하므로 두 방식 모두 대화 길이에 비례하지만,")
+    print("delta 방식은 update 의 중복 제거/직렬화 비용이 사라집니다.")
+
+
+if __name__ == "__main__":
+    main()
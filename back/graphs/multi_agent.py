@@ -1,255 +1,338 @@
 import logging
-from typing import Literal
+from dataclasses import dataclass
+from typing import Annotated, Any, Awaitable, Callable
 from langgraph.graph import StateGraph, START, END, MessagesState
-from langgraph.prebuilt import create_react_agent
-from langgraph.types import Command
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.errors import ParentCommand
+from langgraph.types import Command, Send
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage, convert_to_messages
+from langgraph.checkpoint.base import BaseCheckpointSaver
 
 from agents.general_agent import get_llm, get_mcp_tools as get_general_tools, generate_prompt as generate_general_prompt
 from agents.report_agent import get_mcp_tools as get_schedule_tools, generate_prompt as generate_schedule_prompt
 from agents.research_agent import get_mcp_tools as get_memo_tools, generate_prompt as generate_memo_prompt
 from agents.health_agent import get_mcp_tools as get_health_tools, generate_prompt as generate_health_prompt
-from utils.handoff_tools import (
-    transfer_to_general, transfer_to_schedule, transfer_to_memo, transfer_to_health,
-    ask_general_for_help, ask_schedule_for_help, ask_memo_for_help, ask_health_for_help
+from utils.agent_registry import agent_registry
+from utils.checkpointer import create_checkpointer
+from utils.config import settings
+from utils.history import compact_history
+from utils.hop_guard import blocked_tool_messages, check_handoff, force_answer
+from utils.metrics import router_decisions
+from utils.planner import plan_subtasks
+from utils.router import pre_router
+from utils.semantic_cache import (
+    answer_to_cache,
+    cache_scope,
+    general_answer_cache,
+    pending_question,
+    store_scope,
 )
+from utils.handoff_tools import get_handoff_tools
 
 logger = logging.getLogger(__name__)
 
+def merge_subtask_results(left: list | None, right: list | None) -> list:
+    """병렬 작업 결과 리듀서 - None 이 오면 초기화 (턴 시작 시)"""
+    if right is None:
+        return []
+    return (left or []) + right
+
+
 class MultiAgentState(MessagesState):
     """Multi-agent state with last active agent tracking"""
     last_active_agent: str
+    # 클라이언트가 선택한 비서 모드 (general/schedule/memo/health)
+    agent_mode: str
+    # 창 밖으로 밀려난 앞쪽 메시지들의 누적 요약과 요약된 메시지 수
+    history_summary: str
+    history_summary_count: int
+    # 이번 턴에 실행된 에이전트 순서 (handoff 예산/순환 감지용, 턴 시작 시 초기화)
+    agent_path: list[str]
+    # 이번 턴의 프리라우팅 사유 (confident/uncertain/disabled/fanout)와 에이전트 오류 여부
+    route_reason: str
+    failed: bool
+    # 복합 요청을 병렬로 처리한 에이전트별 결과 (merge 노드가 합침)
+    subtask_results: Annotated[list[dict[str, Any]], merge_subtask_results]
 
-# 일반상담 에이전트
-async def call_general_agent(state: MultiAgentState) -> Command[Literal["general", "schedule", "memo", "health", "__end__"]]:
-    """일반상담 에이전트 호출"""
-    logger.info("일반상담 에이전트 실행 중...")
-    
-    try:
-        # 도구와 프롬프트 준비
-        llm = await get_llm()
-        tools = await get_general_tools()
-        handoff_tools = [transfer_to_schedule, transfer_to_memo, transfer_to_health, ask_schedule_for_help, ask_memo_for_help, ask_health_for_help]
-        all_tools = tools + handoff_tools
-        
-        prompt = await generate_general_prompt()
-        
-        # ReAct 에이전트 생성
-        agent = create_react_agent(llm, all_tools, prompt=prompt)
-        
-        # 에이전트 실행
-        response = await agent.ainvoke(state)
-        
-        # 응답에서 Command 확인 (핸드오프 시)
-        if "messages" in response and response["messages"]:
-            last_message = response["messages"][-1]
-            # ToolMessage에서 핸드오프 확인
-            if hasattr(last_message, 'name') and last_message.name in ['transfer_to_schedule', 'transfer_to_memo', 'transfer_to_health', 'ask_schedule_for_help', 'ask_memo_for_help', 'ask_health_for_help']:
-                logger.info(f"핸드오프 감지: {last_message.name}")
-                # 핸드오프 대상 결정
-                if 'schedule' in last_message.name:
-                    target = 'schedule'
-                elif 'memo' in last_message.name:
-                    target = 'memo'
-                elif 'health' in last_message.name:
-                    target = 'health'
-                else:
-                    target = '__end__'
-                
-                # 상태 업데이트하고 해당 에이전트로 이동
-                update = {**response, "last_active_agent": "general"}
-                return Command(update=update, goto=target)
-        
-        # 핸드오프가 없으면 END로 이동
-        update = {**response, "last_active_agent": "general"}
-        return Command(update=update)
-        
-    except Exception as e:
-        logger.error(f"일반상담 에이전트 실행 중 오류: {str(e)}")
-        return Command(
-            update={
-                "messages": [{"role": "assistant", "content": f"죄송합니다. 처리 중 오류가 발생했습니다: {str(e)}"}],
-                "last_active_agent": "general"
-            }
-        )
+# 프리라우터 / 플래너
+async def route_request(state: MultiAgentState) -> Command:
+    """요청을 담당 에이전트로 바로 보냅니다 (확신이 없으면 general).
 
-# 일정관리 에이전트
-async def call_schedule_agent(state: MultiAgentState) -> Command[Literal["general", "schedule", "memo", "health", "__end__"]]:
-    """일정관리 에이전트 호출"""
-    logger.info("일정관리 에이전트 실행 중...")
-    
-    try:
-        # 도구와 프롬프트 준비
-        llm = await get_llm()
-        tools = await get_schedule_tools()
-        handoff_tools = [transfer_to_general, transfer_to_memo, transfer_to_health, ask_general_for_help, ask_memo_for_help, ask_health_for_help]
-        all_tools = tools + handoff_tools
-        
-        prompt = await generate_schedule_prompt()
-        
-        # ReAct 에이전트 생성
-        agent = create_react_agent(llm, all_tools, prompt=prompt)
-        
-        # 에이전트 실행
-        response = await agent.ainvoke(state)
-        
-        # 응답에서 Command 확인 (핸드오프 시)
-        if "messages" in response and response["messages"]:
-            last_message = response["messages"][-1]
-            # ToolMessage에서 핸드오프 확인
-            if hasattr(last_message, 'name') and last_message.name in ['transfer_to_general', 'transfer_to_memo', 'transfer_to_health', 'ask_general_for_help', 'ask_memo_for_help', 'ask_health_for_help']:
-                logger.info(f"핸드오프 감지: {last_message.name}")
-                # 핸드오프 대상 결정
-                if 'general' in last_message.name:
-                    target = 'general'
-                elif 'memo' in last_message.name:
-                    target = 'memo'
-                elif 'health' in last_message.name:
-                    target = 'health'
-                else:
-                    target = '__end__'
-                
-                # 상태 업데이트하고 해당 에이전트로 이동
-                update = {**response, "last_active_agent": "schedule"}
-                return Command(update=update, goto=target)
-        
-        # 핸드오프가 없으면 END로 이동
-        update = {**response, "last_active_agent": "schedule"}
-        return Command(update=update)
-        
-    except Exception as e:
-        logger.error(f"일정관리 에이전트 실행 중 오류: {str(e)}")
-        return Command(
-            update={
-                "messages": [{"role": "assistant", "content": f"일정관리 중 오류가 발생했습니다: {str(e)}"}],
-                "last_active_agent": "schedule"
-            }
+    서로 다른 도메인 작업이 여러 개 섞인 요청이면 작업별로 ``Send`` 를 만들어
+    담당 에이전트들을 병렬로 실행합니다. 작업이 "아까 말한 회의" 처럼 이전 대화를
+    가리킬 수 있으므로, 대화 기록을 한 번 압축해 각 작업에 함께 넘깁니다.
+    """
+    # 턴 단위 상태 초기화
+    reset = {"agent_path": [], "subtask_results": None, "failed": False}
+    last_message = state["messages"][-1] if state.get("messages") else None
+    text = last_message.content if isinstance(last_message, HumanMessage) else ""
+    text = text if isinstance(text, str) else ""
+
+    if settings.fanout_enabled:
+        subtasks = plan_subtasks(text, pre_router, settings.fanout_max_subtasks)
+        if subtasks:
+            router_decisions.inc(target="fanout", reason="multi_intent")
+            logger.info(f"병렬 실행: {[s.agent for s in subtasks]}")
+            # 요약 갱신은 여기서 한 번만 하고, 압축 기록(현재 요청 포함)을 작업마다 전달
+            agent_input, history_update = await compact_history(state, await get_llm())
+            history = agent_input["messages"]
+            sends = [
+                Send("subtask", {"index": i, "agent": s.agent, "task": s.task, "history": history})
+                for i, s in enumerate(subtasks)
+            ]
+            return Command(goto=sends, update={**reset, **history_update, "route_reason": "fanout"})
+
+    if not settings.router_enabled:
+        return Command(goto="general", update={**reset, "route_reason": "disabled"})
+
+    decision = pre_router.route(
+        text,
+        agent_mode=state.get("agent_mode"),
+        last_active_agent=state.get("last_active_agent"),
+    )
+    router_decisions.inc(target=decision.target, reason=decision.reason)
+    logger.info(f"프리라우팅: {decision.target} ({decision.reason})")
+    return Command(goto=decision.target, update={**reset, "route_reason": decision.reason})
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """swarm 에이전트 하나의 정의 - 노드는 이 정의로부터 생성된다."""
+
+    name: str
+    label: str  # 로그용 이름
+    get_tools: Callable[[], Awaitable[list]]
+    generate_prompt: Callable[[], Awaitable[str]]
+    error_message: str  # {error} 자리에 예외 메시지
+    semantic_cache: bool = False
+
+
+# 에이전트 레지스트리 - 에이전트를 추가하려면 여기에 한 줄만 추가하면 된다.
+AGENT_SPECS: tuple[AgentSpec, ...] = (
+    AgentSpec(
+        "general", "일반상담", get_general_tools, generate_general_prompt,
+        "죄송합니다. 처리 중 오류가 발생했습니다: {error}", semantic_cache=True,
+    ),
+    AgentSpec(
+        "schedule", "일정관리", get_schedule_tools, generate_schedule_prompt,
+        "일정관리 중 오류가 발생했습니다: {error}",
+    ),
+    AgentSpec(
+        "memo", "메모관리", get_memo_tools, generate_memo_prompt,
+        "메모관리 중 오류가 발생했습니다: {error}",
+    ),
+    AgentSpec(
+        "health", "건강관리", get_health_tools, generate_health_prompt,
+        "건강관리 중 오류가 발생했습니다: {error}",
+    ),
+)
+AGENT_NAMES = tuple(spec.name for spec in AGENT_SPECS)
+SPECS_BY_NAME = {spec.name: spec for spec in AGENT_SPECS}
+
+# 병렬 작업 메시지 - 다른 도메인 작업은 다른 에이전트가 맡고 있음을 알린다
+SUBTASK_INSTRUCTION = (
+    "{task}\n\n(위 요청 중 나머지는 다른 에이전트가 동시에 처리하고 있으니 이 부분만 처리하고 간결하게 "
+    "답하세요. '아까', '그거' 같은 지시어는 이전 대화를 보고 해석하세요.)"
+)
+
+
+def _handoff_messages(command: Command) -> list:
+    """handoff Command 가 추가하는 메시지 (handoff 도구는 delta 만 보낸다)"""
+    update = command.update if isinstance(command.update, dict) else {}
+    return convert_to_messages(update.get("messages", []))
+
+
+def _dropped_tool_messages(messages: list, extra: list) -> list:
+    """handoff 와 함께 호출된 다른 도구들의 결과 자리를 채웁니다.
+
+    handoff 도구가 ``ParentCommand`` 를 올리면 같은 AIMessage 의 다른 도구 결과는
+    버려지므로, 응답 없는 tool_calls 가 남지 않게 자리표시 ToolMessage 를 만듭니다.
+    """
+    call_message = next((m for m in reversed(messages) if isinstance(m, AIMessage)), None)
+    if call_message is None or not call_message.tool_calls:
+        return []
+    answered = {m.tool_call_id for m in (*messages, *extra) if isinstance(m, ToolMessage)}
+    return [
+        ToolMessage(
+            content="다른 에이전트로 전환되어 이 도구의 결과를 받지 못했습니다.",
+            name=call["name"],
+            tool_call_id=call["id"],
         )
+        for call in call_message.tool_calls
+        if call["id"] not in answered
+    ]
 
-# 메모관리 에이전트
-async def call_memo_agent(state: MultiAgentState) -> Command[Literal["general", "schedule", "memo", "health", "__end__"]]:
-    """메모관리 에이전트 호출"""
-    logger.info("메모관리 에이전트 실행 중...")
-    
-    try:
-        # 도구와 프롬프트 준비
-        llm = await get_llm()
-        tools = await get_memo_tools()
-        handoff_tools = [transfer_to_general, transfer_to_schedule, transfer_to_health, ask_general_for_help, ask_schedule_for_help, ask_health_for_help]
-        all_tools = tools + handoff_tools
-        
-        prompt = await generate_memo_prompt()
-        
-        # ReAct 에이전트 생성
-        agent = create_react_agent(llm, all_tools, prompt=prompt)
-        
-        # 에이전트 실행
-        response = await agent.ainvoke(state)
-        
-        # 응답에서 Command 확인 (핸드오프 시)
-        if "messages" in response and response["messages"]:
-            last_message = response["messages"][-1]
-            # ToolMessage에서 핸드오프 확인
-            if hasattr(last_message, 'name') and last_message.name in ['transfer_to_general', 'transfer_to_schedule', 'transfer_to_health', 'ask_general_for_help', 'ask_schedule_for_help', 'ask_health_for_help']:
-                logger.info(f"핸드오프 감지: {last_message.name}")
-                # 핸드오프 대상 결정
-                if 'general' in last_message.name:
-                    target = 'general'  
-                elif 'schedule' in last_message.name:
-                    target = 'schedule'
-                elif 'health' in last_message.name:
-                    target = 'health'
-                else:
-                    target = '__end__'
-                
-                # 상태 업데이트하고 해당 에이전트로 이동
-                update = {**response, "last_active_agent": "memo"}
-                return Command(update=update, goto=target)
-        
-        # 핸드오프가 없으면 END로 이동
-        update = {**response, "last_active_agent": "memo"}
-        return Command(update=update)
-        
-    except Exception as e:
-        logger.error(f"메모관리 에이전트 실행 중 오류: {str(e)}")
-        return Command(
-            update={
-                "messages": [{"role": "assistant", "content": f"메모관리 중 오류가 발생했습니다: {str(e)}"}],
-                "last_active_agent": "memo"
+
+def make_agent_node(spec: AgentSpec, agent_names: tuple[str, ...]):
+    """에이전트 정의로부터 swarm 노드 함수를 만듭니다.
+
+    ReAct 에이전트 안에서 handoff 도구가 ``Command(graph=PARENT)`` 를 반환하면
+    ``ParentCommand`` 로 전파되므로, 그 Command 의 goto 를 그대로 사용하고
+    메시지는 에이전트 입력 이후 새로 생긴 것과 handoff 도구의 delta 만
+    상태에 반영합니다.
+    """
+    handoff_tools = get_handoff_tools(spec.name, agent_names)
+
+    async def call_agent(state: MultiAgentState) -> Command:
+        logger.info(f"{spec.label} 에이전트 실행 중...")
+        path = [*(state.get("agent_path") or []), spec.name]
+        question = None
+        try:
+            # 비슷한 질문에 대한 이전 답변이 있으면 LLM 호출 없이 반환
+            # (이전 대화가 없는 첫 질문만 - 그 밖의 턴은 답이 대화 맥락에 달려 있음)
+            scope = cache_scope(state["messages"], state.get("history_summary"))
+            if spec.semantic_cache and settings.semantic_cache_enabled and scope is not None:
+                question = pending_question(state["messages"])
+            if question:
+                hit = await general_answer_cache.lookup(question, scope)
+                if hit is not None:
+                    return Command(
+                        update={
+                            "messages": [AIMessage(content=hit.answer)],
+                            "last_active_agent": spec.name,
+                            "agent_path": path,
+                        }
+                    )
+
+            # 도구와 프롬프트 준비
+            llm = await get_llm()
+            all_tools = await spec.get_tools() + handoff_tools
+            prompt = await spec.generate_prompt()
+
+            # 컴파일된 ReAct 에이전트 재사용 (도구/프롬프트 변경 시에만 재빌드)
+            agent = await agent_registry.get_agent(spec.name, llm, all_tools, prompt)
+
+            # 대화 기록 압축 후 에이전트 실행
+            agent_input, history_update = await compact_history(state, llm)
+            values = agent_input
+            goto = None
+            extra: list = []
+            try:
+                async for values in agent.astream(agent_input, stream_mode="values"):
+                    pass
+            except ParentCommand as e:
+                # handoff 도구가 swarm 그래프로 올려 보낸 Command
+                command = e.args[0]
+                goto = command.goto
+                extra = _handoff_messages(command)
+                logger.info(f"핸드오프: {spec.name} → {goto}")
+
+            # 에이전트가 새로 만든 메시지만 상태에 반영
+            new_messages = values["messages"][len(agent_input["messages"]):]
+            if goto is not None:
+                new_messages = new_messages + _dropped_tool_messages(new_messages, extra)
+                reason = check_handoff(
+                    path, goto, settings.handoff_max_hops, settings.handoff_cycle_detection
+                )
+                if reason is None:
+                    update = {
+                        "messages": new_messages + extra,
+                        **history_update,
+                        "last_active_agent": spec.name,
+                        "agent_path": path,
+                    }
+                    return Command(update=update, goto=goto)
+                # hop 예산 초과/핑퐁: 전환 대신 현재 에이전트가 도구 없이 답변하고 턴 종료
+                new_messages = new_messages + blocked_tool_messages(extra, reason)
+                forced = await force_answer(
+                    llm, prompt, agent_input["messages"] + new_messages, spec.name, goto, reason
+                )
+                new_messages = new_messages + [forced]
+
+            update = {
+                "messages": new_messages,
+                **history_update,
+                "last_active_agent": spec.name,
+                "agent_path": path,
             }
-        )
 
-# 건강관리 에이전트
-async def call_health_agent(state: MultiAgentState) -> Command[Literal["general", "schedule", "memo", "health", "__end__"]]:
-    """건강관리 에이전트 호출"""
-    logger.info("건강관리 에이전트 실행 중...")
-    
+            # 핸드오프가 없으면 END로 이동
+            answer = answer_to_cache(new_messages) if question else None
+            target_scope = store_scope(scope, new_messages) if answer else None
+            if target_scope is not None:
+                await general_answer_cache.store(question, answer, target_scope)
+            return Command(update=update)
+
+        except Exception as e:
+            logger.error(f"{spec.label} 에이전트 실행 중 오류: {str(e)}")
+            return Command(
+                update={
+                    "messages": [{"role": "assistant", "content": spec.error_message.format(error=str(e))}],
+                    "last_active_agent": spec.name,
+                    "failed": True,
+                }
+            )
+
+    call_agent.__name__ = f"call_{spec.name}_agent"
+    call_agent.__doc__ = f"{spec.label} 에이전트 호출"
+    return call_agent
+
+
+async def run_subtask(task: dict[str, Any]) -> dict:
+    """복합 요청 중 한 작업을 담당 에이전트로 처리합니다 (``Send`` 로 병렬 실행).
+
+    다른 작업과 동시에 돌기 때문에 handoff 도구 없이 도메인 도구만 쓰고,
+    라우터가 압축해 넘긴 대화 기록(이번 요청 전체 포함) 뒤에 작업 메시지를 붙여 실행합니다.
+    대화 기록에는 남기지 않고 결과만 ``subtask_results`` 에 기록합니다.
+    """
+    spec = SPECS_BY_NAME[task["agent"]]
+    logger.info(f"{spec.label} 에이전트 병렬 작업: {task['task']}")
     try:
-        # 도구와 프롬프트 준비
         llm = await get_llm()
-        tools = await get_health_tools()
-        handoff_tools = [transfer_to_general, transfer_to_schedule, transfer_to_memo, ask_general_for_help, ask_schedule_for_help, ask_memo_for_help]
-        all_tools = tools + handoff_tools
-        
-        prompt = await generate_health_prompt()
-        
-        # ReAct 에이전트 생성
-        agent = create_react_agent(llm, all_tools, prompt=prompt)
-        
-        # 에이전트 실행
-        response = await agent.ainvoke(state)
-        
-        # 응답에서 Command 확인 (핸드오프 시)
-        if "messages" in response and response["messages"]:
-            last_message = response["messages"][-1]
-            # ToolMessage에서 핸드오프 확인
-            if hasattr(last_message, 'name') and last_message.name in ['transfer_to_general', 'transfer_to_schedule', 'transfer_to_memo', 'ask_general_for_help', 'ask_schedule_for_help', 'ask_memo_for_help']:
-                logger.info(f"핸드오프 감지: {last_message.name}")
-                # 핸드오프 대상 결정
-                if 'general' in last_message.name:
-                    target = 'general'  
-                elif 'schedule' in last_message.name:
-                    target = 'schedule'
-                elif 'memo' in last_message.name:
-                    target = 'memo'
-                else:
-                    target = '__end__'
-                
-                # 상태 업데이트하고 해당 에이전트로 이동
-                update = {**response, "last_active_agent": "health"}
-                return Command(update=update, goto=target)
-        
-        # 핸드오프가 없으면 END로 이동
-        update = {**response, "last_active_agent": "health"}
-        return Command(update=update)
-        
+        tools = await spec.get_tools()
+        prompt = await spec.generate_prompt()
+        agent = await agent_registry.get_agent(f"{spec.name}:subtask", llm, tools, prompt)
+        message = HumanMessage(content=SUBTASK_INSTRUCTION.format(task=task["task"]))
+        messages = [*(task.get("history") or []), message]
+        # 병렬 작업의 토큰은 서로 섞이므로 스트리밍하지 않는다 (merge 결과를 done 으로 전달)
+        result = await agent.ainvoke({"messages": messages}, config={"tags": ["nostream"]})
+        answer = result["messages"][-1].content
     except Exception as e:
-        logger.error(f"건강관리 에이전트 실행 중 오류: {str(e)}")
-        return Command(
-            update={
-                "messages": [{"role": "assistant", "content": f"건강관리 중 오류가 발생했습니다: {str(e)}"}],
-                "last_active_agent": "health"
-            }
-        )
+        logger.error(f"{spec.label} 병렬 작업 중 오류: {str(e)}")
+        answer = spec.error_message.format(error=str(e))
+    return {
+        "subtask_results": [
+            {"index": task["index"], "agent": spec.name, "label": spec.label, "answer": answer}
+        ]
+    }
+
+
+async def merge_subtasks(state: MultiAgentState) -> dict:
+    """병렬 작업 결과를 요청 순서대로 하나의 답변으로 합칩니다."""
+    results = sorted(state.get("subtask_results") or [], key=lambda r: r["index"])
+    content = "\n\n".join(f"[{r['label']}]\n{r['answer']}" for r in results)
+    return {
+        "messages": [AIMessage(content=content)],
+        # 여러 도메인에 걸친 턴이므로 다음 턴은 고정하지 않는다
+        "last_active_agent": "general",
+        "agent_path": [r["agent"] for r in results],
+    }
+
+
+def build_multi_agent_graph(checkpointer: BaseCheckpointSaver | None = None):
+    """Multi-agent swarm 그래프 빌드
 
-def build_multi_agent_graph():
-    """Multi-agent swarm 그래프 빌드"""
+    checkpointer 를 지정하지 않으면 설정(checkpointer_backend)에 따라 생성합니다.
+    """
     logger.info("Multi-agent swarm 그래프 빌드 시작")
     
     try:
         builder = StateGraph(MultiAgentState)
         
-        # 에이전트 노드들 추가 (human 노드 제거)
-        builder.add_node("general", call_general_agent)
-        builder.add_node("schedule", call_schedule_agent)
-        builder.add_node("memo", call_memo_agent)
-        builder.add_node("health", call_health_agent)
+        # 에이전트 노드들 추가 (레지스트리에서 생성)
+        builder.add_node("router", route_request, destinations=AGENT_NAMES + ("subtask",))
+        for spec in AGENT_SPECS:
+            builder.add_node(spec.name, make_agent_node(spec, AGENT_NAMES), destinations=AGENT_NAMES)
+        builder.add_node("subtask", run_subtask)
+        builder.add_node("merge", merge_subtasks)
         
-        # 항상 일반상담 에이전트로 시작
-        builder.add_edge(START, "general")
+        # 프리라우터가 담당 에이전트를 고르고, 확신이 없으면 일반상담 에이전트로 시작
+        builder.add_edge(START, "router")
+        # 복합 요청: 병렬 작업이 모두 끝나면 merge 에서 한 번 합치고 종료
+        builder.add_edge("subtask", "merge")
+        builder.add_edge("merge", END)
         
-        # 메모리 설정
-        checkpointer = MemorySaver()
+        # 체크포인터 설정
+        if checkpointer is None:
+            checkpointer = create_checkpointer()
         graph = builder.compile(checkpointer=checkpointer)
         
         logger.info("Multi-agent swarm 그래프 빌드 완료")
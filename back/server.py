@@ -1,20 +1,44 @@
+import json
+import time
 import uuid
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Literal, Optional
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
 from fastapi.middleware.cors import CORSMiddleware
 
+from utils.admission import AdmissionRejected, admission
 from utils.graph_runner import GraphRunner
+from utils.mcp_pool import mcp_pool
+from utils.metrics import CONTENT_TYPE, metrics
+from utils.llm_cache import llm_response_cache
+from utils.prompt_cache import prompt_cache
+from utils.semantic_cache import general_answer_cache
+from utils.tool_registry import tool_registry
 
 import logging
 
 logger = logging.getLogger("server")
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="Personal Assistant API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 모든 MCP 서버의 도구를 시작 시 병렬로 검색 (요청 경로에서 검색하지 않음)
+    await tool_registry.start()
+    yield
+    await tool_registry.aclose()
+    # 종료 시 메모리에 있는 세션을 디스크로 내보낸다 (재배포 후에도 유지)
+    await runner.aclose()
+    await mcp_pool.aclose()
+    await llm_response_cache.aclose()
+
+
+app = FastAPI(title="Personal Assistant API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +51,48 @@ app.add_middleware(
 runner = GraphRunner()
 
 
+def _collect_runtime_gauges():
+    """기존 컴포넌트의 상태 값을 스크레이프 시점에 게이지로 변환합니다."""
+    for key, value in runner.scheduler.stats().items():
+        yield f"scheduler_{key}", {}, value
+    for key, value in runner.single_flight.stats().items():
+        yield f"single_flight_{key}", {}, value
+    for key, value in admission.stats().items():
+        yield f"admission_{key}", {}, value
+    for server, health in mcp_pool.health().items():
+        yield "mcp_server_up", {"server": server}, 1 if health["state"] == "healthy" else 0
+        yield "mcp_server_in_flight", {"server": server}, health["in_flight"]
+        yield "mcp_server_reconnects", {"server": server}, health["reconnects"]
+    for server, status in tool_registry.status().items():
+        yield "tool_discovery_tool_count", {"server": server}, status["tool_count"]
+        yield "tool_discovery_failures", {"server": server}, status["failures"]
+        yield "tool_discovery_last_latency_seconds", {"server": server}, status["last_latency_seconds"]
+    if hasattr(runner.checkpointer, "stats"):
+        for key, value in runner.checkpointer.stats().items():
+            yield f"checkpointer_{key}", {}, value
+    yield "prompt_cache_hits", {}, prompt_cache.hits
+    yield "llm_cache_entries", {}, llm_response_cache.stats()["entries_in_memory"]
+    yield "llm_cache_hit_ratio", {}, llm_response_cache.stats()["hit_rate"]
+    yield "semantic_cache_entries", {}, len(general_answer_cache)
+    yield "prompt_cache_misses", {}, prompt_cache.misses
+
+
+metrics.collector(
+    _collect_runtime_gauges,
+    {
+        "scheduler_queue_depth": "세션 스케줄러 대기 중인 실행 수",
+        "scheduler_running": "현재 실행 중인 그래프 수",
+        "single_flight_shared": "진행 중인 동일 요청에 합쳐진 요청 수",
+        "admission_in_flight": "수락되어 처리 중인 요청 수",
+        "admission_queue_depth": "수락 대기열에서 기다리는 요청 수",
+        "single_flight_replayed": "멱등 키로 보관된 결과를 재응답한 요청 수",
+        "mcp_server_up": "MCP 세션 연결 상태 (1=healthy)",
+        "mcp_server_in_flight": "MCP 서버별 진행 중인 도구 호출 수",
+        "checkpointer_bytes_in_memory": "메모리에 있는 체크포인트 바이트 수",
+    },
+)
+
+
 class ChatRequest(BaseModel):
     session_id: Optional[str] = None
     message: str
@@ -39,30 +105,62 @@ class ChatResponse(BaseModel):
     # agent_mode: str
 
 
+def _rate_limit_key(req: ChatRequest, request: Request) -> str:
+    """세션별 요청 한도 키 (세션이 없는 요청은 클라이언트 주소 기준)"""
+    if req.session_id:
+        return req.session_id
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def _rejected(e: AdmissionRejected) -> HTTPException:
+    detail = "too many requests" if e.status_code == 429 else "server is overloaded"
+    return HTTPException(
+        status_code=e.status_code,
+        detail=f"{detail} ({e.reason})",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
 @app.get("/health")
 async def health_check():
     """서버 상태 확인"""
     return {
         "status": "healthy",
         "service": "personal_assistant",
-        "graph_runner_ready": runner is not None
+        "graph_runner_ready": runner is not None,
+        "scheduler": runner.scheduler.stats(),
+        "single_flight": runner.single_flight.stats(),
+        "admission": admission.stats(),
+        "mcp_servers": mcp_pool.health(),
+        "tool_discovery": tool_registry.status(),
+        "llm_cache": llm_response_cache.stats(),
+        "semantic_cache": general_answer_cache.stats(),
     }
 
 
 @app.post(
     "/ask", response_model=ChatResponse, summary="Process chat messages"
 )
-async def ask(req: ChatRequest):
+async def ask(
+    req: ChatRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     if not req.message.strip():
         raise HTTPException(status_code=400, detail="message is empty")
     logger.info(f"ask request: {req}")
     session = req.session_id or str(uuid.uuid4())
     try:
-        answer = await runner.ask(
-            session_id=session,
-            user_input=req.message,
-            agent_mode=req.agent_mode,
-        )
+        async with admission.slot(_rate_limit_key(req, request)):
+            answer = await runner.ask(
+                session_id=session,
+                user_input=req.message,
+                agent_mode=req.agent_mode,
+                idempotency_key=idempotency_key,
+            )
+    except AdmissionRejected as e:
+        logger.info(f"요청 거절 ({e.reason}): {session}")
+        raise _rejected(e)
     except Exception as e:
         logger.error(f"Error processing chat message: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -70,5 +168,90 @@ async def ask(req: ChatRequest):
     return ChatResponse(session_id=session, response=answer)
 
 
+
+@app.get("/metrics", summary="Prometheus metrics")
+async def metrics_endpoint():
+    """노드/도구/LLM/handoff 지연 히스토그램과 런타임 게이지 (Prometheus 텍스트 형식)"""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def _format_ndjson(event: Dict[str, Any]) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+@app.post("/ask/stream", summary="Stream chat responses token by token")
+async def ask_stream(
+    req: ChatRequest,
+    request: Request,
+    format: Literal["sse", "ndjson"] = "sse",
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """LLM 토큰, 도구 호출, handoff 이벤트를 발생 즉시 스트리밍합니다.
+
+    ``format=sse`` 이면 Server-Sent Events, ``format=ndjson`` 이면
+    줄 단위 JSON(chunked) 으로 응답합니다. ``Idempotency-Key`` 헤더가 같은
+    재요청은 그래프를 다시 실행하지 않고 이전 결과를 ``done`` 으로 돌려줍니다.
+    """
+    if not req.message.strip():
+        raise HTTPException(status_code=400, detail="message is empty")
+    logger.info(f"ask stream request: {req}")
+    session = req.session_id or str(uuid.uuid4())
+    formatter = _format_sse if format == "sse" else _format_ndjson
+
+    # 스트림을 시작하기 전에 수락 여부를 정해야 429/503 상태 코드로 응답할 수 있다
+    try:
+        await admission.acquire(_rate_limit_key(req, request))
+    except AdmissionRejected as e:
+        logger.info(f"요청 거절 ({e.reason}): {session}")
+        raise _rejected(e)
+    admitted_at = time.monotonic()
+
+    async def event_stream():
+        try:
+            yield formatter({"type": "start", "session_id": session})
+            async for event in runner.stream(
+                session_id=session,
+                user_input=req.message,
+                agent_mode=req.agent_mode,
+                idempotency_key=idempotency_key,
+            ):
+                yield formatter(event)
+        except Exception as e:
+            logger.error(f"Error streaming chat message: {e}")
+            yield formatter({"type": "error", "detail": "Internal server error"})
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return _AdmittedStreamingResponse(
+        event_stream(),
+        release=lambda: admission.release(time.monotonic() - admitted_at),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class _AdmittedStreamingResponse(StreamingResponse):
+    """응답 전송이 끝나면 (정상 종료, 연결 끊김, 취소 모두) 수락 슬롯을 반환하는 스트리밍 응답
+
+    생성기의 ``finally`` 는 생성기가 시작된 뒤에만 실행되므로, 첫 청크를 보내기 전에
+    클라이언트가 끊으면 슬롯이 새어 나간다. 응답 호출 전체를 감싸 항상 한 번 반환한다.
+    """
+
+    def __init__(self, content: Any, release: Callable[[], None], **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
 if __name__ == "__main__":  # pragma: no cover
     uvicorn.run("server:app", host="0.0.0.0", port=8800, reload=True)
\ No newline at end of file
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+from utils.config import settings
+from utils.metrics import admission_rejections, admission_wait_seconds
+
+logger = logging.getLogger("admission")
+
+
+class AdmissionRejected(Exception):
+    """과부하/요청 한도 초과로 요청을 받지 않을 때 (HTTP 상태 코드와 Retry-After 포함)"""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class TokenBucket:
+    """초당 ``rate`` 개씩 채워지고 최대 ``burst`` 개까지 쌓이는 토큰 버킷"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """토큰 하나를 꺼냅니다. 성공하면 0, 부족하면 다음 토큰까지 남은 초를 반환합니다."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """요청 수락 제어 (전역 동시 실행 한도 + 세션별 토큰 버킷 + 제한된 대기열)
+
+    1. 세션별 토큰 버킷이 비어 있으면 즉시 429 로 거절합니다.
+    2. 동시 실행 수가 ``max_in_flight`` 미만이면 바로 수락합니다.
+    3. 아니면 대기열(최대 ``max_queue``)에서 ``queue_timeout`` 초까지 기다리고,
+       대기열이 가득 찼거나 시간이 지나면 503 으로 거절합니다.
+
+    거절할 때는 최근 처리 시간으로 추정한 ``Retry-After`` 를 함께 돌려주므로
+    과부하 상황에서도 수락된 요청의 지연이 예측 가능하게 유지됩니다.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        session_rate: float,
+        session_burst: int,
+        max_sessions: int = 10000,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.max_sessions = max_sessions
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+        # 메트릭
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+        # 요청 처리 시간의 지수 이동 평균 (Retry-After 추정용)
+        self.avg_service_seconds = 1.0
+
+    def _reject(self, status_code: int, reason: str, retry_after: float) -> AdmissionRejected:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        admission_rejections.inc(reason=reason)
+        return AdmissionRejected(status_code, reason, retry_after)
+
+    def _bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.session_rate, self.session_burst)
+            if len(self._buckets) > self.max_sessions:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _queue_retry_after(self) -> float:
+        # 앞선 대기 요청들이 모두 빠질 때까지의 대략적인 시간
+        return self.avg_service_seconds * (self.waiting + 1) / self.max_in_flight
+
+    async def acquire(self, key: str) -> None:
+        """요청을 수락하거나 ``AdmissionRejected`` 를 발생시킵니다."""
+        if self.session_rate > 0:
+            wait = self._bucket(key).take()
+            if wait > 0:
+                raise self._reject(429, "rate_limited", wait)
+
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise self._reject(503, "queue_full", self._queue_retry_after())
+            queued = time.monotonic()
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject(503, "queue_timeout", self._queue_retry_after())
+            finally:
+                self.waiting -= 1
+            admission_wait_seconds.observe(time.monotonic() - queued)
+        else:
+            await self._semaphore.acquire()
+            admission_wait_seconds.observe(0.0)
+
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self, service_seconds: float) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+        self.avg_service_seconds += 0.1 * (service_seconds - self.avg_service_seconds)
+
+    @asynccontextmanager
+    async def slot(self, key: str) -> AsyncIterator[None]:
+        await self.acquire(key)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": sum(self.rejected.values()),
+            "avg_service_seconds": self.avg_service_seconds,
+        }
+
+
+# 프로세스 전역 수락 제어기
+admission = AdmissionController(
+    max_in_flight=settings.admission_max_in_flight,
+    max_queue=settings.admission_max_queue,
+    queue_timeout=settings.admission_queue_timeout,
+    session_rate=settings.session_rate_limit,
+    session_burst=settings.session_rate_burst,
+)
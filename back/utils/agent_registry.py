@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from langgraph.prebuilt import create_react_agent
+
+logger = logging.getLogger("agent_registry")
+
+
+@dataclass
+class _AgentEntry:
+    """컴파일된 에이전트와 빌드 당시의 입력(LLM, 도구, 프롬프트)"""
+
+    llm: Any
+    tools: Tuple[Any, ...]
+    prompt: Any
+    agent: Any
+
+    def matches(self, llm: Any, tools: Sequence[Any], prompt: Any) -> bool:
+        # 도구/LLM 은 캐시된 싱글톤 객체이므로 identity 비교로 충분하다.
+        if self.llm is not llm or len(self.tools) != len(tools):
+            return False
+        if any(a is not b for a, b in zip(self.tools, tools)):
+            return False
+        return self.prompt is prompt or self.prompt == prompt
+
+
+class AgentRegistry:
+    """프로세스 단위로 컴파일된 ReAct 에이전트를 보관하는 레지스트리
+
+    에이전트 이름별로 한 번만 ``create_react_agent`` 를 호출하고, 해당 에이전트의
+    MCP 도구 목록이나 프롬프트가 바뀐 경우에만 다시 빌드합니다.
+    모든 세션이 같은 인스턴스를 공유합니다.
+    """
+
+    def __init__(self, builder: Optional[Callable[..., Any]] = None) -> None:
+        self._builder = builder or (
+            lambda llm, tools, prompt: create_react_agent(llm, tools, prompt=prompt)
+        )
+        self._entries: Dict[str, _AgentEntry] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.build_count: Dict[str, int] = {}
+
+    def _lock_for(self, name: str) -> asyncio.Lock:
+        lock = self._locks.get(name)
+        if lock is None:
+            lock = self._locks[name] = asyncio.Lock()
+        return lock
+
+    async def get_agent(
+        self, name: str, llm: Any, tools: Sequence[Any], prompt: Any
+    ) -> Any:
+        """캐시된 에이전트를 반환하고, 입력이 바뀌었으면 다시 빌드합니다."""
+        entry = self._entries.get(name)
+        if entry is not None and entry.matches(llm, tools, prompt):
+            return entry.agent
+
+        async with self._lock_for(name):
+            # 락을 기다리는 동안 다른 코루틴이 이미 빌드했을 수 있다.
+            entry = self._entries.get(name)
+            if entry is not None and entry.matches(llm, tools, prompt):
+                return entry.agent
+
+            reason = "최초 빌드" if entry is None else "도구/프롬프트 변경"
+            logger.info(f"{name} 에이전트 빌드 ({reason}, 도구 {len(tools)}개)")
+            agent = self._builder(llm, list(tools), prompt)
+            self._entries[name] = _AgentEntry(llm, tuple(tools), prompt, agent)
+            self.build_count[name] = self.build_count.get(name, 0) + 1
+            return agent
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """특정 에이전트(또는 전체)의 캐시를 무효화합니다."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+
+# 프로세스 전역 레지스트리
+agent_registry = AgentRegistry()
@@ -0,0 +1,468 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from utils.config import settings
+
+logger = logging.getLogger("checkpointer")
+
+
+class SqliteCheckpointer(BaseCheckpointSaver):
+    """SQLite(WAL) 기반 비동기 체크포인터
+
+    ``AsyncSqliteSaver`` 는 실행 중인 이벤트 루프가 있어야 생성할 수 있으므로,
+    그래프 컴파일 시점(모듈 import)에는 껍데기만 만들고 첫 호출 때 연결합니다.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+        self._saver = None
+        self._init_lock: Optional[asyncio.Lock] = None
+
+    async def _get_saver(self):
+        if self._saver is not None:
+            return self._saver
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        async with self._init_lock:
+            if self._saver is None:
+                import aiosqlite
+                from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                # journal_mode=WAL 은 setup() 에서 설정된다.
+                saver = AsyncSqliteSaver(await aiosqlite.connect(self.path))
+                await saver.setup()
+                await saver.conn.execute("PRAGMA synchronous=NORMAL")
+                logger.info(f"SQLite 체크포인터 연결: {self.path}")
+                self._saver = saver
+        return self._saver
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await (await self._get_saver()).aget_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        saver = await self._get_saver()
+        async for item in saver.alist(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await (await self._get_saver()).aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await (await self._get_saver()).aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await (await self._get_saver()).adelete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: Any) -> str:
+        # MemorySaver/AsyncSqliteSaver 와 같은 버전 형식 - 계층 간 이동 시 호환
+        return MemorySaver.get_next_version(self, current, channel)
+
+    async def aclose(self) -> None:
+        if self._saver is not None:
+            await self._saver.conn.close()
+            self._saver = None
+
+
+def _typed_size(value: Any) -> int:
+    """serde.dumps_typed 결과 (type, bytes) 의 대략적인 크기"""
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[1], (bytes, bytearray)):
+        return len(value[1]) + len(value[0])
+    return 0
+
+
+class BoundedMemorySaver(MemorySaver):
+    """세션 수 / 바이트 예산 / 유휴 TTL 이 있는 인메모리 체크포인터
+
+    - 스레드마다 최근 ``keep_checkpoints`` 개의 체크포인트만 유지합니다.
+    - 세션 수나 메모리 예산을 넘으면 가장 오래 사용하지 않은 스레드부터,
+      ``idle_ttl`` 초 이상 유휴인 스레드는 예산과 무관하게 내보냅니다.
+    - ``spill`` 이 지정되면 내보낸 스레드의 최신 체크포인트를 디스크에
+      저장하고, 다시 접근할 때 메모리로 불러옵니다.
+    - 실행 중인 스레드(``active`` 로 표시)는 예산을 넘어도 내보내지 않습니다.
+      실행 도중 내보내면 이후 체크포인트가 참조할 채널 값이 사라집니다.
+
+    그래프는 비동기 API(aget_tuple/aput/...)만 사용하므로 예산 관리도
+    비동기 경로에서만 수행합니다.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_sessions: int = 1000,
+        max_bytes: int = 256 * 1024 * 1024,
+        idle_ttl: Optional[float] = None,
+        keep_checkpoints: int = 4,
+        spill: Optional[BaseCheckpointSaver] = None,
+    ) -> None:
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.keep_checkpoints = max(1, keep_checkpoints)
+        self.spill = spill
+
+        # thread_id → 마지막 접근 시각 (LRU 순서)
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        self._thread_bytes: Dict[str, int] = {}
+        self._blob_keys: Dict[str, set] = defaultdict(set)
+        self._write_keys: Dict[str, set] = defaultdict(set)
+        self._checkpoint_versions: Dict[Tuple[str, str, str], set] = {}
+        # thread_id → 진행 중인 실행 수 (내보내기 대상에서 제외)
+        self._active: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.evictions = 0
+        self.restores = 0
+        self._evict_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------
+    # 접근 추적 / 복원
+    # ------------------------------------------------------------------
+    @asynccontextmanager
+    async def active(self, thread_id: str) -> AsyncIterator[None]:
+        """이 블록 안에서 실행 중인 스레드는 내보내지 않습니다."""
+        self._active[thread_id] = self._active.get(thread_id, 0) + 1
+        try:
+            yield
+        finally:
+            remaining = self._active[thread_id] - 1
+            if remaining:
+                self._active[thread_id] = remaining
+            else:
+                del self._active[thread_id]
+
+    async def _touch(self, config: Optional[RunnableConfig]) -> None:
+        if not config:
+            return
+        thread_id = config["configurable"].get("thread_id")
+        if thread_id is None:
+            return
+        if thread_id not in self._last_access:
+            self._last_access[thread_id] = time.monotonic()
+            if self.spill is not None and thread_id not in self.storage:
+                await self._restore(thread_id)
+        else:
+            self._last_access[thread_id] = time.monotonic()
+            self._last_access.move_to_end(thread_id)
+
+    async def _restore(self, thread_id: str) -> None:
+        """디스크로 내보낸 스레드의 최신 체크포인트를 메모리로 불러옵니다."""
+        saved = await self.spill.aget_tuple(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        )
+        if saved is None:
+            return
+        parent_config = saved.parent_config or {
+            "configurable": {"thread_id": thread_id, "checkpoint_ns": ""}
+        }
+        self.put(
+            parent_config,
+            saved.checkpoint,
+            saved.metadata,
+            saved.checkpoint["channel_versions"],
+        )
+        self._put_pending_writes(saved.config, saved.pending_writes or [])
+        self.restores += 1
+        logger.info(f"체크포인트 복원: {thread_id}")
+
+    def _put_pending_writes(self, config: RunnableConfig, pending: Sequence[Tuple]) -> None:
+        by_task: Dict[str, list] = defaultdict(list)
+        for task_id, channel, value in pending:
+            by_task[task_id].append((channel, value))
+        for task_id, writes in by_task.items():
+            self.put_writes(config, writes, task_id)
+
+    # ------------------------------------------------------------------
+    # 스레드별 인덱스 / 크기 집계
+    # ------------------------------------------------------------------
+    def _add_bytes(self, thread_id: str, delta: int) -> None:
+        self._thread_bytes[thread_id] = self._thread_bytes.get(thread_id, 0) + delta
+        self.total_bytes += delta
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        saved, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+        size = _typed_size(saved) + _typed_size(saved_metadata)
+        blob_keys = self._blob_keys[thread_id]
+        for channel, version in new_versions.items():
+            key = (thread_id, checkpoint_ns, channel, version)
+            if key not in blob_keys:
+                blob_keys.add(key)
+                size += _typed_size(self.blobs[key])
+        self._checkpoint_versions[(thread_id, checkpoint_ns, checkpoint["id"])] = set(
+            checkpoint["channel_versions"].items()
+        )
+        self._add_bytes(thread_id, size)
+        return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        outer_key = (
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        before = self._writes_size(outer_key)
+        super().put_writes(config, writes, task_id, task_path)
+        self._write_keys[thread_id].add(outer_key)
+        self._add_bytes(thread_id, self._writes_size(outer_key) - before)
+
+    def _writes_size(self, outer_key: Tuple[str, str, str]) -> int:
+        writes = self.writes.get(outer_key)
+        return sum(_typed_size(w[2]) for w in writes.values()) if writes else 0
+
+    def delete_thread(self, thread_id: str) -> None:
+        # 전체 writes/blobs 를 훑지 않도록 스레드별 인덱스를 사용한다.
+        namespaces = self.storage.pop(thread_id, None) or {}
+        for ns, checkpoints in namespaces.items():
+            for checkpoint_id in checkpoints:
+                self._checkpoint_versions.pop((thread_id, ns, checkpoint_id), None)
+        for key in self._write_keys.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        for key in self._blob_keys.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+        self.total_bytes -= self._thread_bytes.pop(thread_id, 0)
+
+    # ------------------------------------------------------------------
+    # 예산 관리
+    # ------------------------------------------------------------------
+    def _drop_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> None:
+        saved, metadata, _ = self.storage[thread_id][checkpoint_ns].pop(checkpoint_id)
+        self._checkpoint_versions.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        outer_key = (thread_id, checkpoint_ns, checkpoint_id)
+        removed = _typed_size(saved) + _typed_size(metadata) + self._writes_size(outer_key)
+        self.writes.pop(outer_key, None)
+        self._write_keys[thread_id].discard(outer_key)
+        self._add_bytes(thread_id, -removed)
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """스레드/네임스페이스별로 최근 체크포인트 몇 개만 남깁니다."""
+        namespaces = self.storage.get(thread_id)
+        if not namespaces:
+            return
+        dropped = False
+        checkpoints = namespaces.get(checkpoint_ns)
+        if checkpoints and len(checkpoints) > self.keep_checkpoints:
+            for checkpoint_id in sorted(checkpoints)[: -self.keep_checkpoints]:
+                self._drop_checkpoint(thread_id, checkpoint_ns, checkpoint_id)
+            dropped = True
+
+        # 노드 내부에서 실행된 서브그래프 네임스페이스는 작업마다 새로 생기므로
+        # 최근 것만 유지한다.
+        nested = [ns for ns in namespaces if ns]
+        for ns in nested[: -self.keep_checkpoints]:
+            for checkpoint_id in list(namespaces[ns]):
+                self._drop_checkpoint(thread_id, ns, checkpoint_id)
+            del namespaces[ns]
+            dropped = True
+
+        if not dropped:
+            return
+        # 남은 체크포인트가 참조하지 않는 채널 값 제거
+        live = set()
+        for ns, checkpoints in namespaces.items():
+            for checkpoint_id in checkpoints:
+                versions = self._checkpoint_versions.get((thread_id, ns, checkpoint_id), ())
+                live.update((ns, channel, version) for channel, version in versions)
+        blob_keys = self._blob_keys[thread_id]
+        for key in [k for k in blob_keys if k[1:] not in live]:
+            blob_keys.discard(key)
+            self._add_bytes(thread_id, -_typed_size(self.blobs.pop(key, None)))
+
+    def _over_budget(self) -> bool:
+        return len(self._last_access) > self.max_sessions or self.total_bytes > self.max_bytes
+
+    async def _enforce_budget(self, current: Optional[str] = None) -> None:
+        if self._evict_lock.locked():
+            return
+        async with self._evict_lock:
+            now = time.monotonic()
+            for thread_id, last in list(self._last_access.items()):
+                expired = self.idle_ttl is not None and now - last > self.idle_ttl
+                if not expired and not self._over_budget():
+                    break
+                if thread_id == current or thread_id in self._active:
+                    continue
+                await self.evict(thread_id)
+
+    async def evict(self, thread_id: str) -> None:
+        """스레드를 메모리에서 내보냅니다 (spill 이 있으면 디스크에 저장)."""
+        if self.spill is not None:
+            snapshot = self.get_tuple(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+            )
+            if snapshot is not None:
+                await self._spill_tuple(snapshot)
+                # 저장하는 동안 새 체크포인트가 생겼으면 다음 기회로 미룬다.
+                latest = self.get_tuple(
+                    {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+                )
+                if latest is not None and latest.config != snapshot.config:
+                    return
+        self.delete_thread(thread_id)
+        self._last_access.pop(thread_id, None)
+        self.evictions += 1
+
+    async def _spill_tuple(self, snapshot: CheckpointTuple) -> None:
+        thread_id = snapshot.config["configurable"]["thread_id"]
+        parent_config = snapshot.parent_config or {
+            "configurable": {"thread_id": thread_id, "checkpoint_ns": ""}
+        }
+        config = await self.spill.aput(
+            parent_config,
+            snapshot.checkpoint,
+            snapshot.metadata,
+            snapshot.checkpoint["channel_versions"],
+        )
+        by_task: Dict[str, list] = defaultdict(list)
+        for task_id, channel, value in snapshot.pending_writes or []:
+            by_task[task_id].append((channel, value))
+        for task_id, writes in by_task.items():
+            await self.spill.aput_writes(config, writes, task_id)
+
+    async def aflush(self) -> None:
+        """메모리에 있는 모든 스레드를 디스크로 내보냅니다 (종료 시 호출)."""
+        if self.spill is None:
+            return
+        for thread_id in list(self._last_access):
+            await self.evict(thread_id)
+
+    # ------------------------------------------------------------------
+    # BaseCheckpointSaver 비동기 API
+    # ------------------------------------------------------------------
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        await self._touch(config)
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        await self._touch(config)
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        await self._touch(config)
+        result = self.put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        self._prune(thread_id, config["configurable"]["checkpoint_ns"])
+        await self._enforce_budget(current=thread_id)
+        return result
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self._touch(config)
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+        self._last_access.pop(thread_id, None)
+        if self.spill is not None:
+            await self.spill.adelete_thread(thread_id)
+
+    async def aclose(self) -> None:
+        await self.aflush()
+        if self.spill is not None and hasattr(self.spill, "aclose"):
+            await self.spill.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions_in_memory": len(self._last_access),
+            "bytes_in_memory": self.total_bytes,
+            "active_sessions": len(self._active),
+            "evictions": self.evictions,
+            "restores": self.restores,
+        }
+
+
+def create_checkpointer(backend: Optional[str] = None) -> BaseCheckpointSaver:
+    """설정에 맞는 체크포인터를 생성합니다.
+
+    - ``memory``: 제한 없는 MemorySaver (기존 동작)
+    - ``bounded``: 세션 수/바이트/TTL 예산이 있는 인메모리 + SQLite spill
+    - ``sqlite``: 모든 체크포인트를 SQLite 에 저장
+    """
+    backend = backend or settings.checkpointer_backend
+    if backend == "memory":
+        return MemorySaver()
+    if backend == "sqlite":
+        return SqliteCheckpointer(settings.checkpoint_db_path)
+    if backend == "bounded":
+        spill = (
+            SqliteCheckpointer(settings.checkpoint_db_path)
+            if settings.checkpoint_db_path
+            else None
+        )
+        return BoundedMemorySaver(
+            max_sessions=settings.checkpoint_max_sessions,
+            max_bytes=settings.checkpoint_max_bytes,
+            idle_ttl=settings.checkpoint_idle_ttl,
+            spill=spill,
+        )
+    raise ValueError(f"알 수 없는 체크포인터 백엔드: {backend}")
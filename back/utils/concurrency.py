@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger("concurrency")
+
+
+class _SessionLock:
+    __slots__ = ("lock", "refs")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.refs = 0
+
+
+class SessionScheduler:
+    """세션(thread_id) 단위 직렬화 + 전역 동시 실행 수 제한
+
+    같은 세션의 턴은 도착 순서대로 하나씩 실행되고, 서로 다른 세션은
+    ``max_concurrency`` 개까지 병렬로 실행됩니다. 세션 락을 먼저 잡은 뒤
+    전역 슬롯을 기다리므로, 자기 차례를 기다리는 턴이 전역 슬롯을
+    점유하지 않습니다.
+    """
+
+    def __init__(self, max_concurrency: int) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._sessions: Dict[str, _SessionLock] = {}
+
+        # 메트릭
+        self.running = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self, session_id: str) -> AsyncIterator[None]:
+        """세션 순서와 전역 동시성 한도를 지키며 실행 슬롯을 획득합니다."""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = self._sessions[session_id] = _SessionLock()
+        entry.refs += 1
+
+        enqueued_at = time.monotonic()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        acquired = False
+        try:
+            async with entry.lock:
+                async with self._semaphore:
+                    self.waiting -= 1
+                    acquired = True
+                    waited = time.monotonic() - enqueued_at
+                    self.total_wait_seconds += waited
+                    if waited > 1.0:
+                        logger.info(f"세션 {session_id} 실행 대기 {waited:.2f}s")
+                    self.running += 1
+                    try:
+                        yield
+                    finally:
+                        self.running -= 1
+                        self.completed += 1
+        finally:
+            if not acquired:
+                self.waiting -= 1
+            entry.refs -= 1
+            if entry.refs == 0:
+                self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, float]:
+        """큐 깊이 및 실행 현황"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "active_sessions": len(self._sessions),
+            "completed": self.completed,
+            "avg_wait_seconds": (
+                self.total_wait_seconds / self.completed if self.completed else 0.0
+            ),
+        }
+
+
+class SingleFlight:
+    """같은 키의 동시 요청을 한 번만 실행하고 결과를 공유합니다.
+
+    실행 중인 키로 요청이 오면 새로 실행하지 않고 진행 중인 실행의 결과를
+    기다립니다. ``remember`` 초를 주면 (멱등 키 요청) 완료된 결과를 그동안
+    보관했다가 같은 키의 재요청에 그대로 돌려줍니다. 실패한 실행은 보관하지
+    않습니다.
+    """
+
+    def __init__(self, max_remembered: int = 1024) -> None:
+        self.max_remembered = max_remembered
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._done: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+        # 메트릭
+        self.executed = 0
+        self.shared = 0
+        self.replayed = 0
+
+    def _remembered(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        entry = self._done.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            self._done.pop(key, None)
+            return None
+        return entry
+
+    def _remember(self, key: Hashable, result: Any, ttl: float) -> None:
+        self._done[key] = (time.monotonic() + ttl, result)
+        self._done.move_to_end(key)
+        while len(self._done) > self.max_remembered:
+            self._done.popitem(last=False)
+
+    def join(self, key: Hashable) -> Optional[asyncio.Future]:
+        """진행 중이거나 보관 중인 같은 키의 결과 (없으면 None)"""
+        entry = self._remembered(key)
+        if entry is not None:
+            self.replayed += 1
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(entry[1])
+            return future
+        future = self._inflight.get(key)
+        if future is not None:
+            self.shared += 1
+        return future
+
+    def _settle(self, key: Hashable, future: asyncio.Future, remember: float) -> None:
+        if self._inflight.get(key) is future:
+            self._inflight.pop(key, None)
+        if future.cancelled():
+            return
+        if future.exception() is None and remember > 0:
+            self._remember(key, future.result(), remember)
+
+    async def do(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]], remember: float = 0.0
+    ) -> Tuple[Any, bool]:
+        """``fn`` 을 키당 한 번만 실행합니다. (결과, 다른 요청과 공유했는지) 를 반환합니다.
+
+        실행은 별도 태스크에서 돌기 때문에 먼저 온 요청의 클라이언트가 끊겨도
+        중간에 취소되지 않고, 기다리던 요청들이 결과를 받습니다.
+        """
+        future = self.join(key)
+        if future is not None:
+            return await asyncio.shield(future), True
+
+        self.executed += 1
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._settle(key, t, remember))
+        return await asyncio.shield(task), False
+
+    @asynccontextmanager
+    async def lead(self, key: Hashable, remember: float = 0.0) -> AsyncIterator[asyncio.Future]:
+        """스트리밍처럼 호출자가 직접 실행하는 경우 - 결과 future 를 넘겨받아 채웁니다.
+
+        블록이 결과 없이 끝나면 기다리던 요청들은 오류를 받습니다.
+        """
+        self.executed += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            yield future
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            raise
+        finally:
+            if not future.done():
+                future.set_exception(RuntimeError("공유 중인 원 요청이 중단되었습니다"))
+            self._settle(key, future, remember)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "in_flight": len(self._inflight),
+            "remembered": len(self._done),
+            "executed": self.executed,
+            "shared": self.shared,
+            "replayed": self.replayed,
+        }
@@ -14,6 +14,43 @@ class Settings(BaseSettings):
     gcp_project_id: str = ""
     gcp_vertexai_location: str = "us-central1"
     model_name: str = "gemini-2.0-flash"
+    # llm_enabled=False 일 때 사용하는 가짜 LLM 의 호출당 지연 / 스트리밍 토큰 간 지연
+    fake_llm_latency: float = 0.05
+    fake_llm_token_delay: float = 0.0
+
+    # LLM 응답 캐시 (인메모리 LRU + SQLite TTL, 빈 경로면 메모리만 사용)
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 2048
+    llm_cache_ttl: float = 3600.0
+    llm_cache_db_path: str = "data/llm_cache.sqlite"
+
+    # general 에이전트 답변 의미 캐시 (임베더: "hashing"(오프라인) 또는 "vertexai")
+    semantic_cache_enabled: bool = True
+    semantic_cache_embedder: str = "hashing"
+    semantic_cache_embedding_model: str = "text-multilingual-embedding-002"
+    # hashing 임베더는 의미가 다른 질문("오늘/내일 날씨")도 0.68 전후가 나오므로 거의 같은 문장만 적중하도록
+    semantic_cache_threshold: float = 0.85
+    semantic_cache_ttl: float = 6 * 3600.0
+    semantic_cache_max_entries: int = 2000
+
+    # 프리라우터: 확신이 있으면 general 을 거치지 않고 담당 에이전트로 바로 보냄
+    router_enabled: bool = True
+    router_threshold: float = 0.18
+    router_margin: float = 0.08
+    router_mode_bonus: float = 0.25
+    router_sticky_bonus: float = 0.12
+    # (질문, 최종 응답 에이전트)를 쌓고 시작 시 분류기 학습에 사용 - 사용자 원문이 저장되므로 기본 비활성.
+    # 프리라우터가 확신해 바로 보낸 턴은 자기 판단이라 남기지 않고, general LLM/handoff 가 정한 라벨만 남긴다.
+    router_log_path: str = ""
+    router_log_max_bytes: int = 5 * 1024 * 1024
+
+    # 턴당 최대 handoff 횟수와 핑퐁(같은 전환 반복) 감지 - 걸리면 현재 에이전트가 바로 답변
+    handoff_max_hops: int = 3
+    handoff_cycle_detection: bool = True
+
+    # 복합 요청(서로 다른 도메인 작업 여러 개)을 담당 에이전트들에서 병렬 실행 후 합침
+    fanout_enabled: bool = True
+    fanout_max_subtasks: int = 3
 
     langfuse_enabled: bool
     langfuse_secret_key: str = ""
@@ -22,6 +59,47 @@ class Settings(BaseSettings):
 
     log_level: int = logging.INFO
 
+    # 동시에 실행할 수 있는 그래프 실행 수 (세션 단위로는 항상 순차 실행)
+    max_concurrent_runs: int = 16
+    # Idempotency-Key 가 있는 요청의 결과 보관 시간 (같은 키로 다시 오면 재실행 없이 응답)
+    idempotency_ttl: float = 300.0
+
+    # 수락 제어: 전역 동시 요청 한도, 대기열 크기/대기 시간, 세션별 초당 요청 수와 버스트
+    admission_max_in_flight: int = 64
+    admission_max_queue: int = 128
+    admission_queue_timeout: float = 10.0
+    session_rate_limit: float = 1.0
+    session_rate_burst: int = 5
+
+    # 체크포인터: "bounded"(인메모리 + SQLite spill), "sqlite", "memory"
+    checkpointer_backend: str = "bounded"
+    checkpoint_db_path: str = "data/checkpoints.sqlite"
+    checkpoint_max_sessions: int = 1000
+    checkpoint_max_bytes: int = 256 * 1024 * 1024
+    checkpoint_idle_ttl: float = 1800.0
+
+    # 에이전트 호출 전 대화 기록 압축
+    history_compaction_enabled: bool = True
+    history_max_tokens: int = 6000
+    history_summarize: bool = True
+    history_keep_tool_turns: int = 1
+    history_tool_payload_chars: int = 1500
+
+    # 공유 MCP 세션 풀
+    mcp_max_concurrency_per_server: int = 8
+    mcp_connect_timeout: float = 10.0
+    mcp_reconnect_initial_delay: float = 0.5
+    mcp_reconnect_max_delay: float = 30.0
+    # 도구 호출 응답 대기 시간 (도구 이름별 재정의: MCP_TOOL_TIMEOUTS='{"search_memos": 5}')
+    mcp_tool_timeout: float = 30.0
+    mcp_tool_timeouts: dict[str, float] = {}
+
+    # MCP 도구 검색 (시작 시 병렬 검색 + 백그라운드 갱신)
+    tool_discovery_interval: float = 300.0
+    tool_discovery_retry_delay: float = 2.0
+    tool_discovery_timeout: float = 15.0
+    tool_discovery_tick: float = 1.0
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     def __init__(self, *args: Any, **kwargs: Any):
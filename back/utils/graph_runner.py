@@ -1,32 +1,165 @@
 import asyncio
 import logging
 import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Hashable, Optional, Tuple
 
-from langgraph.checkpoint.memory import MemorySaver
 from langfuse.callback import CallbackHandler
 from langchain_core.messages import HumanMessage
+from langgraph.constants import NS_END, NS_SEP
 
 from graphs.multi_agent import build_multi_agent_graph
+from utils.concurrency import SessionScheduler, SingleFlight
+from utils.config import settings
+from utils.handoff_tools import get_handoff_target
+from utils.metrics import GraphMetricsHandler, graph_run_seconds
+from utils.router import append_example
 
 logger = logging.getLogger("runner")
 logging.basicConfig(level=logging.INFO)
-memory = MemorySaver()
 
 
 class GraphRunner:
     def __init__(self) -> None:
         # 새로운 multi-agent swarm 그래프 사용
         self._graph = build_multi_agent_graph()
-        self._lock = asyncio.Lock()
+        self.checkpointer = self._graph.checkpointer
+        self.node_names = tuple(n for n in self._graph.nodes if not n.startswith("__"))
+        # 같은 세션은 순서대로, 서로 다른 세션은 병렬로 실행
+        self.scheduler = SessionScheduler(settings.max_concurrent_runs)
+        # 같은 요청(중복 클릭/재실행)은 한 번만 실행하고 결과를 공유
+        self.single_flight = SingleFlight()
         self.langfuse_handler = CallbackHandler(
             public_key=os.environ.get("LANGFUSE_PUBLIC_KEY"),
             secret_key=os.environ.get("LANGFUSE_SECRET_KEY"),
             host=os.environ.get("LANGFUSE_HOST"),
         )
+        # 모든 실행에 붙일 콜백 (벤치마크 계측 등에서 추가)
+        self.callbacks = [self.langfuse_handler] if settings.langfuse_enabled else []
+        self._route_log_full = False
+
+    async def aclose(self) -> None:
+        """체크포인터를 정리합니다 (메모리의 세션은 디스크로 내보냄)."""
+        if hasattr(self.checkpointer, "aclose"):
+            await self.checkpointer.aclose()
+
+    def _config(self, session_id: str, handler: GraphMetricsHandler) -> Dict[str, Any]:
+        return {
+            "configurable": {"thread_id": session_id},
+            "callbacks": [*self.callbacks, handler],
+        }
+
+    @asynccontextmanager
+    async def _run_slot(self, session_id: str) -> AsyncIterator[None]:
+        """세션 실행 슬롯을 잡고, 실행하는 동안 체크포인터가 이 세션을 내보내지 않게 합니다."""
+        async with self.scheduler.slot(session_id):
+            if hasattr(self.checkpointer, "active"):
+                async with self.checkpointer.active(session_id):
+                    yield
+            else:
+                yield
+
+    @asynccontextmanager
+    async def _measure_run(self, endpoint: str) -> AsyncIterator[GraphMetricsHandler]:
+        """실행 한 번의 소요 시간과 노드/LLM/handoff 메트릭을 기록합니다."""
+        handler = GraphMetricsHandler(self.node_names)
+        started = time.perf_counter()
+        status = "error"
+        try:
+            yield handler
+            status = "ok"
+        finally:
+            graph_run_seconds.observe(
+                time.perf_counter() - started, endpoint=endpoint, status=status
+            )
+            handler.finish()
+
+    @staticmethod
+    def _build_input(user_input: str, agent_mode: str) -> Dict[str, Any]:
+        # last_active_agent 는 체크포인트 값을 유지해 프리라우터가 참고한다.
+        return {
+            "messages": [HumanMessage(content=user_input)],
+            "agent_mode": agent_mode,
+        }
+
+    @staticmethod
+    def _flight_key(
+        session_id: str, user_input: str, agent_mode: str, idempotency_key: Optional[str]
+    ) -> Tuple[Hashable, float]:
+        """single-flight 키와 완료 결과 보관 시간
+
+        멱등 키가 있으면 그 키로 ``idempotency_ttl`` 동안 결과를 보관하고,
+        없으면 진행 중인 동일 요청 (세션, 모드, 메시지) 만 합칩니다.
+        """
+        if idempotency_key:
+            return ("idempotency", session_id, idempotency_key), settings.idempotency_ttl
+        return ("request", session_id, agent_mode, user_input), 0.0
+
+    @staticmethod
+    def _route_label(values: Dict[str, Any]) -> Optional[str]:
+        """프리라우터 학습에 쓸 라벨 (최종 응답 에이전트), 믿을 수 없는 턴이면 None
+
+        - 오류로 끝난 턴, 병렬 처리한 복합 요청은 제외
+        - 프리라우터가 확신해 바로 보냈고 handoff 도 없었다면 라우터 자신의 판단이므로 제외
+          (general LLM 이 직접 답했거나 handoff 로 정해진 에이전트만 라벨로 씀)
+        """
+        agent = values.get("last_active_agent")
+        if not agent or values.get("failed") or values.get("subtask_results"):
+            return None
+        handed_off = len(values.get("agent_path") or []) > 1
+        if values.get("route_reason") == "confident" and not handed_off:
+            return None
+        return agent
+
+    async def _log_route(self, user_input: str, values: Dict[str, Any]) -> None:
+        """라벨을 라우팅 로그에 남깁니다 (설정한 경우에만, 파일 I/O 는 스레드에서)."""
+        if not settings.router_log_path:
+            return
+        agent = self._route_label(values)
+        if agent is None:
+            return
+        try:
+            written = await asyncio.to_thread(
+                append_example,
+                settings.router_log_path,
+                user_input,
+                agent,
+                settings.router_log_max_bytes,
+            )
+            if not written and not self._route_log_full:
+                self._route_log_full = True
+                logger.warning(f"라우팅 로그가 최대 크기에 도달해 더 기록하지 않습니다: {settings.router_log_path}")
+        except OSError as e:
+            logger.error(f"라우팅 로그 기록 중 오류: {e}")
+
+    @staticmethod
+    def _extract_response(result: Dict[str, Any]) -> str:
+        if "output" in result:
+            return result["output"]
+        if "messages" in result and result["messages"]:
+            # 마지막 메시지에서 응답 추출
+            last_message = result["messages"][-1]
+            return last_message.content if hasattr(last_message, 'content') else str(last_message)
+        return "죄송합니다. 응답을 처리하는 중 문제가 발생했습니다."
 
     async def ask(
-        self, *, session_id: str, user_input: str, agent_mode: str
+        self,
+        *,
+        session_id: str,
+        user_input: str,
+        agent_mode: str,
+        idempotency_key: Optional[str] = None,
     ) -> str:
+        key, remember = self._flight_key(session_id, user_input, agent_mode, idempotency_key)
+        response, shared = await self.single_flight.do(
+            key, lambda: self._ask(session_id, user_input, agent_mode), remember
+        )
+        if shared:
+            logger.info(f"중복 요청 합침: {session_id} '{user_input}'")
+        return response
+
+    async def _ask(self, session_id: str, user_input: str, agent_mode: str) -> str:
         logger.info(
             f"GraphRunner received user input: {user_input} "
             f"for session: {session_id}"
@@ -35,24 +168,16 @@ class GraphRunner:
         
         try:
             # multi-agent swarm 그래프 실행
-            state = {
-                "messages": [HumanMessage(content=user_input)],
-                "last_active_agent": "general",  # 항상 general로 시작
-            }
+            state = self._build_input(user_input, agent_mode)
             
-            config = {"configurable": {"thread_id": session_id},"callbacks": [self.langfuse_handler]}
-            
-            result = await self._graph.ainvoke(state, config)
+            async with self._run_slot(session_id):
+                async with self._measure_run("ask") as handler:
+                    config = self._config(session_id, handler)
+                    result = await self._graph.ainvoke(state, config)
             
             # 응답 추출
-            if "output" in result:
-                response = result["output"]
-            elif "messages" in result and result["messages"]:
-                # 마지막 메시지에서 응답 추출
-                last_message = result["messages"][-1]
-                response = last_message.content if hasattr(last_message, 'content') else str(last_message)
-            else:
-                response = "죄송합니다. 응답을 처리하는 중 문제가 발생했습니다."
+            response = self._extract_response(result)
+            await self._log_route(user_input, result)
             
             logger.info(f"response: {response}")
             return response
@@ -61,19 +186,124 @@ class GraphRunner:
             logger.error(f"Graph execution error: {e}")
             raise
     
-    async def stream(self, message: str, agent_mode: str, thread_id: str = "default"):
-        async with self._lock:
-            logger.info(f"Graph 실행 시작: {thread_id}")
+    async def stream(
+        self,
+        *,
+        session_id: str,
+        user_input: str,
+        agent_mode: str,
+        idempotency_key: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """그래프 실행 중 발생하는 이벤트를 토큰 단위로 스트리밍합니다.
+
+        ``astream_events`` 로 LLM 토큰, 도구 호출 시작/종료, 에이전트 간
+        handoff 를 발생 즉시 dict 이벤트로 내보내고, 마지막에 ``done``
+        이벤트로 최종 응답을 전달합니다. 같은 요청이 이미 실행 중이면
+        다시 실행하지 않고 그 결과만 ``done`` 으로 전달합니다.
+        """
+        key, remember = self._flight_key(session_id, user_input, agent_mode, idempotency_key)
+        existing = self.single_flight.join(key)
+        if existing is not None:
+            logger.info(f"중복 요청 합침: {session_id} '{user_input}'")
+            response = await asyncio.shield(existing)
+            yield {"type": "done", "session_id": session_id, "response": response, "deduplicated": True}
+            return
+
+        async with self.single_flight.lead(key, remember) as result:
+            async for event in self._stream(session_id, user_input, agent_mode):
+                if event["type"] == "done":
+                    result.set_result(event["response"])
+                yield event
+
+    async def _stream(
+        self, session_id: str, user_input: str, agent_mode: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        async with self._run_slot(session_id):
+            logger.info(f"Graph 실행 시작: {session_id}")
             logger.info(f"Agent 모드: {agent_mode}")
             
-            # multi-agent swarm 그래프 사용
-            state = {
-                "messages": [HumanMessage(content=message)],
-                "last_active_agent": "general",  # 항상 general로 시작
-            }
+            state = self._build_input(user_input, agent_mode)
+            async with self._measure_run("stream") as handler:
+                config = self._config(session_id, handler)
+                async for event in self._graph.astream_events(state, config, version="v2"):
+                    converted = _convert_event(event)
+                    if converted is not None:
+                        yield converted
             
-            config = {"configurable": {"thread_id": thread_id}}
-            
-            async for event in self._graph.astream(state, config):
-                logger.info(f"Graph event: {event}")
-                yield event
\ No newline at end of file
+            snapshot = await self._graph.aget_state(config)
+            response = self._extract_response(snapshot.values)
+            await self._log_route(user_input, snapshot.values)
+            logger.info(f"response: {response}")
+            yield {"type": "done", "session_id": session_id, "response": response}
+
+
+def _event_node(event: Dict[str, Any]) -> Optional[str]:
+    """이벤트가 발생한 swarm 노드 이름 (중첩 그래프면 최상위 노드)"""
+    metadata = event.get("metadata") or {}
+    ns = metadata.get("langgraph_checkpoint_ns") or ""
+    if ns:
+        return ns.split(NS_SEP)[0].split(NS_END)[0]
+    return metadata.get("langgraph_node")
+
+
+def _chunk_text(content: Any) -> str:
+    """AIMessageChunk.content (str 또는 part 리스트)에서 텍스트만 추출"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part if isinstance(part, str) else part.get("text", "")
+            for part in content
+            if isinstance(part, (str, dict))
+        )
+    return ""
+
+
+def _convert_event(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """astream_events(v2) 이벤트를 클라이언트용 이벤트로 변환합니다."""
+    kind = event["event"]
+    node = _event_node(event)
+
+    if kind == "on_chat_model_stream":
+        if "nostream" in (event.get("tags") or []):
+            return None
+        text = _chunk_text(event["data"]["chunk"].content)
+        if not text:
+            return None
+        return {"type": "token", "node": node, "content": text}
+
+    if kind == "on_tool_start":
+        return {
+            "type": "tool_start",
+            "node": node,
+            "name": event["name"],
+            "input": _jsonable(event["data"].get("input")),
+        }
+
+    if kind == "on_tool_end":
+        target = get_handoff_target(event["name"])
+        if target is not None:
+            return {"type": "handoff", "from": node, "to": target, "name": event["name"]}
+        output = event["data"].get("output")
+        return {
+            "type": "tool_end",
+            "node": node,
+            "name": event["name"],
+            "output": _chunk_text(getattr(output, "content", output)) or str(output),
+        }
+
+    return None
+
+
+def _jsonable(value: Any) -> Any:
+    """InjectedState 등 직렬화할 수 없는 값은 제외하고 반환"""
+    if isinstance(value, dict):
+        return {
+            k: _jsonable(v) for k, v in value.items()
+            if k not in ("state", "tool_call_id")
+        }
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return str(value)
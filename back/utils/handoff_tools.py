@@ -1,17 +1,25 @@
-from typing import Annotated, Literal
-from langchain_core.tools import tool, InjectedToolCallId
-from langgraph.prebuilt import InjectedState
-from langgraph.graph import MessagesState
+from typing import Annotated, Iterable, Literal
+from langchain_core.tools import BaseTool, tool, InjectedToolCallId
 from langgraph.types import Command
 
+# handoff 도구 이름 → 대상 에이전트 이름
+HANDOFF_TARGETS: dict[str, str] = {}
+# handoff 도구 이름 → 도구
+HANDOFF_TOOLS: dict[str, BaseTool] = {}
+
+
+def get_handoff_target(tool_name: str | None) -> str | None:
+    """도구 이름이 handoff 도구이면 대상 에이전트 이름을 반환합니다."""
+    return HANDOFF_TARGETS.get(tool_name) if tool_name else None
+
 def create_handoff_tool(*, agent_name: str, description: str | None = None):
     """에이전트 간 handoff를 위한 도구를 생성합니다."""
     name = f"transfer_to_{agent_name}"
     description = description or f"Transfer to {agent_name}"
+    HANDOFF_TARGETS[name] = agent_name
 
     @tool(name, description=description)
     def handoff_tool(
-        state: Annotated[MessagesState, InjectedState],
         tool_call_id: Annotated[str, InjectedToolCallId],
     ) -> Command:
         tool_message = {
@@ -20,16 +28,21 @@ def create_handoff_tool(*, agent_name: str, description: str | None = None):
             "name": name,
             "tool_call_id": tool_call_id,
         }
+        # 에이전트(ReAct 서브그래프)를 빠져나와 swarm 그래프에서 대상 노드로 이동.
+        # 새 메시지만 보내고 병합은 add_messages 리듀서에 맡긴다 (대화 전체를 복사하지 않음).
         return Command(
             goto=agent_name,
-            update={"messages": state["messages"] + [tool_message]}
+            graph=Command.PARENT,
+            update={"messages": [tool_message]}
         )
+    HANDOFF_TOOLS[name] = handoff_tool
     return handoff_tool
 
 def create_task_handoff_tool(*, agent_name: str, description: str | None = None):
     """특정 작업 설명과 함께 handoff하는 도구를 생성합니다."""
     name = f"ask_{agent_name}_for_help"
     description = description or f"Ask {agent_name} for help with specific task"
+    HANDOFF_TARGETS[name] = agent_name
 
     @tool(name, description=description)
     def task_handoff_tool(
@@ -37,7 +50,6 @@ def create_task_handoff_tool(*, agent_name: str, description: str | None = None)
             str,
             "Description of what the next agent should do, including all relevant context.",
         ],
-        state: Annotated[MessagesState, InjectedState],
         tool_call_id: Annotated[str, InjectedToolCallId],
     ) -> Command:
         # ToolMessage 추가 (tool call에 대한 응답)
@@ -51,15 +63,29 @@ def create_task_handoff_tool(*, agent_name: str, description: str | None = None)
         # 새로운 작업 메시지
         task_message = {"role": "user", "content": task_description}
         
-        # 현재 메시지들 + ToolMessage + 새로운 작업 메시지
-        updated_messages = state["messages"] + [tool_message, task_message]
-        
+        # ToolMessage + 새로운 작업 메시지 (delta 만)
         return Command(
             goto=agent_name,
-            update={"messages": updated_messages}
+            graph=Command.PARENT,
+            update={"messages": [tool_message, task_message]}
         )
+    HANDOFF_TOOLS[name] = task_handoff_tool
     return task_handoff_tool
 
+
+def get_handoff_tools(agent_name: str, agent_names: Iterable[str]) -> list[BaseTool]:
+    """``agent_name`` 이 다른 에이전트들로 넘길 때 쓰는 handoff 도구 목록
+
+    등록되지 않은 에이전트의 도구는 기본 설명으로 만들어 등록합니다.
+    """
+    others = [name for name in agent_names if name != agent_name]
+    tools = []
+    for name in others:
+        tools.append(HANDOFF_TOOLS.get(f"transfer_to_{name}") or create_handoff_tool(agent_name=name))
+    for name in others:
+        tools.append(HANDOFF_TOOLS.get(f"ask_{name}_for_help") or create_task_handoff_tool(agent_name=name))
+    return tools
+
 # 각 에이전트별 handoff tool 생성 - 개인비서 에이전트들
 transfer_to_general = create_handoff_tool(
     agent_name="general",
@@ -0,0 +1,145 @@
+import logging
+from typing import Any, Dict, List, Sequence, Tuple
+
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from utils.config import settings
+
+logger = logging.getLogger("history")
+
+SUMMARY_PREFIX = "[이전 대화 요약]"
+
+SUMMARY_INSTRUCTION = (
+    "다음은 사용자와 개인비서 사이의 이전 대화입니다. 이후 대화를 이어가는 데 "
+    "필요한 사실(일정, 메모, 건강 기록, 사용자의 선호와 요청, 진행 중인 작업)만 "
+    "빠짐없이 한국어로 간결하게 요약하세요."
+)
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else str(part.get("text", ""))
+        for part in content
+        if isinstance(part, (str, dict))
+    )
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """메시지 토큰 수 추정 (한국어 기준 약 2자당 1토큰 + 메시지 오버헤드)"""
+    size = len(_text(message))
+    if isinstance(message, AIMessage) and message.tool_calls:
+        size += len(str(message.tool_calls))
+    return size // 2 + 4
+
+
+def _turn_starts(messages: Sequence[BaseMessage]) -> List[int]:
+    """사용자 턴(HumanMessage)이 시작하는 인덱스 목록
+
+    창(window)을 턴 경계에서만 자르므로 AIMessage 의 tool_calls 와
+    대응하는 ToolMessage 가 분리되지 않습니다.
+    """
+    return [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)] or [0]
+
+
+def drop_stale_tool_payloads(
+    messages: Sequence[BaseMessage], keep_turns: int, max_chars: int
+) -> List[BaseMessage]:
+    """최근 ``keep_turns`` 턴 이전의 긴 도구 결과를 짧은 자리표시자로 바꿉니다."""
+    starts = _turn_starts(messages)
+    boundary = starts[-keep_turns] if keep_turns and len(starts) >= keep_turns else 0
+    compacted: List[BaseMessage] = []
+    for i, message in enumerate(messages):
+        if i < boundary and isinstance(message, ToolMessage):
+            text = _text(message)
+            if len(text) > max_chars:
+                message = message.model_copy(
+                    update={
+                        "content": f"{text[:200]}… [이전 도구 결과 {len(text)}자 생략]",
+                        "artifact": None,
+                    }
+                )
+        compacted.append(message)
+    return compacted
+
+
+def window_start(messages: Sequence[BaseMessage], max_tokens: int) -> int:
+    """토큰 예산 안에 들어가는 가장 오래된 턴의 시작 인덱스 (최신 턴은 항상 포함)"""
+    starts = _turn_starts(messages)
+    total = 0
+    start = len(messages)
+    for turn_start in reversed(starts):
+        turn_tokens = sum(estimate_tokens(m) for m in messages[turn_start:start])
+        if total and total + turn_tokens > max_tokens:
+            break
+        total += turn_tokens
+        start = turn_start
+    return start
+
+
+async def _summarize(llm: Any, previous: str, messages: Sequence[BaseMessage]) -> str:
+    lines = []
+    if previous:
+        lines.append(f"{SUMMARY_PREFIX}\n{previous}")
+    for message in messages:
+        text = _text(message)
+        if isinstance(message, AIMessage) and message.tool_calls:
+            names = ", ".join(call["name"] for call in message.tool_calls)
+            text = f"{text} (도구 호출: {names})".strip()
+        if text:
+            lines.append(f"{message.type}: {text}")
+    result = await llm.ainvoke(
+        [SystemMessage(content=SUMMARY_INSTRUCTION), HumanMessage(content="\n".join(lines))],
+        # 요약 토큰은 사용자 스트림에 노출하지 않는다.
+        config={"tags": ["nostream", "history_summary"]},
+    )
+    return _text(result).strip()
+
+
+async def compact_history(
+    state: Dict[str, Any], llm: Any
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """에이전트 호출 전에 대화 기록을 압축합니다.
+
+    Returns:
+        (에이전트 입력 state, 체크포인트에 저장할 state 업데이트)
+    """
+    messages: List[AnyMessage] = list(state.get("messages", []))
+    if not settings.history_compaction_enabled:
+        return state, {}
+
+    messages = drop_stale_tool_payloads(
+        messages, settings.history_keep_tool_turns, settings.history_tool_payload_chars
+    )
+    start = window_start(messages, settings.history_max_tokens)
+
+    summary = state.get("history_summary") or ""
+    summarized = state.get("history_summary_count") or 0
+    update: Dict[str, Any] = {}
+
+    if settings.history_summarize and start > summarized:
+        # 새로 창 밖으로 밀려난 메시지만 기존 요약에 이어 붙인다 (rolling summary)
+        try:
+            summary = await _summarize(llm, summary, messages[summarized:start])
+            summarized = start
+            update = {"history_summary": summary, "history_summary_count": summarized}
+            logger.info(f"대화 요약 갱신: 메시지 {summarized}개 요약")
+        except Exception as e:
+            logger.error(f"대화 요약 중 오류 (창만 적용): {str(e)}")
+
+    window = messages[start:]
+    if summary:
+        window = [HumanMessage(content=f"{SUMMARY_PREFIX}\n{summary}")] + window
+
+    if start:
+        logger.info(f"대화 기록 압축: {len(messages)}개 → {len(window)}개")
+    return {**state, "messages": window}, update
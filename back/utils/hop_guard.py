@@ -0,0 +1,70 @@
+import logging
+from typing import Any, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage
+
+from utils.metrics import handoff_blocks
+
+logger = logging.getLogger("hop_guard")
+
+BUDGET = "budget"
+CYCLE = "cycle"
+
+FORCED_ANSWER_INSTRUCTION = (
+    "다른 에이전트로 더 이상 전환할 수 없습니다. 지금까지의 대화와 도구 결과만으로 "
+    "사용자에게 최선의 답변을 한국어로 작성하세요. 처리하지 못한 부분이 있으면 솔직하게 알려주세요."
+)
+
+FALLBACK_ANSWER = "요청을 처리하는 중 에이전트 전환이 반복되어 중단했습니다. 요청을 조금 더 구체적으로 말씀해 주세요."
+
+
+def check_handoff(path: Sequence[str], target: str, max_hops: int, detect_cycles: bool = True) -> Optional[str]:
+    """이번 턴의 에이전트 경로(``path``, 현재 에이전트 포함)에서 ``target`` 으로의
+    handoff 를 막아야 하면 사유(``budget``/``cycle``)를, 허용하면 None 을 반환합니다.
+
+    같은 전환(A→B)이 한 턴 안에서 다시 나오면 핑퐁으로 판단합니다.
+    """
+    if len(path) > max_hops:
+        return BUDGET
+    if detect_cycles and path:
+        source = path[-1]
+        if target == source or (source, target) in zip(path, path[1:]):
+            return CYCLE
+    return None
+
+
+def blocked_tool_messages(extra: Sequence[BaseMessage], reason: str) -> List[BaseMessage]:
+    """handoff 도구 결과를 '전환 차단' 결과로 바꿉니다 (작업 메시지는 버림).
+
+    handoff tool call 에 대응하는 ToolMessage 는 남겨야 다음 LLM 호출이 유효합니다.
+    """
+    return [
+        ToolMessage(
+            content=f"전환이 차단되었습니다 ({reason}). 직접 답변하세요.",
+            name=message.name,
+            tool_call_id=message.tool_call_id,
+        )
+        for message in extra
+        if isinstance(message, ToolMessage)
+    ]
+
+
+async def force_answer(
+    llm: Any,
+    prompt: str,
+    messages: Sequence[BaseMessage],
+    source: str,
+    target: str,
+    reason: str,
+) -> AIMessage:
+    """handoff 가 차단되었을 때 도구 없이 LLM 을 한 번 호출해 최종 답변을 만듭니다."""
+    handoff_blocks.inc(source=source, target=target, reason=reason)
+    logger.warning(f"핸드오프 차단 ({reason}): {source} → {target}, 강제 답변 생성")
+    try:
+        system = SystemMessage(content=f"{prompt}\n\n{FORCED_ANSWER_INSTRUCTION}")
+        result = await llm.ainvoke([system, *messages])
+        if isinstance(result.content, str) and result.content.strip():
+            return AIMessage(content=result.content)
+    except Exception as e:
+        logger.error(f"강제 답변 생성 중 오류: {str(e)}")
+    return AIMessage(content=FALLBACK_ANSWER)
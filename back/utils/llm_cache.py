@@ -0,0 +1,355 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.load import dumps, loads
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from utils.config import settings
+from utils.metrics import llm_cache_lookups
+
+logger = logging.getLogger("llm_cache")
+
+# 상태를 바꾸는 MCP 도구 이름 접두사 (mcp/*.py 의 create_/update_/delete_ ... 도구)
+MUTATING_TOOL_PREFIXES = (
+    "add_", "create_", "delete_", "update_", "log_", "restore_", "save_",
+)
+
+
+def is_mutating_tool(name: Optional[str]) -> bool:
+    return bool(name) and name.startswith(MUTATING_TOOL_PREFIXES)
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return " ".join(content.split())
+    return content
+
+
+def _normalize_message(message: BaseMessage) -> List[Any]:
+    """캐시 키용 메시지 표현 - 메시지/도구 호출 id 등 실행마다 바뀌는 값은 제외"""
+    entry: List[Any] = [message.type, _normalize_content(message.content)]
+    if isinstance(message, AIMessage) and message.tool_calls:
+        entry.append([[call["name"], call["args"]] for call in message.tool_calls])
+    if isinstance(message, ToolMessage):
+        entry.append(message.name)
+    return entry
+
+
+def cache_key(messages: Sequence[BaseMessage], params: Dict[str, Any]) -> str:
+    """시스템 프롬프트, 도구 스키마, 메시지, 모델 파라미터의 안정적인 해시"""
+    payload = json.dumps(
+        [params, [_normalize_message(m) for m in messages]],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _current_turn(messages: Sequence[BaseMessage]) -> Sequence[BaseMessage]:
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return messages[i + 1:]
+    return messages
+
+
+def touches_mutation(messages: Sequence[BaseMessage]) -> bool:
+    """현재 턴에서 상태를 바꾸는 도구를 호출했는지 여부"""
+    for message in _current_turn(messages):
+        if isinstance(message, ToolMessage) and is_mutating_tool(message.name):
+            return True
+    return False
+
+
+def _fresh_message(message: AIMessage) -> AIMessage:
+    """캐시된 메시지의 복사본 (메시지 id 제거, 도구 호출 id 새로 발급)
+
+    같은 id 의 메시지가 ``add_messages`` 에서 기존 메시지를 덮어쓰지 않도록 한다.
+    """
+    update: Dict[str, Any] = {"id": None}
+    if message.tool_calls:
+        update["tool_calls"] = [
+            {**call, "id": f"call_{uuid.uuid4().hex[:24]}"} for call in message.tool_calls
+        ]
+    return message.model_copy(update=update, deep=True)
+
+
+class LLMResponseCache:
+    """2단계 LLM 응답 캐시 (인메모리 LRU + SQLite TTL)
+
+    메모리 적중은 이벤트 루프를 벗어나지 않고 즉시 반환하며, 메모리에
+    없으면 SQLite 를 조회해 적중 시 메모리로 올립니다.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, db_path: Optional[str]) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._conn = None
+        self._init_lock: Optional[asyncio.Lock] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    async def _get_conn(self):
+        if not self.db_path:
+            return None
+        if self._conn is not None:
+            return self._conn
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        async with self._init_lock:
+            if self._conn is None:
+                import aiosqlite
+
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                conn = await aiosqlite.connect(self.db_path)
+                await conn.execute("PRAGMA journal_mode=WAL")
+                await conn.execute("PRAGMA synchronous=NORMAL")
+                await conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                await conn.commit()
+                logger.info(f"LLM 응답 캐시 SQLite 연결: {self.db_path}")
+                self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, message: AIMessage, expires_at: float) -> None:
+        self._memory[key] = (expires_at, message)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[AIMessage]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                llm_cache_lookups.inc(result="memory_hit")
+                return _fresh_message(entry[1])
+            del self._memory[key]
+
+        try:
+            conn = await self._get_conn()
+            if conn is not None:
+                async with conn.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ) as cursor:
+                    row = await cursor.fetchone()
+                if row is not None:
+                    message = loads(row[0])
+                    self._remember(key, message, row[1])
+                    self.disk_hits += 1
+                    llm_cache_lookups.inc(result="disk_hit")
+                    return _fresh_message(message)
+        except Exception as e:
+            logger.error(f"LLM 캐시 조회 중 오류: {str(e)}")
+
+        self.misses += 1
+        llm_cache_lookups.inc(result="miss")
+        return None
+
+    async def put(self, key: str, message: AIMessage) -> None:
+        expires_at = time.time() + self.ttl
+        message = message.model_copy(update={"id": None})
+        self._remember(key, message, expires_at)
+        try:
+            conn = await self._get_conn()
+            if conn is not None:
+                await conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, dumps(message), expires_at),
+                )
+                await conn.commit()
+        except Exception as e:
+            logger.error(f"LLM 캐시 저장 중 오류: {str(e)}")
+
+    def bypass(self) -> None:
+        self.bypassed += 1
+        llm_cache_lookups.inc(result="bypass")
+
+    async def purge_expired(self) -> int:
+        now = time.time()
+        for key in [k for k, (expires_at, _) in self._memory.items() if expires_at <= now]:
+            del self._memory[key]
+        conn = await self._get_conn()
+        if conn is None:
+            return 0
+        cursor = await conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        await conn.commit()
+        return cursor.rowcount
+
+    async def aclose(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries_in_memory": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+
+class CachedChatModel(BaseChatModel):
+    """모든 에이전트가 공유하는 채팅 모델 앞단의 응답 캐시
+
+    ``bind_tools`` 는 내부 모델의 도구 변환을 그대로 쓰고, 호출 시 넘어오는
+    도구 스키마/파라미터를 캐시 키에 포함합니다. 상태를 바꾸는 도구를
+    호출하거나 그 결과를 다루는 턴은 캐시하지 않습니다.
+    """
+
+    model: BaseChatModel
+    response_cache: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return self.model._llm_type
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return self.model._identifying_params
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        bound = self.model.bind_tools(tools, **kwargs)
+        return self.bind(**getattr(bound, "kwargs", {}))
+
+    def _key(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> str:
+        params = {"model": self._identifying_params, "stop": stop, **kwargs}
+        return cache_key(messages, params)
+
+    @staticmethod
+    def _cacheable(message: BaseMessage) -> bool:
+        if not isinstance(message, AIMessage):
+            return False
+        if any(is_mutating_tool(call["name"]) for call in message.tool_calls):
+            return False
+        return bool(message.content or message.tool_calls)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # 동기 경로는 사용하지 않으므로 캐시 없이 위임한다.
+        return self.model._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if touches_mutation(messages):
+            self.response_cache.bypass()
+            return await self.model._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+        key = self._key(messages, stop, kwargs)
+        cached = await self.response_cache.get(key)
+        if cached is not None:
+            return ChatResult(generations=[ChatGeneration(message=cached)])
+
+        result = await self.model._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        if len(result.generations) == 1 and self._cacheable(result.generations[0].message):
+            await self.response_cache.put(key, result.generations[0].message)
+        return result
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        yield from self.model._stream(messages, stop=stop, **kwargs)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        # 토큰 콜백은 BaseChatModel 이 yield 된 청크마다 호출하므로
+        # 내부 모델에는 run_manager 를 넘기지 않는다 (중복 토큰 방지).
+        if touches_mutation(messages):
+            self.response_cache.bypass()
+            async for chunk in self.model._astream(messages, stop=stop, **kwargs):
+                yield chunk
+            return
+
+        key = self._key(messages, stop, kwargs)
+        cached = await self.response_cache.get(key)
+        if cached is not None:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=cached.content,
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"], ensure_ascii=False),
+                            "id": call["id"],
+                            "index": i,
+                        }
+                        for i, call in enumerate(cached.tool_calls)
+                    ],
+                    usage_metadata=cached.usage_metadata,
+                    response_metadata=cached.response_metadata,
+                )
+            )
+            return
+
+        aggregated: Optional[ChatGenerationChunk] = None
+        async for chunk in self.model._astream(messages, stop=stop, **kwargs):
+            aggregated = chunk if aggregated is None else aggregated + chunk
+            yield chunk
+        if aggregated is not None:
+            message = AIMessage(
+                content=aggregated.message.content,
+                tool_calls=aggregated.message.tool_calls,
+                usage_metadata=aggregated.message.usage_metadata,
+                response_metadata=aggregated.message.response_metadata,
+            )
+            if self._cacheable(message):
+                await self.response_cache.put(key, message)
+
+
+# 프로세스 전역 LLM 응답 캐시
+llm_response_cache = LLMResponseCache(
+    max_entries=settings.llm_cache_max_entries,
+    ttl=settings.llm_cache_ttl,
+    db_path=settings.llm_cache_db_path or None,
+)
@@ -0,0 +1,309 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import (
+    ChatGeneration,
+    ChatGenerationChunk,
+    ChatResult,
+)
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+from utils.config import settings
+from utils.handoff_tools import get_handoff_target
+
+logger = logging.getLogger("llm_provider")
+
+AGENT_NAMES = ("general", "schedule", "memo", "health")
+
+# 싱글톤 인스턴스
+_llm_instance = None
+
+
+@dataclass(frozen=True)
+class ScriptedIntent:
+    """키워드로 판별하는 의도와, 그 의도를 담당하는 에이전트가 호출할 도구들"""
+
+    agent: str
+    keywords: Sequence[str]
+    tool_calls: Sequence[tuple] = field(default_factory=tuple)
+
+
+# 기본 스크립트 - mcp/ 의 실제 서버 도구 이름을 사용한다.
+DEFAULT_SCRIPT: List[ScriptedIntent] = [
+    ScriptedIntent(
+        "schedule",
+        ("일정", "약속", "회의", "캘린더", "스케줄"),
+        (("list_schedules", {"limit": 5}),),
+    ),
+    ScriptedIntent(
+        "memo",
+        ("메모", "할일", "할 일", "노트", "기록해"),
+        (("search_memos", {"keyword": "{query}", "limit": 5}), ("list_todos", {"limit": 5})),
+    ),
+    ScriptedIntent(
+        "health",
+        ("운동", "건강", "식단", "수면", "체중", "복용"),
+        (("get_health_records", {"limit": 5}), ("get_workouts", {"limit": 5})),
+    ),
+    ScriptedIntent("general", (), (("search_faq", {"keyword": "{query}"}),)),
+]
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else str(part.get("text", ""))
+        for part in content
+        if isinstance(part, (str, dict))
+    )
+
+
+class ScriptedChatModel(BaseChatModel):
+    """네트워크 없이 동작하는 결정적(deterministic) 가짜 채팅 모델
+
+    마지막 사용자 요청을 키워드 스크립트로 분류해, 현재 에이전트가 담당하지
+    않는 의도면 ``transfer_to_*`` handoff 를, 담당하는 의도면 스크립트의
+    MCP 도구 호출을 내보내고, 도구 결과를 받으면 최종 답변을 만듭니다.
+    ``latency`` 로 호출당 지연을, ``token_delay`` 로 스트리밍 토큰 간
+    지연을 흉내 냅니다.
+    """
+
+    latency: float = 0.0
+    token_delay: float = 0.0
+    script: List[ScriptedIntent] = Field(default_factory=lambda: list(DEFAULT_SCRIPT))
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": "scripted-fake"}
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Any = None, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    # ------------------------------------------------------------------
+    # 스크립트
+    # ------------------------------------------------------------------
+    def classify(self, query: str) -> ScriptedIntent:
+        for intent in self.script:
+            if any(keyword in query for keyword in intent.keywords):
+                return intent
+        return next((i for i in self.script if not i.keywords), self.script[-1])
+
+    def _respond(self, messages: List[BaseMessage], tools: Optional[List[Dict]]) -> AIMessage:
+        tool_names = [t["function"]["name"] for t in tools or []]
+
+        # 현재 에이전트 구간: 마지막 사용자 메시지 또는 handoff 결과 이후
+        start = 0
+        for i, message in enumerate(messages):
+            if isinstance(message, HumanMessage) or (
+                isinstance(message, ToolMessage) and get_handoff_target(message.name)
+            ):
+                start = i + 1
+        query = next(
+            (_text(m) for m in reversed(messages) if isinstance(m, HumanMessage)), ""
+        )
+        tool_results = [m for m in messages[start:] if isinstance(m, ToolMessage)]
+
+        last = messages[-1] if messages else None
+        target = get_handoff_target(last.name) if isinstance(last, ToolMessage) else None
+        if target and tool_names and f"transfer_to_{target}" in tool_names:
+            # handoff 를 호출한 에이전트가 계속 실행된 경우 - 짧게 마무리한다
+            return AIMessage(
+                content=f"{target} 에이전트에게 요청을 전달했습니다.",
+                usage_metadata=self._usage(messages, 10),
+            )
+
+        if tool_results or not tool_names:
+            return self._answer(query, tool_results, messages)
+
+        intent = self.classify(query)
+        handoff = f"transfer_to_{intent.agent}"
+        if handoff in tool_names:
+            return self._tool_message(messages, [(handoff, {})])
+
+        calls = [
+            (name, {k: v.replace("{query}", query) if isinstance(v, str) else v
+                    for k, v in args.items()})
+            for name, args in intent.tool_calls
+            if name in tool_names
+        ]
+        if calls:
+            return self._tool_message(messages, calls)
+        return self._answer(query, [], messages)
+
+    def _tool_message(self, messages: List[BaseMessage], calls: List[tuple]) -> AIMessage:
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {"name": name, "args": args, "id": f"call_{len(messages)}_{i}"}
+                for i, (name, args) in enumerate(calls)
+            ],
+            usage_metadata=self._usage(messages, 10 * len(calls)),
+        )
+
+    def _answer(
+        self, query: str, tool_results: List[ToolMessage], messages: List[BaseMessage]
+    ) -> AIMessage:
+        lines = [f"'{query[:80]}' 요청을 처리했습니다."]
+        for result in tool_results:
+            lines.append(f"- {result.name}: {_text(result)[:120]}")
+        content = "\n".join(lines)
+        return AIMessage(
+            content=content, usage_metadata=self._usage(messages, len(content) // 2)
+        )
+
+    @staticmethod
+    def _usage(messages: List[BaseMessage], output_tokens: int) -> Dict[str, int]:
+        input_tokens = sum(len(_text(m)) for m in messages) // 2
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    # ------------------------------------------------------------------
+    # BaseChatModel
+    # ------------------------------------------------------------------
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        message = self._respond(messages, kwargs.get("tools"))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = self._respond(messages, kwargs.get("tools"))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        result = self._generate(messages, stop, run_manager, **kwargs)
+        yield from self._chunks(result.generations[0].message)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = self._respond(messages, kwargs.get("tools"))
+        for chunk in self._chunks(message):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            # 토큰 콜백은 BaseChatModel 이 yield 된 청크마다 호출한다.
+            yield chunk
+
+    @staticmethod
+    def _chunks(message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        if message.tool_calls:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"], ensure_ascii=False),
+                            "id": call["id"],
+                            "index": i,
+                        }
+                        for i, call in enumerate(message.tool_calls)
+                    ],
+                    usage_metadata=message.usage_metadata,
+                )
+            )
+            return
+        words = message.content.split(" ")
+        for i, word in enumerate(words):
+            last = i == len(words) - 1
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=word if last else word + " ",
+                    usage_metadata=message.usage_metadata if last else None,
+                )
+            )
+
+
+def _create_vertex_llm():
+    import vertexai
+    from langchain_google_vertexai import ChatVertexAI
+
+    vertexai.init(
+        project=settings.gcp_project_id,
+        location=settings.gcp_vertexai_location,
+    )
+    model_name = os.environ.get("VERTEX_MODEL", settings.model_name)
+    logger.info(f"LLM 모델 초기화: {model_name}")
+    return ChatVertexAI(model=model_name, temperature=0.1, max_output_tokens=8190)
+
+
+def create_llm():
+    """설정에 맞는 채팅 모델을 생성합니다.
+
+    ``llm_enabled`` 가 꺼져 있으면 네트워크 없이 동작하는
+    :class:`ScriptedChatModel` 을 사용하고, ``llm_cache_enabled`` 이면
+    응답 캐시로 감쌉니다.
+    """
+    if settings.llm_enabled:
+        llm = _create_vertex_llm()
+    else:
+        logger.info(f"가짜 LLM 사용 (지연 {settings.fake_llm_latency}s)")
+        llm = ScriptedChatModel(
+            latency=settings.fake_llm_latency, token_delay=settings.fake_llm_token_delay
+        )
+    if settings.llm_cache_enabled:
+        from utils.llm_cache import CachedChatModel, llm_response_cache
+
+        llm = CachedChatModel(model=llm, response_cache=llm_response_cache)
+    return llm
+
+
+async def get_llm():
+    """모든 에이전트가 공유하는 LLM 싱글톤을 반환합니다."""
+    global _llm_instance
+    if _llm_instance is None:
+        _llm_instance = create_llm()
+    return _llm_instance
@@ -0,0 +1,304 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import AsyncExitStack
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import anyio
+import httpx
+from langchain_core.tools import BaseTool, StructuredTool, ToolException
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import CallToolResult, TextContent
+
+from utils.config import settings
+from utils.metrics import mcp_tool_seconds, mcp_tool_wait_seconds
+
+logger = logging.getLogger("mcp_pool")
+
+# 세션(전송 계층)이 깨졌음을 뜻하는 예외 - 이때만 재연결하고, 그 밖의 오류(결과 검증/
+# 디코딩 실패 등)는 그 호출만 실패시켜 같은 서버의 다른 호출이 끊기지 않게 한다.
+SESSION_BROKEN_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    httpx.TransportError,
+    ConnectionError,
+)
+
+
+def _convert_call_tool_result(result: CallToolResult) -> Tuple[Any, Optional[list]]:
+    """MCP 도구 결과를 LangChain ``content_and_artifact`` 형식으로 변환합니다."""
+    text_contents = []
+    non_text_contents = []
+    for content in result.content:
+        if isinstance(content, TextContent):
+            text_contents.append(content.text)
+        else:
+            non_text_contents.append(content)
+
+    tool_content: Any = text_contents
+    if len(text_contents) == 1:
+        tool_content = text_contents[0]
+
+    if result.isError:
+        raise ToolException(tool_content)
+    return tool_content, non_text_contents or None
+
+
+class MCPServerConnection:
+    """MCP 서버 하나에 대한 장기 세션
+
+    세션은 전용 백그라운드 태스크 안에서 열고 닫습니다 (anyio 컨텍스트는
+    같은 태스크에서 진입/종료해야 하므로). 연결이 끊기면 지수 백오프로
+    재연결하고, 동시 도구 호출 수는 ``max_concurrency`` 로 제한합니다.
+    """
+
+    def __init__(self, name: str, connection: Dict[str, Any], max_concurrency: int) -> None:
+        self.name = name
+        self.connection = connection
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+        self.state = "idle"  # idle | connecting | healthy | unhealthy | closed
+        self.session: Optional[ClientSession] = None
+        self.last_error: Optional[str] = None
+        self.connected_at: Optional[float] = None
+        self.reconnects = 0
+        self.calls = 0
+        self.failures = 0
+        self.in_flight = 0
+
+        self._ready = asyncio.Event()
+        self._disconnected = asyncio.Event()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closed = False
+            self._task = asyncio.create_task(self._run(), name=f"mcp-{self.name}")
+
+    async def _open(self, stack: AsyncExitStack) -> ClientSession:
+        transport = self.connection.get("transport", "sse")
+        url = self.connection["url"]
+        if transport == "sse":
+            from mcp.client.sse import sse_client
+
+            read, write = await stack.enter_async_context(
+                sse_client(url, headers=self.connection.get("headers"))
+            )
+        elif transport == "streamable_http":
+            from mcp.client.streamable_http import streamablehttp_client
+
+            read, write, _ = await stack.enter_async_context(
+                streamablehttp_client(url, headers=self.connection.get("headers"))
+            )
+        else:
+            raise ValueError(f"지원하지 않는 MCP transport: {transport}")
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        return session
+
+    async def _run(self) -> None:
+        backoff = settings.mcp_reconnect_initial_delay
+        while not self._closed:
+            self.state = "connecting"
+            try:
+                async with AsyncExitStack() as stack:
+                    self.session = await self._open(stack)
+                    self.state = "healthy"
+                    self.connected_at = time.time()
+                    self.last_error = None
+                    backoff = settings.mcp_reconnect_initial_delay
+                    self._disconnected.clear()
+                    self._ready.set()
+                    logger.info(f"MCP 세션 연결: {self.name}")
+                    await self._disconnected.wait()
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                # anyio 는 ExceptionGroup 으로 감싸서 올리므로 실제 원인을 꺼낸다
+                while isinstance(e, BaseExceptionGroup) and e.exceptions:
+                    e = e.exceptions[0]
+                self.last_error = str(e) or type(e).__name__
+                logger.info(f"MCP 세션 오류 ({self.name}): {str(e)}")
+            finally:
+                self._ready.clear()
+                self.session = None
+
+            if self._closed:
+                break
+            self.state = "unhealthy"
+            self.reconnects += 1
+            delay = backoff * (1 + random.random() * 0.2)
+            logger.info(f"MCP 재연결 대기 ({self.name}): {delay:.1f}s")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, settings.mcp_reconnect_max_delay)
+        self.state = "closed"
+
+    async def get_session(self, timeout: Optional[float] = None) -> ClientSession:
+        self.start()
+        try:
+            await asyncio.wait_for(
+                self._ready.wait(), timeout or settings.mcp_connect_timeout
+            )
+        except asyncio.TimeoutError:
+            raise ConnectionError(
+                f"MCP 서버 '{self.name}' 에 연결할 수 없습니다: {self.last_error}"
+            )
+        return self.session
+
+    def mark_broken(self, error: BaseException) -> None:
+        """세션이 깨졌다고 판단되면 재연결을 요청합니다."""
+        self.last_error = str(error)
+        self.state = "unhealthy"
+        self._ready.clear()
+        self._disconnected.set()
+
+    async def call_tool(
+        self, tool_name: str, arguments: Dict[str, Any], timeout: Optional[float] = None
+    ) -> CallToolResult:
+        queued = time.perf_counter()
+        async with self.semaphore:
+            session = await self.get_session()
+            started = time.perf_counter()
+            mcp_tool_wait_seconds.observe(started - queued, server=self.name)
+            self.calls += 1
+            self.in_flight += 1
+            status = "error"
+            try:
+                result = await session.call_tool(
+                    tool_name,
+                    arguments,
+                    read_timeout_seconds=timedelta(seconds=timeout) if timeout else None,
+                )
+                status = "tool_error" if result.isError else "ok"
+                return result
+            except McpError as e:
+                # 서버가 정상 응답한 도구 오류 또는 응답 시간 초과 - 세션은 유지
+                self.failures += 1
+                if e.error.code == httpx.codes.REQUEST_TIMEOUT:
+                    status = "timeout"
+                    raise ToolException(
+                        f"도구 '{tool_name}' 응답 시간 초과 ({timeout:g}초). 다른 방법으로 답하세요."
+                    ) from e
+                raise
+            except SESSION_BROKEN_ERRORS as e:
+                self.failures += 1
+                self.mark_broken(e)
+                raise
+            except Exception:
+                self.failures += 1
+                raise
+            finally:
+                self.in_flight -= 1
+                mcp_tool_seconds.observe(
+                    time.perf_counter() - started, server=self.name, tool=tool_name, status=status
+                )
+
+    async def list_tools(self) -> list:
+        session = await self.get_session()
+        try:
+            return (await session.list_tools()).tools
+        except SESSION_BROKEN_ERRORS as e:
+            self.mark_broken(e)
+            raise
+
+    async def aclose(self) -> None:
+        self._closed = True
+        self._disconnected.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, 5)
+            except (asyncio.TimeoutError, Exception):
+                self._task.cancel()
+        self.state = "closed"
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "url": self.connection.get("url"),
+            "connected_at": self.connected_at,
+            "reconnects": self.reconnects,
+            "calls": self.calls,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+            "last_error": self.last_error,
+        }
+
+
+class MCPPoolClient:
+    """``MultiServerMCPClient`` 와 같은 모양의, 풀의 일부 서버에 대한 뷰"""
+
+    def __init__(self, pool: "MCPSessionPool", server_names: Iterable[str]) -> None:
+        self.pool = pool
+        self.server_names = list(server_names)
+
+    async def get_tools(self) -> List[BaseTool]:
+        return await self.pool.get_tools(self.server_names)
+
+
+class MCPSessionPool:
+    """프로세스 전역 MCP 세션 풀
+
+    모든 에이전트가 서버별 장기 세션 하나를 공유하며, 도구 호출은 그 세션
+    위에서 다중화됩니다. 도구 호출마다 SSE 핸드셰이크를 하지 않습니다.
+    """
+
+    def __init__(self) -> None:
+        self._servers: Dict[str, MCPServerConnection] = {}
+
+    def register(self, servers: Dict[str, Dict[str, Any]]) -> None:
+        for name, connection in servers.items():
+            existing = self._servers.get(name)
+            if existing is not None and existing.connection == connection:
+                continue
+            self._servers[name] = MCPServerConnection(
+                name, connection, settings.mcp_max_concurrency_per_server
+            )
+
+    def client(self, servers: Dict[str, Dict[str, Any]]) -> MCPPoolClient:
+        self.register(servers)
+        return MCPPoolClient(self, servers.keys())
+
+    def server(self, name: str) -> MCPServerConnection:
+        return self._servers[name]
+
+    async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]):
+        timeout = settings.mcp_tool_timeouts.get(tool_name, settings.mcp_tool_timeout)
+        return await self._servers[server_name].call_tool(tool_name, arguments, timeout)
+
+    def _wrap_tool(self, server_name: str, tool: Any) -> BaseTool:
+        async def call_tool(**arguments: Any) -> Tuple[Any, Optional[list]]:
+            result = await self.call_tool(server_name, tool.name, arguments)
+            return _convert_call_tool_result(result)
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description or "",
+            args_schema=tool.inputSchema,
+            coroutine=call_tool,
+            response_format="content_and_artifact",
+            metadata={"mcp_server": server_name},
+        )
+
+    async def get_server_tools(self, server_name: str) -> List[BaseTool]:
+        tools = await self._servers[server_name].list_tools()
+        return [self._wrap_tool(server_name, tool) for tool in tools]
+
+    async def get_tools(self, server_names: Optional[Iterable[str]] = None) -> List[BaseTool]:
+        """서버들의 도구 목록을 동시에 가져옵니다 (실패한 서버는 예외 전파)."""
+        names = list(server_names) if server_names is not None else list(self._servers)
+        results = await asyncio.gather(*(self.get_server_tools(name) for name in names))
+        return [tool for tools in results for tool in tools]
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        return {name: conn.health() for name, conn in self._servers.items()}
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(conn.aclose() for conn in self._servers.values()))
+
+
+# 프로세스 전역 MCP 세션 풀
+mcp_pool = MCPSessionPool()
@@ -0,0 +1,438 @@
+import bisect
+import logging
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langgraph.constants import NS_END, NS_SEP
+
+from utils.handoff_tools import get_handoff_target
+
+logger = logging.getLogger("metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 지연 시간(초) 버킷 - LLM 왕복(수 초)과 도구 호출(수 ms)을 모두 담는다
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 2048, 4096, 8192, 16384, 32768)
+HOP_BUCKETS = (0, 1, 2, 3, 4, 6, 8, 12)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key → [버킷별 개수..., 합계, 전체 개수]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                entry[index] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def count(self, **labels: Any) -> int:
+        entry = self._values.get(self._key(labels))
+        return int(entry[-1]) if entry else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(entry)) for key, entry in self._values.items())
+        lines = self.header()
+        for key, entry in items:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, entry):
+                cumulative += n
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames + ("le",), key + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {_format_value(entry[-1])}")
+            base = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{base} {_format_value(entry[-2])}")
+            lines.append(f"{self.name}_count{base} {_format_value(entry[-1])}")
+        return lines
+
+
+GaugeSample = Tuple[str, Dict[str, Any], float]
+
+
+class MetricsRegistry:
+    """Prometheus 텍스트 형식으로 노출하는 프로세스 내 메트릭 레지스트리
+
+    히스토그램/카운터는 요청 경로에서 직접 기록하고, 스케줄러·MCP 풀 등
+    이미 ``stats()`` 를 가진 컴포넌트의 값은 스크레이프 시점에 콜백으로
+    수집해 게이지로 내보냅니다.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[GaugeSample]]] = []
+        self._gauge_docs: Dict[str, str] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(
+        self,
+        collect: Callable[[], Iterable[GaugeSample]],
+        docs: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """스크레이프 시 ``(이름, 라벨, 값)`` 게이지 샘플을 돌려주는 콜백 등록"""
+        self._collectors.append(collect)
+        self._gauge_docs.update(docs or {})
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        gauges: Dict[str, List[str]] = {}
+        for collect in self._collectors:
+            try:
+                samples = list(collect())
+            except Exception as e:
+                logger.error(f"메트릭 수집 중 오류: {str(e)}")
+                continue
+            for name, labels, value in samples:
+                if value is None:
+                    continue
+                gauges.setdefault(name, []).append(
+                    f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} "
+                    f"{_format_value(float(value))}"
+                )
+        for name, samples in gauges.items():
+            lines.append(f"# HELP {name} {self._gauge_docs.get(name, name)}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전역 메트릭 레지스트리
+metrics = MetricsRegistry()
+
+graph_run_seconds = metrics.histogram(
+    "graph_run_seconds", "그래프 실행 한 번(요청 하나)의 소요 시간", ("endpoint", "status")
+)
+node_seconds = metrics.histogram(
+    "graph_node_seconds", "swarm 노드(에이전트) 실행 시간", ("node", "status")
+)
+llm_call_seconds = metrics.histogram(
+    "llm_call_seconds", "LLM 호출 소요 시간", ("agent", "model", "status")
+)
+llm_tokens = metrics.histogram(
+    "llm_call_tokens", "LLM 호출당 토큰 수", ("agent", "direction"), TOKEN_BUCKETS
+)
+llm_tokens_total = metrics.counter(
+    "llm_tokens", "누적 LLM 토큰 수", ("agent", "direction")
+)
+mcp_tool_seconds = metrics.histogram(
+    "mcp_tool_call_seconds", "MCP 도구 호출 소요 시간 (동시성 대기 제외)", ("server", "tool", "status")
+)
+mcp_tool_wait_seconds = metrics.histogram(
+    "mcp_tool_wait_seconds", "MCP 서버별 동시성 제한 대기 시간", ("server",)
+)
+llm_cache_lookups = metrics.counter(
+    "llm_cache_lookups", "LLM 응답 캐시 조회 결과", ("result",)
+)
+semantic_cache_lookups = metrics.counter(
+    "semantic_cache_lookups", "general 에이전트 의미 캐시 조회 결과", ("result",)
+)
+router_decisions = metrics.counter(
+    "router_decisions", "프리라우터 라우팅 결과", ("target", "reason")
+)
+handoff_seconds = metrics.histogram(
+    "handoff_hop_seconds", "handoff 도구 호출부터 대상 에이전트 시작까지의 시간", ("source", "target")
+)
+handoffs_per_run = metrics.histogram(
+    "handoff_hops_per_run", "요청 하나에서 발생한 handoff 횟수", (), HOP_BUCKETS
+)
+tool_step_calls = metrics.histogram(
+    "tool_step_calls", "ReAct 단계 하나에서 동시에 실행한 도구 호출 수", ("agent",), HOP_BUCKETS
+)
+tool_step_seconds = metrics.histogram(
+    "tool_step_seconds", "ReAct 단계 하나의 도구 실행 시간 (병렬 실행 전체의 wall time)", ("agent",)
+)
+tool_step_serial_seconds = metrics.histogram(
+    "tool_step_serial_seconds", "ReAct 단계 하나의 도구별 실행 시간 합 (순차 실행했다면 걸렸을 시간)", ("agent",)
+)
+admission_rejections = metrics.counter(
+    "admission_rejections", "수락 제어로 거절된 요청 (rate_limited=429, queue_full/queue_timeout=503)", ("reason",)
+)
+admission_wait_seconds = metrics.histogram(
+    "admission_wait_seconds", "수락 제어 대기열에서 기다린 시간", ()
+)
+handoff_blocks = metrics.counter(
+    "handoff_blocks", "hop 예산 초과/순환으로 차단된 handoff", ("source", "target", "reason")
+)
+
+
+def top_level_node(metadata: Optional[Dict[str, Any]]) -> Optional[str]:
+    """콜백 metadata 에서 최상위 swarm 노드 이름을 꺼냅니다."""
+    metadata = metadata or {}
+    ns = metadata.get("langgraph_checkpoint_ns") or ""
+    if ns:
+        return ns.split(NS_SEP)[0].split(NS_END)[0]
+    return metadata.get("langgraph_node")
+
+
+class GraphMetricsHandler(AsyncCallbackHandler):
+    """그래프 실행 한 번 동안 노드/LLM/handoff 지연을 기록하는 콜백
+
+    실행마다 새 인스턴스를 만들어 config 의 callbacks 에 넣습니다.
+    MCP 도구 호출 지연은 세션 풀에서 직접 기록합니다.
+    """
+
+    def __init__(self, node_names: Iterable[str]) -> None:
+        self.node_names = frozenset(node_names)
+        self.hops = 0
+        self._nodes: Dict[UUID, Tuple[str, float]] = {}
+        self._llm: Dict[UUID, Tuple[str, str, float]] = {}
+        self._handoffs: Dict[UUID, Tuple[str, str]] = {}
+        self._pending_hop: Optional[Tuple[str, str, float]] = None
+        # 도구 실행 단계(ToolNode 실행) 단위 집계: 부모 run → [agent, 시작, 마지막 종료, 시간 합, 호출 수]
+        self._tools: Dict[UUID, Tuple[UUID, float]] = {}
+        self._tool_steps: Dict[UUID, List[Any]] = {}
+
+    # 노드 -------------------------------------------------------------
+    async def on_chain_start(
+        self,
+        serialized: Any,
+        inputs: Any,
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        if (
+            name in self.node_names
+            and metadata.get("langgraph_node") == name
+            and NS_SEP not in (metadata.get("langgraph_checkpoint_ns") or "")
+        ):
+            now = time.perf_counter()
+            self._nodes[run_id] = (name, now)
+            # handoff 는 대상 노드가 실제로 시작될 때만 센다 (hop guard 가 막은 전환은 제외)
+            if self._pending_hop is not None and self._pending_hop[1] == name:
+                source, target, started = self._pending_hop
+                self.hops += 1
+                handoff_seconds.observe(now - started, source=source, target=target)
+            self._pending_hop = None
+
+    def _end_node(self, run_id: UUID, status: str) -> None:
+        entry = self._nodes.pop(run_id, None)
+        if entry is not None:
+            node_seconds.observe(time.perf_counter() - entry[1], node=entry[0], status=status)
+
+    async def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_node(run_id, "ok")
+        self._end_tool_step(run_id)
+
+    async def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_node(run_id, "error")
+        self._end_tool_step(run_id)
+
+    # 도구 실행 단계 -----------------------------------------------------
+    def _start_tool(self, run_id: UUID, parent_run_id: Optional[UUID], metadata: Optional[Dict[str, Any]]) -> None:
+        if parent_run_id is None:
+            return
+        now = time.perf_counter()
+        self._tools[run_id] = (parent_run_id, now)
+        if parent_run_id not in self._tool_steps:
+            self._tool_steps[parent_run_id] = [top_level_node(metadata) or "", now, now, 0.0, 0]
+
+    def _end_tool(self, run_id: UUID) -> None:
+        entry = self._tools.pop(run_id, None)
+        step = self._tool_steps.get(entry[0]) if entry is not None else None
+        if step is None:
+            return
+        now = time.perf_counter()
+        step[2] = now
+        step[3] += now - entry[1]
+        step[4] += 1
+
+    def _end_tool_step(self, run_id: UUID) -> None:
+        """ToolNode 실행이 끝나면 그 단계의 호출 수/병렬 wall time/순차 합을 기록합니다."""
+        step = self._tool_steps.pop(run_id, None)
+        if step is None or not step[4]:
+            return
+        agent, started, ended, serial, calls = step
+        tool_step_calls.observe(calls, agent=agent)
+        tool_step_seconds.observe(ended - started, agent=agent)
+        tool_step_serial_seconds.observe(serial, agent=agent)
+
+    # LLM --------------------------------------------------------------
+    async def on_chat_model_start(
+        self,
+        serialized: Any,
+        messages: Any,
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        invocation_params: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        params = invocation_params or {}
+        model = params.get("model_name") or params.get("model") or params.get("_type") or ""
+        self._llm[run_id] = (top_level_node(metadata) or "", str(model), time.perf_counter())
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        entry = self._llm.pop(run_id, None)
+        if entry is None:
+            return
+        agent, model, started = entry
+        llm_call_seconds.observe(time.perf_counter() - started, agent=agent, model=model, status="ok")
+        usage = _usage(response)
+        for direction, key in (("input", "input_tokens"), ("output", "output_tokens")):
+            if key in usage:
+                llm_tokens.observe(usage[key], agent=agent, direction=direction)
+                llm_tokens_total.inc(usage[key], agent=agent, direction=direction)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        entry = self._llm.pop(run_id, None)
+        if entry is not None:
+            agent, model, started = entry
+            llm_call_seconds.observe(
+                time.perf_counter() - started, agent=agent, model=model, status="error"
+            )
+
+    # 도구 / handoff -----------------------------------------------------
+    async def on_tool_start(
+        self,
+        serialized: Any,
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._start_tool(run_id, parent_run_id, metadata)
+        name = (serialized or {}).get("name") or kwargs.get("name")
+        target = get_handoff_target(name)
+        if target is not None:
+            self._handoffs[run_id] = (top_level_node(metadata) or "", target)
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_tool(run_id)
+        entry = self._handoffs.pop(run_id, None)
+        if entry is not None:
+            self._pending_hop = (entry[0], entry[1], time.perf_counter())
+
+    async def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_tool(run_id)
+        self._handoffs.pop(run_id, None)
+
+    def finish(self) -> None:
+        """실행 종료 시 요청당 handoff 횟수를 기록합니다."""
+        handoffs_per_run.observe(self.hops)
+
+
+def _usage(response: Any) -> Dict[str, int]:
+    """LLMResult 에서 토큰 사용량을 추출합니다 (usage_metadata 우선)."""
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                return dict(usage)
+    llm_output = getattr(response, "llm_output", None) or {}
+    usage = llm_output.get("usage_metadata") or llm_output.get("token_usage") or {}
+    return {
+        "input_tokens": usage.get("input_tokens", usage.get("prompt_tokens", 0)),
+        "output_tokens": usage.get("output_tokens", usage.get("completion_tokens", 0)),
+    } if usage else {}
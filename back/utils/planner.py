@@ -0,0 +1,57 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from utils.router import DOMAIN_AGENTS, PreRouter
+
+logger = logging.getLogger("planner")
+
+# 절(clause) 경계: 구두점/줄바꿈, 접속사, "~하고 / ~하며" 연결 어미 뒤의 공백
+_CLAUSE_SPLIT = re.compile(r"[,，;；\n]+|\s+(?:그리고|또한|및)\s+|(?<=[가-힣][고며])\s+")
+
+
+@dataclass
+class Subtask:
+    agent: str
+    task: str
+
+
+def split_clauses(text: str) -> List[str]:
+    """복합 요청을 절 단위로 나눕니다."""
+    return [clause.strip() for clause in _CLAUSE_SPLIT.split(text) if clause and clause.strip()]
+
+
+def plan_subtasks(text: str, router: PreRouter, max_subtasks: int) -> List[Subtask]:
+    """서로 다른 도메인 에이전트가 맡을 독립 작업이 둘 이상이면 작업 목록을, 아니면 빈 목록을 반환합니다.
+
+    각 절을 프리라우터 분류기로 분류해 확신이 있는 도메인 절끼리 묶고,
+    확신이 없는 절(예: "~하고 싶어" 의 "싶어")은 앞 절에 붙입니다.
+    """
+    clauses = split_clauses(text)
+    if len(clauses) < 2:
+        return []
+
+    leading: List[str] = []  # 첫 도메인 절 앞의 불확실한 절들
+    groups: List[Tuple[str, List[str]]] = []
+    for clause in clauses:
+        decision = router.route(clause)
+        confident = decision.reason == "confident" and decision.target in DOMAIN_AGENTS
+        if not confident:
+            (groups[-1][1] if groups else leading).append(clause)
+        elif groups and groups[-1][0] == decision.target:
+            groups[-1][1].append(clause)
+        else:
+            groups.append((decision.target, leading + [clause]))
+            leading = []
+
+    # 같은 에이전트의 절들은 한 작업으로 (처음 나온 순서 유지)
+    merged: Dict[str, List[str]] = {}
+    for agent, parts in groups:
+        merged.setdefault(agent, []).extend(parts)
+    subtasks = [Subtask(agent, " ".join(parts)) for agent, parts in merged.items()]
+
+    if len(subtasks) < 2 or len(subtasks) > max_subtasks:
+        return []
+    logger.info(f"복합 요청 분할: {[(s.agent, s.task) for s in subtasks]}")
+    return subtasks
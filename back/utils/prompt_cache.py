@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import aiofiles
+
+logger = logging.getLogger("prompt_cache")
+
+NO_TOOLS_TEXT = "현재 사용 가능한 도구가 없습니다. MCP 서버 연결을 확인하세요."
+TOOLS_ERROR_TEXT = "도구 정보를 가져오는 중 오류가 발생했습니다. MCP 서버 연결을 확인하세요."
+
+# {변수명} 패턴 ({tools} 제외) - 템플릿 변수 충돌 방지용
+_BRACE_PATTERN = re.compile(r"\{([^}]+)\}")
+
+
+def tools_to_info(tools: Sequence[Any]) -> List[Dict[str, Any]]:
+    """MCP 도구를 사용자 친화적인 형식으로 변환합니다."""
+    tools_info = []
+    for tool in tools:
+        try:
+            tool_info = {
+                "name": getattr(tool, "name", "Unknown"),
+                "description": getattr(tool, "description", "설명 없음"),
+                "parameters": [],
+            }
+            if hasattr(tool, "args_schema") and tool.args_schema is not None:
+                schema = tool.args_schema
+                if not isinstance(schema, dict):
+                    schema = getattr(schema, "schema", {})
+                    schema = schema() if callable(schema) else schema
+                schema_props = schema.get("properties", {})
+                if schema_props:
+                    tool_info["parameters"] = list(schema_props.keys())
+            tools_info.append(tool_info)
+        except Exception as e:
+            logger.info(f"도구 정보 변환 중 오류: {str(e)}")
+    return tools_info
+
+
+def tools_fingerprint(tools: Optional[Sequence[Any]]) -> Tuple:
+    """프롬프트 렌더링 결과에 영향을 주는 도구 정보(이름, 설명)만 모은 키"""
+    if tools is None:
+        return ("<error>",)
+    return tuple(
+        (getattr(t, "name", "Unknown"), getattr(t, "description", "")) for t in tools
+    )
+
+
+def render_prompt(template: str, tools: Optional[Sequence[Any]]) -> str:
+    """프롬프트 템플릿에 도구 목록을 채우고 중괄호를 이스케이프합니다."""
+    if tools is None:
+        tools_text = TOOLS_ERROR_TEXT
+    else:
+        tools_text = "\n".join(
+            f"{i+1}. {tool['name']}: {tool['description']}"
+            for i, tool in enumerate(tools_to_info(tools))
+        )
+        if not tools_text:
+            tools_text = NO_TOOLS_TEXT
+
+    # 단순 문자열 대체 사용
+    prompt = template.replace("{tools}", tools_text)
+
+    # MCP 도구 설명에서 나올 수 있는 중괄호를 이중 중괄호로 변경 (단, {tools}는 제외)
+    return _BRACE_PATTERN.sub(
+        lambda m: "{{" + m.group(1) + "}}" if m.group(1) != "tools" else m.group(0),
+        prompt,
+    )
+
+
+@dataclass
+class _PromptEntry:
+    mtime_ns: int
+    size: int
+    digest: str
+    template: str
+    checked_at: float
+    # tools 리스트 객체 → 렌더링 결과 (도구 지문 기준)
+    tools_ref: Any = None
+    tools_key: Tuple = ()
+    rendered: Optional[str] = None
+    renders: Dict[Tuple, str] = field(default_factory=dict)
+
+
+class PromptCache:
+    """프롬프트 파일의 렌더링 결과를 캐시합니다.
+
+    캐시 키는 (파일 mtime/크기/해시, 도구 지문)입니다. 파일 상태는
+    ``check_interval`` 초마다 한 번만 ``stat`` 으로 확인하므로 핫 패스에서는
+    파일 I/O 와 정규식 처리가 발생하지 않고, 프롬프트를 수정하면
+    재시작 없이 반영됩니다.
+    """
+
+    def __init__(self, check_interval: float = 1.0, max_renders: int = 8) -> None:
+        self.check_interval = check_interval
+        self.max_renders = max_renders
+        self._entries: Dict[str, _PromptEntry] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _load(self, path: str) -> _PromptEntry:
+        stat = os.stat(path)
+        entry = self._entries.get(path)
+        if (
+            entry is not None
+            and entry.mtime_ns == stat.st_mtime_ns
+            and entry.size == stat.st_size
+        ):
+            entry.checked_at = time.monotonic()
+            return entry
+
+        async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
+            template = await f.read()
+        digest = hashlib.sha256(template.encode("utf-8")).hexdigest()
+
+        if entry is not None and entry.digest == digest:
+            # touch 만 된 경우 - 렌더링 결과 유지
+            entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+            entry.checked_at = time.monotonic()
+            return entry
+
+        if entry is not None:
+            logger.info(f"프롬프트 파일 변경 감지: {path}")
+        entry = _PromptEntry(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            digest=digest,
+            template=template,
+            checked_at=time.monotonic(),
+        )
+        self._entries[path] = entry
+        return entry
+
+    async def render(self, path: str, tools: Optional[Sequence[Any]]) -> str:
+        """렌더링(이스케이프 포함)된 프롬프트를 반환합니다.
+
+        ``tools`` 가 ``None`` 이면 도구 조회 실패로 간주합니다.
+        """
+        path = os.path.abspath(path)
+        entry = self._entries.get(path)
+        if entry is None or time.monotonic() - entry.checked_at >= self.check_interval:
+            entry = await self._load(path)
+
+        # 같은 도구 리스트 객체면 지문 계산도 생략
+        if entry.rendered is not None and tools is not None and entry.tools_ref is tools:
+            self.hits += 1
+            return entry.rendered
+
+        key = tools_fingerprint(tools)
+        rendered = entry.renders.get(key)
+        if rendered is None:
+            self.misses += 1
+            rendered = render_prompt(entry.template, tools)
+            if len(entry.renders) >= self.max_renders:
+                entry.renders.pop(next(iter(entry.renders)))
+            entry.renders[key] = rendered
+        else:
+            self.hits += 1
+
+        entry.tools_ref, entry.tools_key, entry.rendered = tools, key, rendered
+        return rendered
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# 프로세스 전역 프롬프트 캐시
+prompt_cache = PromptCache()
@@ -0,0 +1,204 @@
+import json
+import logging
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.config import settings
+
+logger = logging.getLogger("router")
+
+DOMAIN_AGENTS = ("schedule", "memo", "health")
+DEFAULT_AGENT = "general"
+
+# 분류기 초기 학습 예시 (로그로 학습한 예시가 있으면 함께 사용)
+SEED_EXAMPLES: Dict[str, Sequence[str]] = {
+    "schedule": (
+        "오늘 일정 알려줘", "이번 주 스케줄 보여줘", "내일 회의 있어?", "다음 주 약속 잡아줘",
+        "금요일 오후 3시에 미팅 추가해줘", "캘린더에 생일 등록해줘", "일정 취소해줘",
+        "회의 시간을 변경해줘", "이번 달 공휴일 알려줘", "빈 시간 언제야", "예약 일정 확인해줘",
+        "다음 주 월요일 일정 있어?", "일정 충돌 확인해줘", "반복 일정 만들어줘",
+    ),
+    "memo": (
+        "메모 남겨줘", "오늘 할일 목록 보여줘", "장보기 목록 메모해줘", "할 일 추가해줘",
+        "할일 완료 처리해줘", "메모 검색해줘", "프로젝트 노트 찾아줘", "아이디어 기록해줘",
+        "지난번 메모 보여줘", "메모 삭제해줘", "노트 파일 저장해줘", "이슈 등록해줘",
+        "체크리스트 만들어줘", "기억해줘 비밀번호 힌트",
+    ),
+    "health": (
+        "오늘 운동 기록해줘", "최근 운동 기록 알려줘", "건강 상태 어때", "체중 기록해줘",
+        "식단 추천해줘", "수면 기록 보여줘", "혈압 기록 추가해줘", "다이어트 계획 세워줘",
+        "약 복용 시간 알려줘", "칼로리 계산해줘", "운동 루틴 추천해줘", "걸음 수 기록해줘",
+        "헬스 목표 세워줘", "러닝 30분 했어",
+    ),
+    "general": (
+        "안녕하세요", "고마워", "너는 누구야", "오늘 기분이 안 좋아", "비밀번호를 잊어버렸어요",
+        "날씨 어때", "추천할 만한 책 있어?", "무엇을 도와줄 수 있어?", "이 서비스 사용법 알려줘",
+        "환불은 어떻게 하나요", "고객센터 연락처 알려줘", "재미있는 이야기 해줘",
+    ),
+}
+
+_PUNCT = re.compile(r"[^\w\s]")
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFC", text).lower()
+    return " ".join(_PUNCT.sub(" ", text).split())
+
+
+def _features(text: str) -> Counter:
+    """단어 unigram + 단어 안의 문자 bigram (한국어 조사/어미 변화에 강하게)"""
+    normalized = _normalize(text)
+    features: Counter = Counter()
+    for word in normalized.split():
+        features[f"w:{word}"] += 1
+        for i in range(len(word) - 1):
+            features[word[i:i + 2]] += 1
+    return features
+
+
+def _unit(vector: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {k: v / norm for k, v in vector.items()} if norm else vector
+
+
+class IntentClassifier:
+    """TF-IDF 중심점(centroid) 기반 경량 의도 분류기
+
+    학습 예시의 TF-IDF 벡터를 에이전트별로 평균 내어 중심점을 만들고,
+    질의와 각 중심점의 코사인 유사도를 점수로 돌려줍니다. 학습/예측 모두
+    순수 파이썬이며 질의 하나에 수십 µs 수준입니다.
+    """
+
+    def __init__(self) -> None:
+        self.idf: Dict[str, float] = {}
+        self.centroids: Dict[str, Dict[str, float]] = {}
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "IntentClassifier":
+        docs = [(_features(text), label) for text, label in examples]
+        df: Counter = Counter()
+        for features, _ in docs:
+            df.update(features.keys())
+        n = len(docs)
+        self.idf = {f: math.log((1 + n) / (1 + c)) + 1.0 for f, c in df.items()}
+
+        sums: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for features, label in docs:
+            for f, w in self._vector(features).items():
+                sums[label][f] += w
+        self.centroids = {label: _unit(dict(vector)) for label, vector in sums.items()}
+        return self
+
+    def _vector(self, features: Counter) -> Dict[str, float]:
+        return _unit({f: (1 + math.log(tf)) * self.idf[f] for f, tf in features.items() if f in self.idf})
+
+    def scores(self, text: str) -> Dict[str, float]:
+        query = self._vector(_features(text))
+        return {
+            label: sum(w * centroid.get(f, 0.0) for f, w in query.items())
+            for label, centroid in self.centroids.items()
+        }
+
+
+def load_examples(path: str) -> List[Tuple[str, str]]:
+    """라우팅 로그(JSONL: {"text", "agent"})에서 학습 예시를 읽습니다."""
+    examples = []
+    if not path or not os.path.exists(path):
+        return examples
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("text") and record.get("agent"):
+                examples.append((record["text"], record["agent"]))
+    return examples
+
+
+def append_example(path: str, text: str, agent: str, max_bytes: int) -> bool:
+    """최종 응답한 에이전트를 라벨로 라우팅 로그에 추가합니다 (블로킹 I/O, 스레드에서 호출).
+
+    로그가 ``max_bytes`` 이상이면 더 쌓지 않고 False 를 반환합니다.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+        return False
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"text": text, "agent": agent}, ensure_ascii=False) + "\n")
+    return True
+
+
+@dataclass
+class RouteDecision:
+    target: str
+    reason: str
+    scores: Dict[str, float]
+
+
+class PreRouter:
+    """swarm 진입 전 요청을 바로 담당 에이전트로 보내는 라우터
+
+    분류기 점수에 클라이언트가 보낸 ``agent_mode`` 와 직전 턴의
+    ``last_active_agent`` 를 가산점으로 더해, 최고 점수가 임계값 이상이고
+    2위와의 차이가 충분하면 해당 에이전트로 바로 보냅니다. 확신이 없으면
+    기존처럼 general 에이전트가 LLM 으로 판단합니다.
+    """
+
+    def __init__(
+        self,
+        classifier: IntentClassifier,
+        threshold: float,
+        margin: float,
+        mode_bonus: float,
+        sticky_bonus: float,
+    ) -> None:
+        self.classifier = classifier
+        self.threshold = threshold
+        self.margin = margin
+        self.mode_bonus = mode_bonus
+        self.sticky_bonus = sticky_bonus
+
+    def route(
+        self,
+        text: str,
+        agent_mode: Optional[str] = None,
+        last_active_agent: Optional[str] = None,
+    ) -> RouteDecision:
+        scores = self.classifier.scores(text)
+        if agent_mode in DOMAIN_AGENTS:
+            scores[agent_mode] = scores.get(agent_mode, 0.0) + self.mode_bonus
+        if last_active_agent in DOMAIN_AGENTS:
+            scores[last_active_agent] = scores.get(last_active_agent, 0.0) + self.sticky_bonus
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return RouteDecision(DEFAULT_AGENT, "empty", scores)
+        best, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if best_score >= self.threshold and best_score - runner_up >= self.margin:
+            return RouteDecision(best, "confident", scores)
+        return RouteDecision(DEFAULT_AGENT, "uncertain", scores)
+
+
+def create_router() -> PreRouter:
+    examples = [(text, agent) for agent, texts in SEED_EXAMPLES.items() for text in texts]
+    logged = load_examples(settings.router_log_path)
+    if logged:
+        logger.info(f"라우팅 로그에서 학습 예시 {len(logged)}개 로드")
+    classifier = IntentClassifier().fit(examples + logged)
+    return PreRouter(
+        classifier,
+        threshold=settings.router_threshold,
+        margin=settings.router_margin,
+        mode_bonus=settings.router_mode_bonus,
+        sticky_bonus=settings.router_sticky_bonus,
+    )
+
+
+# 프로세스 전역 프리라우터
+pre_router = create_router()
@@ -0,0 +1,275 @@
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from utils.config import settings
+from utils.handoff_tools import get_handoff_target
+from utils.llm_cache import is_mutating_tool
+from utils.metrics import semantic_cache_lookups
+
+logger = logging.getLogger("semantic_cache")
+
+_PUNCT = re.compile(r"[^\w\s]")
+
+# 공용 범위(모든 세션이 공유)로 캐시해도 되는 도구 - 사용자/시점과 무관한 정적 정보만
+SHARED_ANSWER_TOOLS = frozenset({"search_faq", "get_advice", "calculate_simple"})
+SHARED_SCOPE = ""
+
+
+def normalize_question(text: str) -> str:
+    text = unicodedata.normalize("NFC", text).lower()
+    return " ".join(_PUNCT.sub(" ", text).split())
+
+
+class HashingEmbedder(Embeddings):
+    """오프라인 해싱 임베더 (문자 n-gram + 단어 feature hashing)
+
+    한국어는 조사/어미 때문에 단어 단위 일치가 약하므로 공백을 포함한
+    문자 2~3-gram 을 주 feature 로 쓰고 단어 unigram 을 더합니다.
+    """
+
+    def __init__(self, dim: int = 1024, ngram_range: tuple = (2, 3)) -> None:
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str) -> List[str]:
+        normalized = normalize_question(text)
+        padded = f" {normalized} "
+        features = [f"w:{word}" for word in normalized.split()]
+        lo, hi = self.ngram_range
+        for n in range(lo, hi + 1):
+            features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dim] += sign
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        # CPU 비용이 작으므로 스레드 풀로 보내지 않는다.
+        return self.embed_query(text)
+
+
+@dataclass
+class SemanticHit:
+    question: str
+    answer: str
+    similarity: float
+
+
+class SemanticAnswerCache:
+    """질문 임베딩 → 답변 의미 기반 캐시
+
+    과거 질문들의 정규화된 임베딩을 행렬로 들고 있다가 새 질문과의 코사인
+    유사도가 ``threshold`` 이상인 가장 가까운 항목의 답변을 돌려줍니다.
+    항목마다 TTL 이 있고, ``max_entries`` 를 넘으면 가장 오래 사용되지
+    않은 항목부터 제거합니다.
+
+    항목은 범위(``scope``)별로 분리됩니다. 질문 문장만으로 답이 정해지는 경우
+    (이전 대화가 없는 첫 질문 + 정적 도구만 사용한 답변)만 공용 범위
+    (``SHARED_SCOPE``)에 저장합니다.
+    """
+
+    def __init__(
+        self,
+        embedder: Embeddings,
+        threshold: float,
+        ttl: float,
+        max_entries: int,
+    ) -> None:
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._vectors: Optional[np.ndarray] = None
+        self._questions: List[str] = []
+        self._scopes: List[str] = []
+        self._answers: List[str] = []
+        self._expires: List[float] = []
+        self._last_used: List[float] = []
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._questions)
+
+    async def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(await self.embedder.aembed_query(text), dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def _remove(self, indexes: List[int]) -> None:
+        if not indexes:
+            return
+        removed = set(indexes)
+        keep = [i for i in range(len(self._questions)) if i not in removed]
+        self._vectors = self._vectors[keep] if keep else None
+        self._questions = [self._questions[i] for i in keep]
+        self._scopes = [self._scopes[i] for i in keep]
+        self._answers = [self._answers[i] for i in keep]
+        self._expires = [self._expires[i] for i in keep]
+        self._last_used = [self._last_used[i] for i in keep]
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        expired = [i for i, expires_at in enumerate(self._expires) if expires_at <= now]
+        self._remove(expired)
+        return len(expired)
+
+    def _similarities(self, vector: np.ndarray, scope: str) -> np.ndarray:
+        """범위가 다른 항목은 -1 로 가린 코사인 유사도"""
+        in_scope = np.fromiter((s == scope for s in self._scopes), dtype=bool, count=len(self._scopes))
+        return np.where(in_scope, self._vectors @ vector, -1.0)
+
+    async def lookup(self, question: str, scope: str = SHARED_SCOPE) -> Optional[SemanticHit]:
+        if self._vectors is None:
+            self.misses += 1
+            semantic_cache_lookups.inc(result="miss")
+            return None
+        query = await self._embed(question)
+        similarities = self._similarities(query, scope)
+        now = time.time()
+        for index in np.argsort(-similarities)[:4]:
+            similarity = float(similarities[index])
+            if similarity < self.threshold:
+                break
+            if self._expires[index] <= now:
+                continue
+            self._last_used[index] = now
+            self.hits += 1
+            semantic_cache_lookups.inc(result="hit")
+            logger.info(
+                f"의미 캐시 적중 ({similarity:.3f}): '{question}' ≈ '{self._questions[index]}'"
+            )
+            return SemanticHit(self._questions[index], self._answers[index], similarity)
+        self.misses += 1
+        semantic_cache_lookups.inc(result="miss")
+        return None
+
+    async def store(self, question: str, answer: str, scope: str = SHARED_SCOPE) -> None:
+        vector = await self._embed(question)
+        now = time.time()
+        if self._vectors is not None:
+            similarities = self._similarities(vector, scope)
+            index = int(np.argmax(similarities))
+            if similarities[index] >= 0.999:
+                # 같은 질문이면 답변과 만료 시간만 갱신
+                self._answers[index] = answer
+                self._expires[index] = now + self.ttl
+                self._last_used[index] = now
+                return
+
+        if len(self._questions) >= self.max_entries:
+            self.purge_expired()
+        if len(self._questions) >= self.max_entries:
+            self._remove([int(np.argmin(self._last_used))])
+
+        row = vector[np.newaxis, :]
+        self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+        self._questions.append(question)
+        self._scopes.append(scope)
+        self._answers.append(answer)
+        self._expires.append(now + self.ttl)
+        self._last_used.append(now)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def pending_question(messages: List[BaseMessage]) -> Optional[str]:
+    """사용자 질문으로 바로 시작된 턴이면 그 질문을 반환합니다.
+
+    handoff 로 넘어온 작업 메시지나 도구 결과 뒤에는 캐시를 쓰지 않습니다.
+    """
+    if not messages or not isinstance(messages[-1], HumanMessage):
+        return None
+    if len(messages) > 1 and isinstance(messages[-2], ToolMessage):
+        return None
+    content = messages[-1].content
+    return content.strip() if isinstance(content, str) and content.strip() else None
+
+
+def cache_scope(messages: List[BaseMessage], history_summary: Optional[str] = None) -> Optional[str]:
+    """조회 범위 - 이전 대화도 요약도 없는 첫 질문이면 공용 범위, 아니면 None (캐시하지 않음)
+
+    키가 질문 문장뿐이므로 "더 자세히 알려줘" 처럼 앞 대화에 기대는 질문은
+    세션 안에서도 다른 맥락의 답변을 돌려줄 수 있어 캐시하지 않습니다.
+    """
+    if len(messages) > 1 or history_summary:
+        return None
+    return SHARED_SCOPE
+
+
+def store_scope(lookup_scope: Optional[str], new_messages: List[BaseMessage]) -> Optional[str]:
+    """저장 범위 - 모든 도구 호출이 정적 도구(``SHARED_ANSWER_TOOLS``)일 때만 조회 범위, 아니면 None
+
+    시각/날씨/환율 같은 실시간 도구나 사용자 데이터 도구의 결과로 만든 답변은
+    다시 물었을 때 지난 값이 되므로 어느 범위에도 저장하지 않습니다.
+    """
+    if lookup_scope is None:
+        return None
+    for message in new_messages:
+        if isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                if call["name"] not in SHARED_ANSWER_TOOLS:
+                    return None
+    return lookup_scope
+
+
+def answer_to_cache(new_messages: List[BaseMessage]) -> Optional[str]:
+    """에이전트가 이번 턴에 스스로 끝낸 답변이면 캐시할 답변 텍스트를 반환합니다."""
+    if not new_messages or not isinstance(new_messages[-1], AIMessage):
+        return None
+    for message in new_messages:
+        if isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                if get_handoff_target(call["name"]) or is_mutating_tool(call["name"]):
+                    return None
+    answer = new_messages[-1].content
+    return answer if isinstance(answer, str) and answer.strip() else None
+
+
+def create_embedder(name: Optional[str] = None) -> Embeddings:
+    """설정된 임베더를 생성합니다 (``hashing`` 또는 ``vertexai``)."""
+    name = name or settings.semantic_cache_embedder
+    if name == "hashing":
+        return HashingEmbedder()
+    if name == "vertexai":
+        from langchain_google_vertexai import VertexAIEmbeddings
+
+        return VertexAIEmbeddings(model_name=settings.semantic_cache_embedding_model)
+    raise ValueError(f"지원하지 않는 임베더: {name}")
+
+
+# general 에이전트 답변용 의미 캐시
+general_answer_cache = SemanticAnswerCache(
+    embedder=create_embedder(),
+    threshold=settings.semantic_cache_threshold,
+    ttl=settings.semantic_cache_ttl,
+    max_entries=settings.semantic_cache_max_entries,
+)
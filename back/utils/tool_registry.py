@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+
+from utils.config import settings
+from utils.mcp_pool import MCPSessionPool, mcp_pool
+
+logger = logging.getLogger("tool_registry")
+
+
+class _ServerTools:
+    __slots__ = (
+        "tools", "version", "attempts", "failures", "last_latency",
+        "last_success", "last_error", "next_retry", "backoff", "refreshing",
+    )
+
+    def __init__(self) -> None:
+        self.tools: List[BaseTool] = []
+        self.version = 0
+        self.attempts = 0
+        self.failures = 0
+        self.last_latency: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.next_retry = 0.0
+        self.backoff = settings.tool_discovery_retry_delay
+        self.refreshing: Optional[asyncio.Task] = None
+
+
+class ToolRegistry:
+    """MCP 서버별 도구 목록 레지스트리
+
+    FastAPI 시작 시 등록된 모든 서버의 도구를 동시에 검색하고, 이후에는
+    ``tool_discovery_interval`` 마다 (실패한 서버는 백오프 간격으로)
+    백그라운드에서 갱신합니다. 요청 경로의 ``get_tools`` 는 캐시만 읽으며,
+    실패한 서버는 빈 목록으로 처리하고 재시도를 예약합니다.
+    """
+
+    def __init__(self, pool: MCPSessionPool) -> None:
+        self.pool = pool
+        self._servers: Dict[str, _ServerTools] = {}
+        # 서버 이름 묶음 → (서버별 버전, 합친 도구 리스트)
+        self._combined: Dict[Tuple[str, ...], Tuple[Tuple[int, ...], List[BaseTool]]] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def register(self, servers: Dict[str, Dict[str, Any]]) -> None:
+        self.pool.register(servers)
+        for name in servers:
+            self._servers.setdefault(name, _ServerTools())
+
+    async def discover(self, name: str) -> None:
+        """서버 하나의 도구 목록을 다시 가져옵니다."""
+        entry = self._servers[name]
+        entry.attempts += 1
+        started = time.perf_counter()
+        try:
+            tools = await asyncio.wait_for(
+                self.pool.get_server_tools(name), settings.tool_discovery_timeout
+            )
+        except Exception as e:
+            entry.failures += 1
+            entry.last_latency = time.perf_counter() - started
+            entry.last_error = str(e) or type(e).__name__
+            entry.next_retry = time.monotonic() + entry.backoff
+            entry.backoff = min(entry.backoff * 2, settings.tool_discovery_interval)
+            logger.info(f"도구 검색 실패 ({name}, {entry.last_latency:.2f}s): {entry.last_error}")
+            return
+
+        entry.last_latency = time.perf_counter() - started
+        entry.last_success = time.time()
+        entry.last_error = None
+        entry.next_retry = time.monotonic() + settings.tool_discovery_interval
+        entry.backoff = settings.tool_discovery_retry_delay
+        signature = [(t.name, t.description) for t in tools]
+        if signature != [(t.name, t.description) for t in entry.tools] or not entry.version:
+            # 도구 구성이 바뀐 경우에만 버전을 올린다 (에이전트/프롬프트 캐시 무효화)
+            entry.tools = tools
+            entry.version += 1
+        logger.info(f"도구 검색 완료 ({name}): {len(tools)}개, {entry.last_latency:.2f}s")
+
+    def _schedule(self, name: str) -> None:
+        entry = self._servers[name]
+        if entry.refreshing is None or entry.refreshing.done():
+            entry.refreshing = asyncio.create_task(self.discover(name))
+
+    async def discover_all(self) -> None:
+        """등록된 모든 서버를 동시에 검색합니다."""
+        await asyncio.gather(*(self.discover(name) for name in self._servers))
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.tool_discovery_tick)
+            now = time.monotonic()
+            for name, entry in self._servers.items():
+                if now >= entry.next_retry:
+                    self._schedule(name)
+
+    async def start(self) -> None:
+        """시작 시 전체 검색 후 백그라운드 갱신 루프를 띄웁니다."""
+        started = time.perf_counter()
+        await self.discover_all()
+        logger.info(
+            f"MCP 도구 검색 완료: 서버 {len(self._servers)}개, "
+            f"{time.perf_counter() - started:.2f}s"
+        )
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def aclose(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        for entry in self._servers.values():
+            if entry.refreshing is not None:
+                entry.refreshing.cancel()
+
+    async def get_tools(self, servers: Iterable[str]) -> List[BaseTool]:
+        """캐시된 도구 목록을 반환합니다.
+
+        도구 구성이 바뀌지 않았다면 항상 같은 리스트 객체를 반환하므로
+        에이전트 레지스트리와 프롬프트 캐시가 그대로 재사용됩니다.
+        """
+        names = tuple(servers)
+        for name in names:
+            entry = self._servers.get(name)
+            if entry is None:
+                raise KeyError(f"등록되지 않은 MCP 서버: {name}")
+            if entry.attempts == 0:
+                # start() 없이 사용된 경우(스크립트 등)에만 한 번 인라인 검색
+                await self.discover(name)
+            elif not entry.tools and time.monotonic() >= entry.next_retry:
+                self._schedule(name)
+
+        versions = tuple(self._servers[name].version for name in names)
+        cached = self._combined.get(names)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+        combined = [tool for name in names for tool in self._servers[name].tools]
+        self._combined[names] = (versions, combined)
+        return combined
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """서버별 검색 상태와 지연 시간"""
+        return {
+            name: {
+                "tool_count": len(entry.tools),
+                "attempts": entry.attempts,
+                "failures": entry.failures,
+                "last_latency_seconds": entry.last_latency,
+                "last_success": entry.last_success,
+                "last_error": entry.last_error,
+            }
+            for name, entry in self._servers.items()
+        }
+
+
+# 프로세스 전역 도구 레지스트리
+tool_registry = ToolRegistry(mcp_pool)
@@ -1,6 +1,7 @@
 import os
 import json
 import uuid
+import hashlib
 import asyncio
 import requests
 from dotenv import load_dotenv
@@ -43,11 +44,45 @@ def initialize():
         st.session_state.agent_mode = "general"
 
 
-def get_chat_response(message, session_id=None):
+def start_turn(message, session_id=None):
+    """이번 턴의 ID 를 반환한다. 응답을 받지 못한 직전 턴과 같은 메시지면 (rerun, 재시도) 그 ID 를 재사용한다.
+
+    ID 는 사용자 메시지를 기록에 추가하기 전에 한 번만 만들어 session_state 에 보관한다.
+    """
+    pending = st.session_state.get("pending_turn")
+    if pending and pending["message"] == message and pending["session_id"] == session_id:
+        return pending["turn_id"], True
+    turn_id = str(uuid.uuid4())
+    st.session_state.pending_turn = {"turn_id": turn_id, "message": message, "session_id": session_id}
+    return turn_id, False
+
+
+def finish_turn():
+    st.session_state.pop("pending_turn", None)
+
+
+def make_idempotency_key(message, session_id, turn_id):
+    """같은 턴의 재전송(rerun, 중복 클릭)이 같은 키를 갖도록 세션/턴 ID/메시지로 키를 만든다"""
+    return hashlib.sha256(f"{session_id}:{turn_id}:{message}".encode("utf-8")).hexdigest()
+
+
+def warn_if_overloaded(response):
+    """서버가 429/503 으로 거절하면 Retry-After 와 함께 안내하고 True 를 반환"""
+    if response.status_code not in (429, 503):
+        return False
+    retry_after = response.headers.get("Retry-After", "잠시")
+    st.warning(f"요청이 많아 처리하지 못했습니다. {retry_after}초 후 다시 시도해 주세요.")
+    return True
+
+
+def get_chat_response(message, session_id=None, turn_id=None):
     """Sends a message to the /chat API and returns the response."""
 
     url = f"{AGENT_SERVER_HOST}/ask"
-    headers = {"Content-Type": "application/json"}
+    headers = {
+        "Content-Type": "application/json",
+        "Idempotency-Key": make_idempotency_key(message, session_id, turn_id),
+    }
     data = {Request.MESSAGE.value: message}
 
     if session_id:
@@ -58,6 +93,8 @@ def get_chat_response(message, session_id=None):
 
     try:
         response = requests.post(url, headers=headers, data=json.dumps(data))
+        if warn_if_overloaded(response):
+            return None
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -68,6 +105,41 @@ def get_chat_response(message, session_id=None):
         return None
 
 
+def stream_chat_response(message, session_id=None, turn_id=None):
+    """Streams events from the /ask/stream API (newline-delimited JSON)."""
+
+    url = f"{AGENT_SERVER_HOST}/ask/stream"
+    headers = {
+        "Content-Type": "application/json",
+        "Idempotency-Key": make_idempotency_key(message, session_id, turn_id),
+    }
+    data = {Request.MESSAGE.value: message}
+
+    if session_id:
+        data[Request.SESSION_ID.value] = session_id
+
+    data[Request.AGENT_MODE.value] = st.session_state.agent_mode
+
+    try:
+        with requests.post(
+            url,
+            headers=headers,
+            params={"format": "ndjson"},
+            data=json.dumps(data),
+            stream=True,
+        ) as response:
+            if warn_if_overloaded(response):
+                return
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    yield json.loads(line)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error connecting to server: {e}")
+    except json.JSONDecodeError as e:
+        st.error(f"Error decoding JSON response: {e}")
+
+
 def render_sidebar():
 
     with st.sidebar:
@@ -120,6 +192,7 @@ def render_sidebar():
             new_session_id = generate_session_id()
             st.session_state.session_id = new_session_id
             st.session_state.messages = []
+            finish_turn()
             st.success(f"새 대화가 시작되었습니다: {new_session_id}")
             st.rerun()
 
@@ -135,10 +208,18 @@ def display_chat_history():
 
 async def process_chat(user_input):
     """Process user input asynchronously"""
-    st.session_state.messages.append({"role": "user", "content": user_input})
+    if not st.session_state.session_id:
+        st.session_state.session_id = generate_session_id()
+        st.sidebar.info(
+            f"New session created with ID: {st.session_state.session_id}"
+        )
 
-    with st.chat_message("user"):
-        st.markdown(user_input)
+    # 턴 ID 를 먼저 정하고 메시지를 추가 (재시도면 이미 기록에 있으므로 다시 추가하지 않음)
+    turn_id, retry = start_turn(user_input, st.session_state.session_id)
+    if not retry:
+        st.session_state.messages.append({"role": "user", "content": user_input})
+        with st.chat_message("user"):
+            st.markdown(user_input)
 
     with st.chat_message("assistant"):
         status_placeholder = st.status(
@@ -147,15 +228,32 @@ async def process_chat(user_input):
         message_placeholder = st.empty()
         st.container()
 
-    if not st.session_state.session_id:
-        st.session_state.session_id = generate_session_id()
-        st.sidebar.info(
-            f"New session created with ID: {st.session_state.session_id}"
-        )
-
-    response_data = get_chat_response(user_input, st.session_state.session_id)
+    if st.session_state.get("streaming_mode", True):
+        response_data = None
+        streamed_text = ""
+        for event in stream_chat_response(user_input, st.session_state.session_id, turn_id):
+            event_type = event.get("type")
+            if event_type == "token":
+                streamed_text += event["content"]
+                message_placeholder.markdown(streamed_text + "▌")
+            elif event_type == "tool_start":
+                status_placeholder.update(label=f"🔧 {event['name']} 실행 중...")
+            elif event_type == "handoff":
+                # 다음 에이전트의 답변으로 새로 표시
+                streamed_text = ""
+                status_placeholder.update(label=f"🔀 {event['to']} 에이전트로 전환 중...")
+            elif event_type == "done":
+                response_data = {
+                    Response.SESSION_ID.value: event["session_id"],
+                    Response.RESPONSE.value: event["response"],
+                }
+            elif event_type == "error":
+                break
+    else:
+        response_data = get_chat_response(user_input, st.session_state.session_id, turn_id)
 
     if response_data:
+        finish_turn()
         if (
             Response.SESSION_ID.value in response_data
             and response_data[Response.SESSION_ID.value]
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+메모 저장소 백엔드 벤치마크 (대량 데이터 시작 시간)
+
+임시 디렉터리에 메모 N 개(기본 100k)와 할일 N/10 개를 백엔드별로 써 둔 뒤
+
+    write    - 초기 적재 (put_many, 배치 커밋)
+    load     - 저장소 열기 (레코드를 메모리 테이블로 읽기)
+    startup  - 새 프로세스에서 ``import memo_server`` (로드 + 검색/필터 색인 구축)
+    put      - 도구 한 번의 쓰기 (put 후 flush, 개당 평균)
+
+를 측정합니다. jsonl 은 압축 전(로그만)과 압축 후(스냅샷)를 따로 잽니다.
+
+사용법 (mcp/ 디렉터리에서):
+    python benchmarks/bench_memo_store.py
+    python benchmarks/bench_memo_store.py --memos 100000 --backends sqlite jsonl
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+MCP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MCP_DIR)
+
+from memo_store import JsonlStore, create_store
+
+WORDS = ["회의", "프로젝트", "아이디어", "운동", "건강", "독서", "여행", "계획", "정리", "보고서",
+         "meeting", "report", "python", "budget", "design", "review", "travel", "study"]
+CATEGORIES = ["업무", "개인", "아이디어", "건강", "일반"]
+PRIORITIES = ["low", "medium", "high"]
+
+
+def fake_memos(n: int, rng: random.Random):
+    now = datetime.now()
+    for i in range(n):
+        stamp = (now - timedelta(minutes=i)).isoformat()
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "title": " ".join(rng.choices(WORDS, k=3)),
+            "content": " ".join(rng.choices(WORDS, k=30)),
+            "category": rng.choice(CATEGORIES),
+            "tags": rng.sample(WORDS, 2),
+            "priority": rng.choice(PRIORITIES),
+            "created_at": stamp,
+            "updated_at": stamp,
+        }
+
+
+def fake_todos(n: int, rng: random.Random):
+    now = datetime.now()
+    for i in range(n):
+        stamp = now.isoformat()
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "title": " ".join(rng.choices(WORDS, k=3)),
+            "description": " ".join(rng.choices(WORDS, k=10)),
+            "priority": rng.choice(PRIORITIES),
+            "status": rng.choice(["pending", "in_progress", "completed", "cancelled"]),
+            "due_date": (now + timedelta(days=rng.randint(-60, 60))).isoformat() if i % 4 else None,
+            "category": rng.choice(CATEGORIES),
+            "tags": rng.sample(WORDS, 2),
+            "created_at": stamp,
+            "updated_at": stamp,
+        }
+
+
+def startup_seconds(backend: str, path: str) -> float:
+    """새 프로세스에서 memo_server 를 import 하는 데 걸린 시간"""
+    code = (
+        "import time, logging; logging.disable(logging.INFO); t = time.perf_counter(); "
+        "import memo_server; print(time.perf_counter() - t, len(memo_server.MEMOS))"
+    )
+    env = {**os.environ, "MEMO_STORE_BACKEND": backend, "MEMO_STORE_PATH": path}
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=MCP_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(out[0])
+
+
+def bench(backend: str, path: str, memos, todos, puts: int, compact: bool = False) -> dict:
+    started = time.perf_counter()
+    store = create_store(backend, path)
+    store.put_many("memos", memos)
+    store.put_many("todos", todos)
+    if compact and isinstance(store, JsonlStore):
+        store.compact()
+    write = time.perf_counter() - started
+
+    rng = random.Random(1)
+    extra = list(fake_memos(puts, rng))
+    started = time.perf_counter()
+    for memo in extra:
+        store.put("memos", memo)
+        store.flush()
+    put = (time.perf_counter() - started) / puts
+    for memo in extra:
+        store.delete("memos", memo["id"])
+    store.close()
+
+    started = time.perf_counter()
+    reopened = create_store(backend, path)
+    load = time.perf_counter() - started
+    assert len(reopened.table("memos")) == len(memos)
+    reopened.close()
+
+    return {"write": write, "load": load, "startup": startup_seconds(backend, path), "put": put}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="메모 저장소 백엔드 벤치마크")
+    parser.add_argument("--memos", type=int, default=100000)
+    parser.add_argument("--backends", nargs="+", default=["sqlite", "jsonl"])
+    parser.add_argument("--puts", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    memos = list(fake_memos(args.memos, rng))
+    todos = list(fake_todos(args.memos // 10, rng))
+    print(f"메모 {len(memos)}개, 할일 {len(todos)}개\n")
+    print(f"{'backend':<16}{'write':>10}{'load':>10}{'startup':>10}{'put+flush':>12}")
+
+    cases = []
+    for backend in args.backends:
+        cases.append((backend, backend, False))
+        if backend == "jsonl":
+            cases.append(("jsonl (snapshot)", backend, True))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, backend, compact in cases:
+            path = os.path.join(tmp, f"{label.split()[0]}-{compact}.db")
+            result = bench(backend, path, memos, todos, args.puts, compact)
+            print(
+                f"{label:<16}{result['write']:>9.2f}s{result['load']:>9.2f}s"
+                f"{result['startup']:>9.2f}s{result['put'] * 1000:>10.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ import uuid
 from datetime import datetime, timedelta
 import random
 
+from pagination import InvalidCursor, decode_cursor, page_info, select_page
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -166,22 +168,33 @@ async def get_health_records(
     start_date: str = None,
     end_date: str = None,
     record_type: str = None,
-    limit: int = 10
+    limit: int = 10,
+    cursor: str = None
 ) -> Dict[str, Any]:
     """
     건강 기록을 조회합니다.
     
+    최신 날짜순으로 반환하며, 결과가 더 있으면 next_cursor 를 cursor 로
+    넘겨 다음 페이지를 조회합니다.
+    
     Args:
         start_date (str, optional): 조회 시작 날짜 (YYYY-MM-DD)
         end_date (str, optional): 조회 종료 날짜 (YYYY-MM-DD)
         record_type (str, optional): 기록 유형 필터
-        limit (int, optional): 최대 조회 개수 (기본값: 10)
+        limit (int, optional): 한 페이지 최대 조회 개수 (기본값: 10)
+        cursor (str, optional): 이전 응답의 next_cursor (다음 페이지 조회)
         
     Returns:
-        Dict[str, Any]: 건강 기록 목록
+        Dict[str, Any]: 건강 기록 목록 (total_count 는 전체 일치 수)
     """
     logger.info(f"건강 기록 조회: {start_date} ~ {end_date}, 유형: {record_type}")
     
+    criteria = {"start_date": start_date, "end_date": end_date, "record_type": record_type}
+    try:
+        after = decode_cursor(cursor, criteria, (str, str))
+    except InvalidCursor as e:
+        return {"error": str(e)}
+    
     results = []
     
     for record in HEALTH_RECORDS.values():
@@ -197,22 +210,17 @@ async def get_health_records(
         
         results.append(record)
     
-    # 날짜 순으로 정렬 (최신순)
-    results.sort(key=lambda x: x["date"], reverse=True)
-    
-    # 제한 개수 적용
-    results = results[:limit]
+    # (날짜, id) 최신순으로 한 페이지 선택
+    total_count = len(results)
+    results, next_key = select_page(
+        results, lambda x: (x["date"], x["id"]), limit, after, descending=True
+    )
     
     return {
         "success": True,
-        "total_count": len(results),
+        **page_info(next_key, criteria, total_count, len(results)),
         "records": results,
-        "filters": {
-            "start_date": start_date,
-            "end_date": end_date,
-            "record_type": record_type,
-            "limit": limit
-        }
+        "filters": {**criteria, "limit": limit}
     }
 
 @mcp.tool()
@@ -0,0 +1,340 @@
+"""
+메모/할일 색인
+
+- ``MemoSearchIndex``: 메모 전문 검색용 역색인 (BM25 랭킹)
+  제목/내용/태그를 토큰화해 토큰 → {메모 ID: 가중 빈도} 포스팅을 유지합니다.
+  한국어는 조사/어미가 붙어 단어 단위 일치가 약하므로 한글 구간은 문자
+  bigram 으로, 영문/숫자는 단어 단위로 색인합니다. 메모 생성/수정/삭제 시
+  해당 메모의 포스팅만 갱신하므로 검색 비용은 전체 메모 수가 아니라 일치하는
+  메모 수에 비례합니다.
+- ``SecondaryIndexes``: 카테고리/우선순위/상태 해시 색인과 마감일 정렬 색인
+  필터 조건을 전체 스캔 대신 포스팅 교집합으로 계산합니다.
+- ``OverdueTracker``: 마감일 min-heap 으로 지연된 할일 수를 유지합니다.
+"""
+
+import bisect
+import functools
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+_WORD = re.compile(r"\w+")
+_HANGUL = re.compile(r"[가-힣]+")
+
+# 필드 가중치 (BM25F 를 단순화해 빈도에 곱함)
+FIELD_WEIGHTS = {"title": 2, "tags": 2, "content": 1}
+
+
+@functools.lru_cache(maxsize=65536)
+def _word_tokens(word: str) -> Tuple[str, ...]:
+    """단어 하나의 토큰 - 한글 구간은 문자 bigram(한 글자면 unigram), 나머지는 그대로
+
+    같은 단어가 반복해서 나오므로 결과를 캐시합니다 (대량 색인 구축 시 대부분 적중).
+    """
+    if not _HANGUL.search(word):
+        return (word,)
+    tokens: List[str] = _HANGUL.sub(" ", word).split()
+    for run in _HANGUL.findall(word):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tuple(tokens)
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(unicodedata.normalize("NFC", text).lower())
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for word in _words(text) for token in _word_tokens(word)]
+
+
+def query_terms(query: str) -> List[Set[str]]:
+    """검색어를 단어별 토큰 집합으로 나눕니다 (한 단어의 토큰이 모두 있어야 그 단어가 일치)."""
+    return [set(tokens) for tokens in (_word_tokens(w) for w in _words(query)) if tokens]
+
+
+class MemoSearchIndex:
+    """메모 역색인 + BM25 점수 계산
+
+    검색어의 단어 중 하나라도 (그 단어의 토큰이 모두) 포함된 메모가 후보이며,
+    후보마다 BM25 점수를 계산합니다 (상위 k 개 선택은 호출하는 쪽에서 힙으로).
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_terms: Dict[str, Counter] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.total_len = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    @staticmethod
+    def _document_terms(memo: Dict) -> Counter:
+        terms: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            value = memo.get(field) or ""
+            text = " ".join(value) if isinstance(value, list) else str(value)
+            for token, count in Counter(tokenize(text)).items():
+                terms[token] = terms.get(token, 0) + count * weight
+        return terms
+
+    def add(self, memo: Dict) -> None:
+        """메모를 색인합니다 (이미 있으면 교체)."""
+        memo_id = memo["id"]
+        if memo_id in self.doc_terms:
+            self.remove(memo_id)
+        terms = self._document_terms(memo)
+        for token, tf in terms.items():
+            self.postings.setdefault(token, {})[memo_id] = tf
+        self.doc_terms[memo_id] = terms
+        length = sum(terms.values())
+        self.doc_len[memo_id] = length
+        self.total_len += length
+
+    def remove(self, memo_id: str) -> None:
+        terms = self.doc_terms.pop(memo_id, None)
+        if terms is None:
+            return
+        for token in terms:
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.pop(memo_id, None)
+                if not posting:
+                    del self.postings[token]
+        self.total_len -= self.doc_len.pop(memo_id, 0)
+
+    def _matches(self, words: List[Set[str]]) -> Set[str]:
+        matched: Set[str] = set()
+        for tokens in words:
+            postings = sorted((self.postings.get(t, {}) for t in tokens), key=len)
+            if not postings or not postings[0]:
+                continue
+            docs = set(postings[0])
+            for posting in postings[1:]:
+                docs.intersection_update(posting)
+                if not docs:
+                    break
+            matched |= docs
+        return matched
+
+    def stats(self, query: str) -> Dict[str, Any]:
+        """검색어 점수 계산에 쓰는 말뭉치 통계 (평균 문서 길이, 토큰별 IDF)
+
+        페이지 커서에 이 값을 담아 두고 다음 페이지에서 그대로 쓰면, 그 사이에 메모가
+        추가/삭제되어도 바뀌지 않은 메모의 점수가 같게 유지되어 순서가 흔들리지 않습니다.
+        """
+        n = len(self.doc_terms)
+        idf = {}
+        for token in set().union(*query_terms(query)):
+            df = len(self.postings.get(token, ()))
+            if df:
+                idf[token] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        return {"avgdl": self.total_len / n if n else 0.0, "idf": idf}
+
+    def scored(
+        self,
+        query: str,
+        accept: Optional[Callable[[str], bool]] = None,
+        tie_breaker: Optional[Callable[[str], str]] = None,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[float, str, str]]:
+        """검색어와 일치하는 (조건에 맞는) 모든 메모의 ``(점수, 동점 키, 메모 ID)`` 목록
+
+        ``accept`` 는 카테고리 등 추가 필터, ``tie_breaker`` 는 동점일 때의 정렬 키,
+        ``stats`` 는 ``stats()`` 로 미리 구한 말뭉치 통계입니다 (없으면 지금 값).
+        """
+        words = query_terms(query)
+        candidates: Iterable[str] = self._matches(words)
+        if accept is not None:
+            candidates = [doc for doc in candidates if accept(doc)]
+        else:
+            candidates = list(candidates)
+        if not candidates:
+            return []
+
+        if stats is None:
+            stats = self.stats(query)
+        avgdl, idf = stats["avgdl"], stats["idf"]
+
+        def score(doc: str) -> float:
+            terms = self.doc_terms[doc]
+            norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc] / avgdl) if avgdl else self.k1
+            total = 0.0
+            for token, weight in idf.items():
+                tf = terms.get(token)
+                if tf:
+                    total += weight * tf * (self.k1 + 1) / (tf + norm)
+            return total
+
+        tie = tie_breaker or (lambda doc: "")
+        return [(score(doc), tie(doc), doc) for doc in candidates]
+
+
+class SecondaryIndexes:
+    """레코드(dict) 필드별 보조 색인
+
+    - ``fields``: 값 → ID 집합 해시 색인 (카테고리, 우선순위, 상태 등)
+    - ``multi_fields``: 리스트 값의 각 원소 → ID 집합 (태그)
+    - ``sorted_fields``: 필드 → 정렬 키 변환 함수. (키, ID) 정렬 리스트를
+      유지해 범위 조회를 O(log n + k) 로 처리합니다 (변환 결과가 None 이면 제외).
+
+    레코드를 수정할 때는 이전 레코드로 ``remove`` 한 뒤 새 레코드를 ``add`` 합니다.
+    """
+
+    def __init__(
+        self,
+        fields: Iterable[str] = (),
+        multi_fields: Iterable[str] = (),
+        sorted_fields: Optional[Dict[str, Callable[[Any], Any]]] = None,
+    ) -> None:
+        self.hashes: Dict[str, Dict[Any, Set[str]]] = {f: {} for f in (*fields, *multi_fields)}
+        self.multi_fields = set(multi_fields)
+        self.sort_keys = dict(sorted_fields or {})
+        self.sorted: Dict[str, List[Tuple[Any, str]]] = {f: [] for f in self.sort_keys}
+        self.keys: Dict[str, Dict[str, Any]] = {f: {} for f in self.sort_keys}
+
+    def _values(self, field: str, record: Dict) -> Iterable[Any]:
+        value = record.get(field)
+        if field in self.multi_fields:
+            return set(value or ())
+        return (value,)
+
+    def _sort_key(self, field: str, record: Dict) -> Any:
+        try:
+            return self.sort_keys[field](record.get(field))
+        except (TypeError, ValueError):
+            return None
+
+    def add(self, record: Dict) -> None:
+        record_id = record["id"]
+        for field, index in self.hashes.items():
+            for value in self._values(field, record):
+                index.setdefault(value, set()).add(record_id)
+        for field, entries in self.sorted.items():
+            key = self._sort_key(field, record)
+            if key is None:
+                continue
+            try:
+                bisect.insort(entries, (key, record_id))
+            except TypeError:
+                # 기존 키와 비교할 수 없는 값은 키가 없는 것으로 취급
+                continue
+            self.keys[field][record_id] = key
+
+    def remove(self, record: Dict) -> None:
+        record_id = record["id"]
+        for field, index in self.hashes.items():
+            for value in self._values(field, record):
+                ids = index.get(value)
+                if ids is not None:
+                    ids.discard(record_id)
+                    if not ids:
+                        del index[value]
+        for field, entries in self.sorted.items():
+            key = self.keys[field].get(record_id)
+            if key is None:
+                continue
+            i = bisect.bisect_left(entries, (key, record_id))
+            if i < len(entries) and entries[i] == (key, record_id):
+                del entries[i]
+                self.keys[field].pop(record_id, None)
+
+    def lookup(self, field: str, value: Any) -> Set[str]:
+        """필드 값이 ``value`` 인 ID 집합 (수정하지 말 것)"""
+        return self.hashes[field].get(value, set())
+
+    def any_of(self, field: str, values: Iterable[Any]) -> Set[str]:
+        """필드 값(다중 값 필드면 원소)이 ``values`` 중 하나인 ID 집합"""
+        index = self.hashes[field]
+        result: Set[str] = set()
+        for value in values:
+            result |= index.get(value, set())
+        return result
+
+    def range(
+        self, field: str, lo: Any = None, hi: Any = None, within: Optional[Set[str]] = None
+    ) -> Set[str]:
+        """정렬 키가 [lo, hi) 인 ID 집합
+
+        ``within`` 이 주어지면 그 안에서만 찾습니다. 범위가 ``within`` 보다 넓으면
+        범위를 잘라내는 대신 ``within`` 의 각 ID 키를 직접 비교합니다.
+        """
+        entries = self.sorted[field]
+        start = 0 if lo is None else bisect.bisect_left(entries, (lo,))
+        end = len(entries) if hi is None else bisect.bisect_left(entries, (hi,))
+        if within is not None and len(within) < end - start:
+            keys = self.keys[field]
+            return {
+                record_id for record_id in within
+                if record_id in keys
+                and (lo is None or keys[record_id] >= lo)
+                and (hi is None or keys[record_id] < hi)
+            }
+        ids = {record_id for _, record_id in entries[start:end]}
+        return ids if within is None else ids & within
+
+    def count(self, field: str, value: Any) -> int:
+        return len(self.hashes[field].get(value, ()))
+
+    def counts(self, field: str) -> Dict[Any, int]:
+        """필드 값별 레코드 수 (생성/수정/삭제 때 갱신되는 포스팅 크기라 값 종류 수에만 비례)"""
+        return {value: len(ids) for value, ids in self.hashes[field].items()}
+
+
+class OverdueTracker:
+    """마감일이 지난 진행 중 할일 수
+
+    아직 마감 전인 할일은 ``(마감일, ID)`` min-heap 에 두고, ``count`` 할 때
+    마감이 지난 항목만 힙에서 꺼내 지연 집합으로 옮깁니다. 각 할일은 한 번만
+    옮겨지므로 갱신/조회 비용은 항목당 O(log n) 입니다. 완료/취소/마감일 변경으로
+    무효가 된 힙 항목은 꺼낼 때 버리고, 너무 쌓이면 힙을 다시 만듭니다.
+    """
+
+    def __init__(self) -> None:
+        self.heap: List[Tuple[Any, str]] = []
+        self.pending: Dict[str, Any] = {}
+        self.overdue: Set[str] = set()
+
+    def update(self, record_id: str, due: Any, active: bool) -> None:
+        """할일의 마감일/진행 여부를 반영합니다 (마감일 없음 또는 비활성이면 제외)."""
+        self.remove(record_id)
+        if active and due is not None:
+            self.pending[record_id] = due
+            heapq.heappush(self.heap, (due, record_id))
+
+    def remove(self, record_id: str) -> None:
+        self.pending.pop(record_id, None)
+        self.overdue.discard(record_id)
+        if len(self.heap) > 2 * len(self.pending) + 64:
+            self.heap = [(due, rid) for rid, due in self.pending.items()]
+            heapq.heapify(self.heap)
+
+    def count(self, now: Any) -> int:
+        heap, pending = self.heap, self.pending
+        while heap and heap[0][0] < now:
+            due, record_id = heapq.heappop(heap)
+            if pending.get(record_id) == due:
+                del pending[record_id]
+                self.overdue.add(record_id)
+        return len(self.overdue)
+
+
+def intersect(id_sets: Iterable[Set[str]]) -> Optional[Set[str]]:
+    """ID 집합들의 교집합 (작은 집합부터). 조건이 하나도 없으면 None (= 전체)"""
+    ordered = sorted(id_sets, key=len)
+    if not ordered:
+        return None
+    result = set(ordered[0])
+    for ids in ordered[1:]:
+        if not result:
+            break
+        result &= ids
+    return result
@@ -1,4 +1,5 @@
 from mcp.server.fastmcp import FastMCP
+import atexit
 import os
 import json
 import logging
@@ -8,6 +9,10 @@ import uuid
 from datetime import datetime
 import random
 
+from memo_index import MemoSearchIndex, OverdueTracker, SecondaryIndexes, intersect
+from memo_store import create_store
+from pagination import NUMBER, InvalidCursor, decode_cursor, decode_cursor_state, page_info, select_page
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -16,6 +21,13 @@ MEMO_MCP_HOST = "0.0.0.0"
 MEMO_MCP_PORT = 10005
 MEMO_MCP_INSTRUCTIONS = "메모관리 개인비서입니다. 메모 작성, 할일 관리, 정보 저장과 검색에 특화된 서비스를 제공합니다."
 
+# 저장소 백엔드: "sqlite"(기본), "jsonl", "memory"(재시작하면 사라짐)
+MEMO_STORE_BACKEND = os.environ.get("MEMO_STORE_BACKEND", "sqlite")
+MEMO_STORE_PATH = os.environ.get(
+    "MEMO_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", f"memo_store.{MEMO_STORE_BACKEND}"),
+)
+
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -31,9 +43,44 @@ mcp = FastMCP(
     port=MEMO_MCP_PORT,
 )
 
-# 가짜 데이터 저장소
-MEMOS = {}
-TODOS = {}
+# 메모/할일 저장소 (메모리 테이블을 읽고, 변경은 STORE.put/delete 로 기록)
+STORE = create_store(MEMO_STORE_BACKEND, MEMO_STORE_PATH)
+atexit.register(STORE.close)
+MEMOS = STORE.table("memos")
+TODOS = STORE.table("todos")
+
+# 메모 전문 검색 역색인 (생성/수정/삭제 시 갱신)
+MEMO_INDEX = MemoSearchIndex()
+
+
+def parse_due_date(due_date: Optional[str]) -> Optional[datetime]:
+    """ISO 마감일을 비교 가능한 naive 로컬 시각으로 변환합니다 (시간대가 있으면 로컬로 바꿈)."""
+    if not due_date:
+        return None
+    due = datetime.fromisoformat(due_date)
+    if due.tzinfo is not None:
+        due = due.astimezone().replace(tzinfo=None)
+    return due
+
+
+# 필터용 보조 색인 (생성/수정/삭제/상태 변경 시 갱신)
+MEMO_FILTERS = SecondaryIndexes(fields=("category", "priority"), multi_fields=("tags",))
+TODO_FILTERS = SecondaryIndexes(
+    fields=("category", "priority", "status"),
+    sorted_fields={"due_date": parse_due_date},
+)
+
+# 지연된 할일 수 (완료/취소되지 않았고 마감일이 지난 할일)
+TODO_OVERDUE = OverdueTracker()
+CLOSED_STATUSES = ("completed", "cancelled")
+
+
+def track_todo(todo: Dict[str, Any]) -> None:
+    try:
+        due = parse_due_date(todo["due_date"])
+    except (TypeError, ValueError):
+        due = None
+    TODO_OVERDUE.update(todo["id"], due, todo["status"] not in CLOSED_STATUSES)
 
 # 초기 가짜 메모 데이터
 INITIAL_MEMOS = [
@@ -87,12 +134,44 @@ INITIAL_TODOS = [
     }
 ]
 
-# 초기 데이터 로드
-for memo in INITIAL_MEMOS:
-    MEMOS[memo["id"]] = memo
+# 저장소가 비어 있으면 초기 데이터로 채움
+if STORE.is_empty():
+    STORE.put_many("memos", INITIAL_MEMOS)
+    STORE.put_many("todos", INITIAL_TODOS)
+
+# 색인에 쓰는 필드와 형식 (저장소에서 읽은 레코드를 색인 전에 검사)
+MEMO_FIELDS = {"title": str, "content": str, "category": str, "priority": str, "tags": list}
+TODO_FIELDS = {"title": str, "status": str, "priority": str, "category": str, "tags": list}
+
+
+def check_record(record: Dict[str, Any], fields: Dict[str, type]) -> None:
+    for field, kind in fields.items():
+        if not isinstance(record.get(field), kind):
+            raise ValueError(f"'{field}' 필드가 없거나 형식이 잘못되었습니다")
+    if not all(isinstance(tag, str) for tag in record["tags"]):
+        raise ValueError("'tags' 에 문자열이 아닌 값이 있습니다")
+
 
-for todo in INITIAL_TODOS:
-    TODOS[todo["id"]] = todo
+def index_memo(memo: Dict[str, Any]) -> None:
+    check_record(memo, MEMO_FIELDS)
+    MEMO_INDEX.add(memo)
+    MEMO_FILTERS.add(memo)
+
+
+def index_todo(todo: Dict[str, Any]) -> None:
+    check_record(todo, TODO_FIELDS)
+    TODO_FILTERS.add(todo)
+    track_todo(todo)
+
+
+# 색인 구축 (색인할 수 없는 레코드는 격리하고 나머지로 시작)
+for table_name, index_record in (("memos", index_memo), ("todos", index_todo)):
+    for record in list(STORE.table(table_name).values()):
+        try:
+            index_record(record)
+        except ValueError as e:
+            logger.warning(f"{table_name} 레코드 {record['id']} 를 격리합니다 (저장소 원본은 유지): {e}")
+            STORE.quarantine(table_name, record["id"])
 
 @mcp.tool()
 async def create_memo(
@@ -129,7 +208,9 @@ async def create_memo(
         "updated_at": datetime.now().isoformat()
     }
     
-    MEMOS[memo_id] = new_memo
+    STORE.put("memos", new_memo)
+    MEMO_INDEX.add(new_memo)
+    MEMO_FILTERS.add(new_memo)
     
     return {
         "success": True,
@@ -164,63 +245,81 @@ async def search_memos(
     category: str = None,
     tags: List[str] = None,
     priority: str = None,
-    limit: int = 10
+    limit: int = 10,
+    cursor: str = None
 ) -> Dict[str, Any]:
     """
     메모를 검색합니다.
     
+    키워드가 있으면 제목/내용/태그 역색인에서 찾아 관련도(BM25) 순으로,
+    없으면 최신순으로 반환합니다. 결과가 더 있으면 next_cursor 를 cursor 로
+    넘겨 다음 페이지를 조회합니다.
+    
     Args:
-        keyword (str, optional): 제목이나 내용에서 검색할 키워드
+        keyword (str, optional): 제목, 내용, 태그에서 검색할 키워드 (여러 단어면 하나라도 포함된 메모)
         category (str, optional): 카테고리 필터
         tags (List[str], optional): 포함해야 할 태그들
         priority (str, optional): 우선순위 필터
-        limit (int, optional): 최대 결과 개수 (기본값: 10)
+        limit (int, optional): 한 페이지 최대 결과 개수 (기본값: 10)
+        cursor (str, optional): 이전 응답의 next_cursor (다음 페이지 조회)
         
     Returns:
-        Dict[str, Any]: 검색된 메모 목록
+        Dict[str, Any]: 검색된 메모 목록 (total_count 는 전체 일치 수)
     """
     logger.info(f"메모 검색: 키워드={keyword}, 카테고리={category}, 태그={tags}")
     
-    results = []
-    
-    for memo in MEMOS.values():
-        # 키워드 검색
-        if keyword:
-            if keyword.lower() not in memo["title"].lower() and keyword.lower() not in memo["content"].lower():
-                continue
-        
-        # 카테고리 필터
-        if category and memo["category"] != category:
-            continue
-        
-        # 태그 필터
-        if tags:
-            if not any(tag in memo["tags"] for tag in tags):
-                continue
-        
-        # 우선순위 필터
-        if priority and memo["priority"] != priority:
-            continue
-        
-        results.append(memo)
-    
-    # 최신순으로 정렬
-    results.sort(key=lambda x: x["updated_at"], reverse=True)
-    
-    # 제한 개수 적용
-    results = results[:limit]
+    criteria = {"keyword": keyword, "category": category, "tags": tags, "priority": priority}
+    try:
+        after, stats = decode_cursor_state(cursor, criteria, (NUMBER, str, str) if keyword else (str, str))
+    except InvalidCursor as e:
+        return {"error": str(e)}
+    if stats is not None and not (
+        isinstance(stats, dict)
+        and isinstance(stats.get("avgdl"), (int, float))
+        and isinstance(stats.get("idf"), dict)
+        and all(isinstance(w, (int, float)) for w in stats["idf"].values())
+    ):
+        return {"error": "커서 형식이 올바르지 않습니다."}
+    
+    # 카테고리/태그/우선순위 필터는 보조 색인 포스팅의 교집합 (None 이면 필터 없음)
+    postings = []
+    if category:
+        postings.append(MEMO_FILTERS.lookup("category", category))
+    if tags:
+        postings.append(MEMO_FILTERS.any_of("tags", tags))
+    if priority:
+        postings.append(MEMO_FILTERS.lookup("priority", priority))
+    allowed = intersect(postings)
+    
+    if keyword:
+        # 역색인 후보만 점수 계산 후 (점수, 최신순, id) 키로 한 페이지 선택.
+        # 점수는 첫 페이지의 말뭉치 통계로 계산해 커서에 담으므로, 페이지 사이에
+        # 메모가 추가/삭제되어도 점수 척도가 바뀌지 않아 중복/누락 없이 이어진다.
+        if stats is None:
+            stats = MEMO_INDEX.stats(keyword)
+        scored = MEMO_INDEX.scored(
+            keyword,
+            accept=None if allowed is None else allowed.__contains__,
+            tie_breaker=lambda memo_id: MEMOS[memo_id]["updated_at"],
+            stats=stats,
+        )
+        total_count = len(scored)
+        ranked, next_key = select_page(scored, lambda x: x, limit, after, descending=True)
+        results = [{**MEMOS[memo_id], "score": round(score, 4)} for score, _, memo_id in ranked]
+    else:
+        stats = None
+        # 최신순 (updated_at, id) 키로 한 페이지 선택 (전체 정렬 대신 힙 선택)
+        candidates = MEMOS.values() if allowed is None else [MEMOS[memo_id] for memo_id in allowed]
+        total_count = len(candidates)
+        results, next_key = select_page(
+            candidates, lambda x: (x["updated_at"], x["id"]), limit, after, descending=True
+        )
     
     return {
         "success": True,
-        "total_count": len(results),
+        **page_info(next_key, criteria, total_count, len(results), stats),
         "memos": results,
-        "search_criteria": {
-            "keyword": keyword,
-            "category": category,
-            "tags": tags,
-            "priority": priority,
-            "limit": limit
-        }
+        "search_criteria": {**criteria, "limit": limit}
     }
 
 @mcp.tool()
@@ -251,7 +350,8 @@ async def update_memo(
     if memo_id not in MEMOS:
         return {"error": f"ID {memo_id}에 해당하는 메모를 찾을 수 없습니다."}
     
-    memo = MEMOS[memo_id].copy()
+    previous = MEMOS[memo_id]
+    memo = previous.copy()
     
     # 수정할 필드들 업데이트
     if title is not None:
@@ -266,7 +366,11 @@ async def update_memo(
         memo["priority"] = priority
     
     memo["updated_at"] = datetime.now().isoformat()
-    MEMOS[memo_id] = memo
+    STORE.put("memos", memo)
+    if title is not None or content is not None or tags is not None:
+        MEMO_INDEX.add(memo)
+    MEMO_FILTERS.remove(previous)
+    MEMO_FILTERS.add(memo)
     
     return {
         "success": True,
@@ -290,7 +394,9 @@ async def delete_memo(memo_id: str) -> Dict[str, Any]:
     if memo_id not in MEMOS:
         return {"error": f"ID {memo_id}에 해당하는 메모를 찾을 수 없습니다."}
     
-    deleted_memo = MEMOS.pop(memo_id)
+    deleted_memo = STORE.delete("memos", memo_id)
+    MEMO_INDEX.remove(memo_id)
+    MEMO_FILTERS.remove(deleted_memo)
     
     return {
         "success": True,
@@ -323,6 +429,11 @@ async def create_todo(
     """
     logger.info(f"할일 생성 요청: {title}")
     
+    try:
+        due = parse_due_date(due_date)
+    except (TypeError, ValueError):
+        return {"error": f"유효하지 않은 마감일입니다: {due_date} (ISO 형식: YYYY-MM-DDTHH:MM:SS)"}
+    
     todo_id = str(uuid.uuid4())
     new_todo = {
         "id": todo_id,
@@ -330,14 +441,16 @@ async def create_todo(
         "description": description,
         "priority": priority,
         "status": "pending",
-        "due_date": due_date,
+        "due_date": due.isoformat() if due else None,
         "category": category,
         "tags": tags or [],
         "created_at": datetime.now().isoformat(),
         "updated_at": datetime.now().isoformat()
     }
     
-    TODOS[todo_id] = new_todo
+    STORE.put("todos", new_todo)
+    TODO_FILTERS.add(new_todo)
+    track_todo(new_todo)
     
     return {
         "success": True,
@@ -351,70 +464,62 @@ async def list_todos(
     priority: str = None,
     category: str = None,
     overdue_only: bool = False,
-    limit: int = 10
+    limit: int = 10,
+    cursor: str = None
 ) -> Dict[str, Any]:
     """
     할일 목록을 조회합니다.
     
+    우선순위가 높고 마감일이 늦은 순으로 반환하며, 결과가 더 있으면
+    next_cursor 를 cursor 로 넘겨 다음 페이지를 조회합니다.
+    
     Args:
         status (str, optional): 상태 필터 ("pending", "in_progress", "completed", "cancelled")
         priority (str, optional): 우선순위 필터 ("low", "medium", "high")
         category (str, optional): 카테고리 필터
         overdue_only (bool, optional): 지연된 할일만 조회 (기본값: False)
-        limit (int, optional): 최대 조회 개수 (기본값: 10)
+        limit (int, optional): 한 페이지 최대 조회 개수 (기본값: 10)
+        cursor (str, optional): 이전 응답의 next_cursor (다음 페이지 조회)
         
     Returns:
-        Dict[str, Any]: 할일 목록
+        Dict[str, Any]: 할일 목록 (total_count 는 전체 일치 수)
     """
     logger.info(f"할일 목록 조회: 상태={status}, 우선순위={priority}")
     
-    results = []
-    current_time = datetime.now()
-    
-    for todo in TODOS.values():
-        # 상태 필터
-        if status and todo["status"] != status:
-            continue
-        
-        # 우선순위 필터
-        if priority and todo["priority"] != priority:
-            continue
-        
-        # 카테고리 필터
-        if category and todo["category"] != category:
-            continue
-        
-        # 지연된 할일만 조회
-        if overdue_only:
-            if not todo["due_date"]:
-                continue
-            due_dt = datetime.fromisoformat(todo["due_date"])
-            if due_dt >= current_time or todo["status"] == "completed":
-                continue
-        
-        results.append(todo)
-    
-    # 우선순위와 마감일 순으로 정렬
+    criteria = {"status": status, "priority": priority, "category": category, "overdue_only": overdue_only}
+    try:
+        after = decode_cursor(cursor, criteria, (int, str, str))
+    except InvalidCursor as e:
+        return {"error": str(e)}
+    
+    # 상태/우선순위/카테고리 해시 색인과 마감일 정렬 색인의 교집합
+    postings = []
+    if status:
+        postings.append(TODO_FILTERS.lookup("status", status))
+    if priority:
+        postings.append(TODO_FILTERS.lookup("priority", priority))
+    if category:
+        postings.append(TODO_FILTERS.lookup("category", category))
+    allowed = intersect(postings)
+    if overdue_only:
+        # 마감일이 지금 이전인 할일 (정렬 색인 이진 탐색) 중 완료되지 않은 것
+        allowed = TODO_FILTERS.range("due_date", hi=datetime.now(), within=allowed)
+        allowed -= TODO_FILTERS.lookup("status", "completed")
+    candidates = TODOS.values() if allowed is None else [TODOS[todo_id] for todo_id in allowed]
+    
+    # (우선순위, 마감일, id) 키로 한 페이지 선택 (전체 정렬 대신 힙 선택)
     priority_order = {"high": 3, "medium": 2, "low": 1}
-    results.sort(key=lambda x: (
+    results, next_key = select_page(candidates, lambda x: (
         priority_order.get(x["priority"], 0),
-        x["due_date"] or "9999-12-31T23:59:59"
-    ), reverse=True)
-    
-    # 제한 개수 적용
-    results = results[:limit]
+        x["due_date"] or "9999-12-31T23:59:59",
+        x["id"]
+    ), limit, after, descending=True)
     
     return {
         "success": True,
-        "total_count": len(results),
+        **page_info(next_key, criteria, len(candidates), len(results)),
         "todos": results,
-        "filters": {
-            "status": status,
-            "priority": priority,
-            "category": category,
-            "overdue_only": overdue_only,
-            "limit": limit
-        }
+        "filters": {**criteria, "limit": limit}
     }
 
 @mcp.tool()
@@ -438,14 +543,18 @@ async def update_todo_status(todo_id: str, status: str) -> Dict[str, Any]:
     if status not in valid_statuses:
         return {"error": f"유효하지 않은 상태입니다. 가능한 상태: {valid_statuses}"}
     
-    todo = TODOS[todo_id].copy()
+    previous = TODOS[todo_id]
+    todo = previous.copy()
     todo["status"] = status
     todo["updated_at"] = datetime.now().isoformat()
     
     if status == "completed":
         todo["completed_at"] = datetime.now().isoformat()
     
-    TODOS[todo_id] = todo
+    STORE.put("todos", todo)
+    TODO_FILTERS.remove(previous)
+    TODO_FILTERS.add(todo)
+    track_todo(todo)
     
     return {
         "success": True,
@@ -463,31 +572,12 @@ async def get_memo_statistics() -> Dict[str, Any]:
     """
     logger.info("메모/할일 통계 조회")
     
-    # 메모 통계
-    memo_categories = {}
-    memo_priorities = {"low": 0, "medium": 0, "high": 0}
-    
-    for memo in MEMOS.values():
-        category = memo["category"]
-        memo_categories[category] = memo_categories.get(category, 0) + 1
-        memo_priorities[memo["priority"]] += 1
-    
-    # 할일 통계
-    todo_statuses = {"pending": 0, "in_progress": 0, "completed": 0, "cancelled": 0}
-    todo_priorities = {"low": 0, "medium": 0, "high": 0}
-    overdue_count = 0
-    
-    current_time = datetime.now()
-    
-    for todo in TODOS.values():
-        todo_statuses[todo["status"]] += 1
-        todo_priorities[todo["priority"]] += 1
-        
-        # 지연된 할일 계산
-        if todo["due_date"] and todo["status"] not in ["completed", "cancelled"]:
-            due_dt = datetime.fromisoformat(todo["due_date"])
-            if due_dt < current_time:
-                overdue_count += 1
+    # 생성/수정/삭제/상태 변경 때 갱신된 보조 색인 포스팅 크기와 마감일 힙에서 바로 계산
+    memo_categories = MEMO_FILTERS.counts("category")
+    memo_priorities = {"low": 0, "medium": 0, "high": 0, **MEMO_FILTERS.counts("priority")}
+    todo_statuses = {"pending": 0, "in_progress": 0, "completed": 0, "cancelled": 0, **TODO_FILTERS.counts("status")}
+    todo_priorities = {"low": 0, "medium": 0, "high": 0, **TODO_FILTERS.counts("priority")}
+    overdue_count = TODO_OVERDUE.count(datetime.now())
     
     return {
         "memo_statistics": {
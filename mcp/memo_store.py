@@ -0,0 +1,319 @@
+"""
+메모/할일 저장소 백엔드
+
+모든 레코드는 메모리의 ``테이블 이름 → {ID: 레코드}`` dict 에 올려 두고 조회하며,
+변경(put/delete)만 백엔드에 기록합니다. 도구 함수는 ``table()`` 이 돌려준 dict 를
+그대로 읽으므로 백엔드가 바뀌어도 동작이 같습니다.
+
+- ``MemoryStore``: 기록하지 않음 (재시작하면 사라짐, 기존 동작)
+- ``SqliteStore``: 내장 SQLite (WAL, 고정 SQL 문 재사용, 배치 커밋)
+- ``JsonlStore``: 추가 전용 JSONL 로그 + 주기적 압축 스냅샷
+
+쓰기는 ``batch_size`` 개 또는 ``flush_interval`` 초마다 한 번에 커밋합니다.
+이벤트 루프 밖에서 호출되면 즉시 커밋합니다.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("memo_store")
+
+TABLES = ("memos", "todos")
+
+
+class RecordStore:
+    """저장소 공통 동작 (메모리 테이블 + 배치 커밋)"""
+
+    def __init__(self, batch_size: int = 256, flush_interval: float = 0.05) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {name: {} for name in TABLES}
+        self.pending = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # 읽었지만 쓸 수 없는 레코드 (메모리 테이블에서 빼 두고 백엔드에는 그대로 남김)
+        self.quarantined: Dict[str, Dict[str, Any]] = {name: {} for name in TABLES}
+
+    def open(self) -> "RecordStore":
+        """저장된 레코드를 메모리 테이블로 읽어 들입니다 (ID 가 없는 레코드는 건너뜀)."""
+        skipped = 0
+        for name, record in self._load():
+            if not isinstance(record, dict) or not isinstance(record.get("id"), str):
+                skipped += 1
+                continue
+            self.tables.setdefault(name, {})[record["id"]] = record
+        if skipped:
+            logger.warning(f"ID 가 없거나 형식이 잘못된 레코드 {skipped}개를 건너뛰었습니다.")
+        return self
+
+    def table(self, name: str) -> Dict[str, Dict[str, Any]]:
+        return self.tables[name]
+
+    def quarantine(self, name: str, record_id: str) -> None:
+        """레코드를 메모리 테이블에서 빼 격리합니다. 백엔드의 원본은 지우지 않습니다."""
+        record = self.tables[name].pop(record_id, None)
+        if record is not None:
+            self.quarantined.setdefault(name, {})[record_id] = record
+
+    def is_empty(self) -> bool:
+        return not any(self.tables.values())
+
+    def put(self, name: str, record: Dict[str, Any]) -> None:
+        self.tables[name][record["id"]] = record
+        self._write_put(name, record)
+        self._written()
+
+    def put_many(self, name: str, records: Iterable[Dict[str, Any]]) -> None:
+        records = list(records)
+        for record in records:
+            self.tables[name][record["id"]] = record
+        self._write_many(name, records)
+        self.flush()
+
+    def delete(self, name: str, record_id: str) -> Optional[Dict[str, Any]]:
+        record = self.tables[name].pop(record_id, None)
+        if record is not None:
+            self._write_delete(name, record_id)
+            self._written()
+        return record
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self.pending or self._dirty():
+            self._commit()
+        self.pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._close()
+
+    def _written(self) -> None:
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+            return
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._flush_handle = loop.call_later(self.flush_interval, self.flush)
+
+    # 백엔드별 구현
+    def _load(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        return ()
+
+    def _write_put(self, name: str, record: Dict[str, Any]) -> None:
+        pass
+
+    def _write_many(self, name: str, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            self._write_put(name, record)
+
+    def _write_delete(self, name: str, record_id: str) -> None:
+        pass
+
+    def _dirty(self) -> bool:
+        return False
+
+    def _commit(self) -> None:
+        pass
+
+    def _close(self) -> None:
+        pass
+
+
+class MemoryStore(RecordStore):
+    """기록하지 않는 저장소"""
+
+
+class SqliteStore(RecordStore):
+    """내장 SQLite 저장소
+
+    ``records(tbl, id, data)`` 한 테이블에 레코드를 JSON 으로 저장합니다.
+    WAL + ``synchronous=NORMAL`` 로 쓰기와 읽기가 서로 막지 않고, 고정된 SQL 문을
+    재사용해 sqlite3 의 문장 캐시(준비된 문장)를 타며, 여러 변경을 한 트랜잭션으로
+    모아 커밋합니다.
+    """
+
+    UPSERT = "INSERT OR REPLACE INTO records (tbl, id, data) VALUES (?, ?, ?)"
+    DELETE = "DELETE FROM records WHERE tbl = ? AND id = ?"
+    SELECT = "SELECT tbl, data FROM records"
+
+    def __init__(self, path: str, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "tbl TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (tbl, id)) WITHOUT ROWID"
+        )
+
+    def _begin(self) -> None:
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+
+    def _load(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        loads = json.loads
+        for name, data in self.conn.execute(self.SELECT):
+            try:
+                yield name, loads(data)
+            except json.JSONDecodeError:
+                logger.warning(f"SQLite 저장소의 손상된 레코드를 건너뜁니다: {name}")
+        logger.info(f"SQLite 저장소 로드: {self.path}")
+
+    def _write_put(self, name: str, record: Dict[str, Any]) -> None:
+        self._begin()
+        self.conn.execute(self.UPSERT, (name, record["id"], json.dumps(record, ensure_ascii=False)))
+
+    def _write_many(self, name: str, records: List[Dict[str, Any]]) -> None:
+        self._begin()
+        self.conn.executemany(
+            self.UPSERT,
+            ((name, record["id"], json.dumps(record, ensure_ascii=False)) for record in records),
+        )
+
+    def _write_delete(self, name: str, record_id: str) -> None:
+        self._begin()
+        self.conn.execute(self.DELETE, (name, record_id))
+
+    def _dirty(self) -> bool:
+        return self.conn.in_transaction
+
+    def _commit(self) -> None:
+        if self.conn.in_transaction:
+            self.conn.execute("COMMIT")
+
+    def _close(self) -> None:
+        self.conn.close()
+
+
+class JsonlStore(RecordStore):
+    """추가 전용 JSONL 로그 + 압축 스냅샷 저장소
+
+    변경은 ``{"op": "put"|"del", "tbl", ...}`` 한 줄씩 로그 끝에 덧붙이고,
+    로그 줄 수가 ``compact_min_ops`` 이상이면서 살아 있는 레코드 수보다 많아지면
+    현재 테이블 전체를 스냅샷(``<path>.snapshot``)으로 쓰고 로그를 비웁니다.
+    시작할 때는 스냅샷을 읽고 로그를 다시 적용합니다. 스냅샷 교체와 로그 비우기
+    사이에 멈춰도 로그 재적용은 같은 결과를 내므로 안전합니다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compact_min_ops: int = 10000,
+        fsync: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.path = path
+        self.snapshot_path = f"{path}.snapshot"
+        self.compact_min_ops = compact_min_ops
+        self.fsync = fsync
+        self.log_ops = 0
+        self._buffer: List[str] = []
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._log = None
+
+    def _load(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        loads = json.loads
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = loads(line)
+                        name, record = entry["tbl"], entry["record"]
+                    except (json.JSONDecodeError, TypeError, KeyError):
+                        logger.warning(f"JSONL 스냅샷의 손상된 줄을 건너뜁니다: {self.snapshot_path}")
+                        continue
+                    yield name, record
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = loads(line)
+                        op, name = entry["op"], entry["tbl"]
+                        target = entry["record"] if op == "put" else entry["id"]
+                    except (json.JSONDecodeError, TypeError, KeyError):
+                        # 마지막 줄이 쓰다가 끊긴 경우 등
+                        logger.warning(f"JSONL 로그의 손상된 줄을 건너뜁니다: {self.path}")
+                        continue
+                    self.log_ops += 1
+                    if op == "put":
+                        yield name, target
+                    elif isinstance(target, str):
+                        self.tables.setdefault(name, {}).pop(target, None)
+        self._log = open(self.path, "a", encoding="utf-8")
+        logger.info(f"JSONL 저장소 로드: {self.path} (로그 {self.log_ops}줄)")
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        self._buffer.append(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _write_put(self, name: str, record: Dict[str, Any]) -> None:
+        self._append({"op": "put", "tbl": name, "record": record})
+
+    def _write_delete(self, name: str, record_id: str) -> None:
+        self._append({"op": "del", "tbl": name, "id": record_id})
+
+    def _dirty(self) -> bool:
+        return bool(self._buffer)
+
+    def _commit(self) -> None:
+        if self._log is None:
+            self._log = open(self.path, "a", encoding="utf-8")
+        self._log.writelines(self._buffer)
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self.log_ops += len(self._buffer)
+        self._buffer.clear()
+        live = sum(len(records) for records in self.tables.values())
+        if self.log_ops >= self.compact_min_ops and self.log_ops > live:
+            self.compact()
+
+    def compact(self) -> None:
+        """현재 테이블로 스냅샷을 새로 쓰고 로그를 비웁니다."""
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # 격리된 레코드도 원본 그대로 남기되, 같은 ID 의 정상 레코드가 뒤에 오도록 먼저 씀
+            for tables in (self.quarantined, self.tables):
+                for name, records in tables.items():
+                    for record in records.values():
+                        f.write(json.dumps({"tbl": name, "record": record}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        if self._log is not None:
+            self._log.close()
+        self._log = open(self.path, "w", encoding="utf-8")
+        logger.info(f"JSONL 로그 압축: {self.log_ops}줄 → 스냅샷")
+        self.log_ops = 0
+
+    def _close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def create_store(backend: str, path: str = "", **kwargs: Any) -> RecordStore:
+    """설정에 맞는 저장소를 열어 반환합니다 (``memory``/``sqlite``/``jsonl``)."""
+    if backend == "memory":
+        store: RecordStore = MemoryStore(**kwargs)
+    elif backend == "sqlite":
+        store = SqliteStore(path, **kwargs)
+    elif backend == "jsonl":
+        store = JsonlStore(path, **kwargs)
+    else:
+        raise ValueError(f"알 수 없는 저장소 백엔드: {backend}")
+    return store.open()
@@ -8,6 +8,8 @@ import uuid
 from datetime import datetime
 import hashlib
 
+from pagination import InvalidCursor, decode_cursor, page_info, select_page
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -166,23 +168,34 @@ async def list_files(
     search_query: str = None,
     content_type: str = None,
     tags: List[str] = None,
-    limit: int = 10
+    limit: int = 10,
+    cursor: str = None
 ) -> Dict[str, Any]:
     """
     저장된 파일 목록을 조회합니다.
     
+    최신순으로 반환하며, 결과가 더 있으면 next_cursor 를 cursor 로 넘겨
+    다음 페이지를 조회합니다.
+    
     Args:
         search_query (str, optional): 파일명 검색 쿼리
         content_type (str, optional): 컨텐츠 타입 필터
         tags (List[str], optional): 태그 필터
-        limit (int, optional): 최대 조회 개수 (기본값: 10)
+        limit (int, optional): 한 페이지 최대 조회 개수 (기본값: 10)
+        cursor (str, optional): 이전 응답의 next_cursor (다음 페이지 조회)
         
     Returns:
-        Dict[str, Any]: 파일 목록
+        Dict[str, Any]: 파일 목록 (total_count 는 전체 일치 수)
     """
     logger.info(f"파일 목록 조회: 쿼리={search_query}, 타입={content_type}")
     
-    results = []
+    criteria = {"search_query": search_query, "content_type": content_type, "tags": tags}
+    try:
+        after = decode_cursor(cursor, criteria, (str, str))
+    except InvalidCursor as e:
+        return {"error": str(e)}
+    
+    matched = []
     
     for file_info in STORED_FILES.values():
         # 검색 쿼리 필터
@@ -199,8 +212,16 @@ async def list_files(
             if not any(tag in file_info["tags"] for tag in tags):
                 continue
         
-        # 민감한 정보 제외한 요약 정보
-        file_summary = {
+        matched.append(file_info)
+    
+    # (수정 시각, id) 최신순으로 한 페이지 선택
+    page, next_key = select_page(
+        matched, lambda x: (x["updated_at"], x["id"]), limit, after, descending=True
+    )
+    
+    # 민감한 정보 제외한 요약 정보
+    results = [
+        {
             "id": file_info["id"],
             "filename": file_info["filename"],
             "content_type": file_info["content_type"],
@@ -210,24 +231,14 @@ async def list_files(
             "updated_at": file_info["updated_at"],
             "version": file_info["version"]
         }
-        results.append(file_summary)
-    
-    # 최신순으로 정렬
-    results.sort(key=lambda x: x["updated_at"], reverse=True)
-    
-    # 제한 개수 적용
-    results = results[:limit]
+        for file_info in page
+    ]
     
     return {
         "success": True,
-        "total_count": len(results),
+        **page_info(next_key, criteria, len(matched), len(results)),
         "files": results,
-        "filters": {
-            "search_query": search_query,
-            "content_type": content_type,
-            "tags": tags,
-            "limit": limit
-        }
+        "filters": {**criteria, "limit": limit}
     }
 
 @mcp.tool()
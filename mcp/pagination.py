@@ -0,0 +1,120 @@
+"""
+목록/검색 도구 공통 커서 페이지네이션 (keyset)
+
+각 도구는 결과를 ``(정렬 키..., id)`` 튜플 순서로 내보내고, 페이지의 마지막 항목
+키를 불투명한 커서 문자열로 돌려줍니다. 다음 호출은 그 키 "다음" 항목만 후보로
+삼아 상위 ``limit + 1`` 개를 힙으로 고르므로 매번 전체를 정렬하지 않고, 중간에
+항목이 추가/삭제되어도 앞 페이지를 다시 보내지 않습니다. 단, 페이지 사이에 정렬
+키 자체가 바뀐 항목(수정된 메모 등)은 새 위치로 옮겨 가므로 빠지거나 다시 나올 수
+있습니다.
+
+정렬 키가 다른 항목에 따라 달라지는 경우(BM25 점수는 말뭉치 통계에 의존)에는
+첫 페이지에서 쓴 값을 ``state`` 로 커서에 담아 다음 페이지에서도 같은 기준으로
+정렬합니다. 커서에는 검색 조건의 지문이 들어 있어 다른 조건으로 재사용하면 거절하고,
+되돌린 키가 도구의 정렬 키 모양(길이, 원소 형식)과 다르면 비교하기 전에 거절합니다.
+"""
+
+import base64
+import hashlib
+import heapq
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# 정렬 키 원소 형식 (``isinstance`` 두 번째 인자) - 예: (str, str), (NUMBER, str, str)
+KeyTypes = Sequence[Any]
+NUMBER = (int, float)
+
+
+class InvalidCursor(ValueError):
+    """해석할 수 없거나 다른 검색 조건에서 만든 커서"""
+
+
+def _fingerprint(criteria: Dict[str, Any]) -> str:
+    data = json.dumps(criteria, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(key: Sequence[Any], criteria: Dict[str, Any], state: Any = None) -> str:
+    data = {"k": list(key), "f": _fingerprint(criteria)}
+    if state is not None:
+        data["s"] = state
+    payload = json.dumps(data, ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(
+    cursor: Optional[str], criteria: Dict[str, Any], key_types: KeyTypes
+) -> Optional[Tuple[Any, ...]]:
+    """커서를 정렬 키 튜플로 되돌립니다 (없으면 None, 잘못되면 ``InvalidCursor``).
+
+    ``key_types`` 는 도구 정렬 키의 원소별 형식입니다.
+    """
+    return decode_cursor_state(cursor, criteria, key_types)[0]
+
+
+def decode_cursor_state(
+    cursor: Optional[str], criteria: Dict[str, Any], key_types: KeyTypes
+) -> Tuple[Optional[Tuple[Any, ...]], Any]:
+    """커서를 ``(정렬 키 튜플, 첫 페이지에서 담은 state)`` 로 되돌립니다."""
+    if not cursor:
+        return None, None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        key, fingerprint = payload["k"], payload["f"]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("커서 형식이 올바르지 않습니다.")
+    if fingerprint != _fingerprint(criteria):
+        raise InvalidCursor("커서가 현재 검색 조건과 맞지 않습니다. 같은 조건으로 다시 요청하세요.")
+    # 형식이 다른 키는 select_page 의 비교에서 TypeError 가 나므로 여기서 거절
+    if (
+        not isinstance(key, list)
+        or len(key) != len(key_types)
+        or not all(isinstance(value, kind) for value, kind in zip(key, key_types))
+    ):
+        raise InvalidCursor("커서 형식이 올바르지 않습니다.")
+    return tuple(key), payload.get("s")
+
+
+def select_page(
+    items: Iterable[T],
+    key: Callable[[T], Tuple[Any, ...]],
+    limit: int,
+    after: Optional[Tuple[Any, ...]] = None,
+    descending: bool = False,
+) -> Tuple[List[T], Optional[Tuple[Any, ...]]]:
+    """``after`` 다음부터 ``limit`` 개와 다음 페이지 키(마지막 페이지면 None)를 반환합니다.
+
+    ``key`` 는 항목마다 유일해야 하므로 마지막 요소로 id 를 넣습니다.
+    """
+    if limit <= 0:
+        return [], None
+    if after is not None:
+        if descending:
+            items = (item for item in items if key(item) < after)
+        else:
+            items = (item for item in items if key(item) > after)
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    top = pick(limit + 1, items, key=key)
+    if len(top) > limit:
+        page = top[:limit]
+        return page, key(page[-1])
+    return top, None
+
+
+def page_info(
+    next_key: Optional[Tuple[Any, ...]],
+    criteria: Dict[str, Any],
+    total_count: int,
+    returned: int,
+    state: Any = None,
+) -> Dict[str, Any]:
+    """응답에 넣을 페이지 정보 (``total_count`` 는 커서와 무관한 전체 일치 수)"""
+    return {
+        "total_count": total_count,
+        "returned_count": returned,
+        "has_more": next_key is not None,
+        "next_cursor": encode_cursor(next_key, criteria, state) if next_key is not None else None,
+    }
@@ -8,6 +8,8 @@ import uuid
 from datetime import datetime, timedelta
 import random
 
+from pagination import InvalidCursor, decode_cursor, page_info, select_page
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -153,21 +155,32 @@ async def get_schedule(schedule_id: str) -> Dict[str, Any]:
 async def list_schedules(
     start_date: str = None,
     end_date: str = None,
-    limit: int = 10
+    limit: int = 10,
+    cursor: str = None
 ) -> Dict[str, Any]:
     """
     일정 목록을 조회합니다.
     
+    시작 시간 순으로 반환하며, 결과가 더 있으면 next_cursor 를 cursor 로
+    넘겨 다음 페이지를 조회합니다.
+    
     Args:
         start_date (str, optional): 조회 시작 날짜 (YYYY-MM-DD)
         end_date (str, optional): 조회 종료 날짜 (YYYY-MM-DD)
-        limit (int, optional): 최대 조회 개수 (기본값: 10)
+        limit (int, optional): 한 페이지 최대 조회 개수 (기본값: 10)
+        cursor (str, optional): 이전 응답의 next_cursor (다음 페이지 조회)
         
     Returns:
-        Dict[str, Any]: 일정 목록
+        Dict[str, Any]: 일정 목록 (total_count 는 전체 일치 수)
     """
     logger.info(f"일정 목록 조회: {start_date} ~ {end_date}, 제한: {limit}")
     
+    criteria = {"start_date": start_date, "end_date": end_date}
+    try:
+        after = decode_cursor(cursor, criteria, (str, str))
+    except InvalidCursor as e:
+        return {"error": str(e)}
+    
     try:
         schedules = list(SCHEDULES.values())
         
@@ -180,21 +193,17 @@ async def list_schedules(
             end_dt = datetime.fromisoformat(end_date + "T23:59:59")
             schedules = [s for s in schedules if datetime.fromisoformat(s["start_time"]) <= end_dt]
         
-        # 시작 시간 순으로 정렬
-        schedules.sort(key=lambda x: x["start_time"])
-        
-        # 제한 개수 적용
-        schedules = schedules[:limit]
+        # (시작 시간, id) 순으로 한 페이지 선택
+        total_count = len(schedules)
+        schedules, next_key = select_page(
+            schedules, lambda x: (x["start_time"], x["id"]), limit, after
+        )
         
         return {
             "success": True,
-            "total_count": len(schedules),
+            **page_info(next_key, criteria, total_count, len(schedules)),
             "schedules": schedules,
-            "filters": {
-                "start_date": start_date,
-                "end_date": end_date,
-                "limit": limit
-            }
+            "filters": {**criteria, "limit": limit}
         }
         
     except Exception as e: